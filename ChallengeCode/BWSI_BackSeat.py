@@ -23,28 +23,40 @@ from AUV_Controller import AUVController
 from pynmea2 import pynmea2
 import BluefinMessages
 from Sandshark_Interface import SandsharkClient
-
-# Check the NMEA checksum
-def valid_checksum(msg):
-    fields = msg.split('*')
-    cmd = fields[0][1:]
-    expected = str(hex(BluefinMessages.checksum(cmd))[2:])
-    
-    if expected.upper() != fields[1].upper():
-        print(f"cmd = {cmd}")
-        print(f"{expected} != {fields[1]}")
-        return False
-    
-    return True
+from Latency_Tracker import LatencyTracker, CommandTracker
+from Bluefin_Decoder import BluefinDecoder
+from NMEA_Mailbox import sentence_type
+from Bluefin_Encoder import CommandEncoder
+from Message_Registry import MessageRegistry
+from NMEA_Time import NMEATimeOfDay
 
 class BackSeat():
     # we assign the mission parameters on init
-    def __init__(self, host='localhost', port=8000, warp=1, camera_type="SIM", logger=None):
+    def __init__(self, host='localhost', port=8000, warp=1, camera_type="SIM", logger=None, transport='tcp'):
         
-        # back seat acts as client
-        self.__client = SandsharkClient(host=host, port=port)
+        # back seat acts as client; it connects (and reconnects) in its own
+        # thread, started below so that it overlaps the rest of the start up
+        self.__client = SandsharkClient(host=host, port=port, transport=transport,
+                                        on_state_change=self.__on_link_state)
         self.__current_time = datetime.datetime.utcnow().timestamp()
         self.__start_time = self.__current_time
+        self.__last_stats_time = self.__current_time
+        
+        # command-to-ack (matched on the BFACK) and NVG-to-command latency
+        self.__latency = LatencyTracker()
+        self.__commands = CommandTracker(self.__latency)
+        self.__decoder = BluefinDecoder()
+        self.__nmea_time = NMEATimeOfDay()
+        # the commands sent every loop, with their constant fields filled in
+        self.__rmb_encoder = CommandEncoder('BPRMB,{time},{},1,0,{},0,1')
+        self.__status_encoder = CommandEncoder('BPSTS,{time},1,BWSI Autonomy OK')
+        # decoded messages are dispatched by type to the handlers subscribed to it
+        self.__handlers = MessageRegistry(logger=logger)
+        self.__handlers.subscribe(b'BFNVG', self.__on_navigation)
+        self.__handlers.subscribe(b'BFNVR', self.__on_velocity)
+        self.__handlers.subscribe(b'BFVER', self.__on_version)
+        self.__handlers.subscribe(b'BFACK', self.__on_ack)
+        self.__last_nvg_time = None
         self.__logger = logger
         self.__warp = warp
         
@@ -66,14 +78,23 @@ class BackSeat():
         
         # set to PICAM for the real camera
         self.__camera_type = camera_type
-        self.__buoy_detector = ImageProcessor(camera=self.__camera_type, logger=logger)
-        self.__autonomy = AUVController(logger=logger)
+        self.__client_thread = threading.Thread(target=self.__client.run, args=())
+        self.__client_thread.start()
+        try:
+            self.__buoy_detector = ImageProcessor(camera=self.__camera_type, logger=logger)
+            self.__autonomy = AUVController(logger=logger)
+        except:
+            # e.g. no camera; the client thread would keep the process alive
+            self.__client.cleanup()
+            self.__client_thread.join()
+            raise
     
     def run(self):
         try:
-            # connect the client
-            client = threading.Thread(target=self.__client.run, args=())
-            client.start()
+            # the client has been connecting since __init__
+            if not self.__client.wait_connected(timeout=0):
+                self.__logger.info("Waiting for the front seat...")
+                self.__client.wait_connected()
             msg = BluefinMessages.BPLOG('ACK', 'ON')
             self.send_message(msg)
             msg = BluefinMessages.BPLOG('ALL', 'ON')
@@ -95,10 +116,10 @@ class BackSeat():
                 if len(msgs) > 0:
                     for msg in msgs:
 #                         print(f"{str(msg, 'utf-8')}")
-                        self.process_message(str(msg, 'utf-8'))
+                        self.process_message(msg)
 #                         print(f"{self.__auv_state}")
                         
-                self.__logger.info(f"Received from Frontseat: {msgs}")
+                self.__logger.info(f"Received from Frontseat: {[str(msg, 'utf-8') for msg in msgs]}")
                 self.__logger.info(f"AUV state: {self.__auv_state}")
                 
                 if self.__auv_state["heading"] is not None or self.__camera_type != "SIM":
@@ -119,10 +140,17 @@ class BackSeat():
                     ### ---------------------------------------------------------- #
                     ### turn your output message into a BPRMB request! 
 
-                    cmd = self.format_command(rudder_angle, speed)
-                    msg = f"${cmd}*{hex(BluefinMessages.checksum(cmd))[2:]}\n"
+                    msg = self.format_command(rudder_angle, speed)
                     self.send_message(msg)
                 
+                # everything sent this tick goes out in one write
+                self.__client.flush()
+                
+                if self.__current_time - self.__last_stats_time >= 10:
+                    self.log_transport_stats()
+                    self.log_latency_summary()
+                    self.log_handler_stats()
+                    
                 time.sleep(1/self.__warp)
                 
                 # ------------------------------------------------------------ #
@@ -163,128 +191,157 @@ class BackSeat():
         except:
             self.__logger.error("An error occurred. The stack trace is below.", exc_info=True)
             self.__client.cleanup()
-            client.join()
+            self.__client_thread.join()
           
     
+    def __on_link_state(self, state):
+        if self.__logger is not None:
+            self.__logger.info(f"Front seat link {state}")
+            
+    # the whole $BPRMB sentence, as bytes
     def format_command(self, rudder_angle, speed=750):
-        hhmmss = datetime.datetime.fromtimestamp(self.__current_time).strftime('%H%M%S.%f')[:-4]
-        cmd = f"BPRMB,{hhmmss},{-rudder_angle},1,0,{speed},0,1"
-        return cmd
+        return self.__rmb_encoder.encode(self.__current_time, -rudder_angle, speed)
     
-    def process_message(self, message):
+    def process_message(self, msg):
         # DEAL WITH INCOMING BFNVG MESSAGES AND USE THEM TO UPDATE THE
         # STATE IN THE CONTROLLER!
-        messages = message.split('$')
-        messages = messages[1:] # the first split will be blank, or partial message
+        # one framed sentence (bytes) per call: the mailbox has already dropped
+        # navigation updates that were superseded
+        if self.__logger.isEnabledFor(logging.INFO):
+            self.__logger.info(f"Processing: {str(msg, 'utf-8', 'replace')}")
         
-        processed_list = list()
-        for msgpart in reversed(messages):
-            msg = f"${msgpart}"
+        # checksum, type and fields are all decoded from the bytes
+        record = self.__decoder.decode(msg)
+        kind = sentence_type(msg)
+        if record is None:
+            if self.__decoder.knows(kind):
+                self.__logger.warning(f"Mismatched checksum or malformed, skipping message {bytes(msg)}")
+            else:
+                self.__handlers.unknown(kind)
+            return
         
-            # JRE: skipping the checksum check for now!
-            self.__logger.info(f"Processing: {msg}")
-
-            if not valid_checksum(msg):
-                self.__logger.warning(f"Mismatched checksum, skipping message {msg}")
-                return
-                
-            payld = msg.split('*')
-            fields = payld[0].split(',')
+        # the handlers subscribed to this type, see subscribe()
+        self.__handlers.dispatch(kind, record)
+        
+    # call handler(record) for every decoded message of this type (b'BFNVG',
+    # with a Bluefin_Decoder record), after the backseat's own handling
+    def subscribe(self, tag, handler):
+        return self.__handlers.subscribe(tag, handler)
+        
+    def __on_navigation(self, record):
+        self.__last_nvg_time = time.monotonic()
+        
+        # don't care about message timestamp
+        #nvg_time = self.receive_nmea_time(record.timestamp)
+        
+        # really only care about heading and position for now
+        self.__auv_state['latlon'] = (record.latitude, record.longitude)
+        
+        if self.__datum is None:
+            # on first navigation update, set datum
+            self.__datum = self.__auv_state['latlon']
+            self.__datum_position = utm.from_latlon(self.__datum[0], self.__datum[1])
+            self.__auv_state['position'] = (0, 0)
             
-            # only process one of each type of message
-            if fields[0] in processed_list:
-                continue
+        else:
+            self.__auv_state['position'] = self.__get_local_position()
             
-            processed_list.append(fields[0])
+        self.__auv_state['datum'] = self.__datum
+        self.__auv_state['altitude'] = record.altitude
+        self.__auv_state['depth'] = record.depth
+        self.__auv_state['heading'] = record.heading
+        self.__auv_state['roll'] = record.roll
+        self.__auv_state['pitch'] = record.pitch
+        # time.monotonic() seconds, comparable with the other timestamps here
+        self.__auv_state['last_fix_time'] = self.receive_nmea_time(record.fix_timestamp)
+        
+        self.__logger.info(f"Interpreted as: {str(self.__auv_state)}")
+        
+    def __on_velocity(self, record):
+        self.__logger.info(f"Interpreted as: {record}")
+        
+    def __on_version(self, record):
+        # don't care about the time for now
+        print(f"Version is {record.version_number}")
+        
+        self.__logger.info(f"Version: {record.version_number}")
+        
+    def __on_ack(self, record):
+        print(f"time = {str(record.timestamp, 'ascii')}")
+        msg_type = record.command_name
+        status = record.ack_status_code
+        
+        if status < 2:
+            outstr = f"Vehicle failed to process request {msg_type}: {record.ack_details}"
             
-            if fields[0] == '$BFNVG':
-                # don't care about message timestamp
-                #nvg_time = self.receive_nmea_time(fields[1])
-                        
-                # really only care about heading and position for now
-                self.__auv_state['latlon'] = self.receive_nmea_latlon(fields[2],fields[3], fields[4], fields[5])
-                            
-                if self.__datum is None:
-                    # on first navigation update, set datum
-                    self.__datum = self.__auv_state['latlon']
-                    self.__datum_position = utm.from_latlon(self.__datum[0], self.__datum[1])
-                    self.__auv_state['position'] = (0, 0)
-                    
-                else:
-                    self.__auv_state['position'] = self.__get_local_position()
-                    
-                self.__auv_state['datum'] = self.__datum
-                self.__auv_state['altitude'] = float(fields[7])        
-                self.__auv_state['depth'] = float(fields[8])
-                self.__auv_state['heading'] = float(fields[9])
-                self.__auv_state['roll'] = float(fields[10])
-                self.__auv_state['pitch'] = float(fields[11])
-                self.__auv_state['last_fix_time'] = self.receive_nmea_time(fields[12])
-                
-                self.__logger.info(f"Interpreted as: {str(self.__auv_state)}")
-                    
-            elif fields[0] == '$BFNVR':
-                nvr = {'timestamp': fields[1],
-                   'east_velocity': float(fields[2]),
-                   'north_velocity': float(fields[3]),
-                   'down_velocity': float(fields[4]),
-                   'pitch_rate': float(fields[5]),
-                   'roll_rate': float(fields[6]),
-                   'yaw_rate': float(fields[7]),
-                }
-                
-                self.__logger.info(f"Interpreted as: {nvr}")
-                    
-            elif fields[0] == '$BFVER':
-                # don't care about the time for now
-                print(f"Version is {fields[2]}")
-                
-                self.__logger.info(f"Version: {fields[2]}")
-                
-            elif fields[0] == '$BFACK':
-                print(f"time = {fields[1]}")
-                msg_type = fields[2]
-                status = int(fields[5])
-                if status < 2:
-                    outstr = f"Vehicle failed to process request {msg_type}: {fields[7]}"
-                    
-                elif status == 2:
-                    outstr = f"Vehicle successfully processed request {msg_type}"
-                    
-                else:
-                    outstr = f"Request {msg_type} is pending"
-                    
-                self.__logger.info(f"{outstr}")
-                    
-            else:
-                self.__logger.warning(f"I do not know how to process this message type: {fields[0]}")
-                
+        elif status == 2:
+            outstr = f"Vehicle successfully processed request {msg_type}"
+            
+        else:
+            outstr = f"Request {msg_type} is pending"
+            
+        latency = self.__commands.acknowledged(msg_type, record.command_timestamp)
+        if latency is not None:
+            outstr += f" after {1000*latency:.1f} ms"
+            
+        self.__logger.info(f"{outstr}")
+        
     def send_message(self, msg):
-        self.__logger.info(f"sending message {msg}...")
+        now = time.monotonic()
+        # the encoded commands are bytes, the others str
+        text = msg if isinstance(msg, str) else str(msg, 'utf-8')
+        self.__commands.sent(text, now)
+        if text.startswith('$BPRMB') and self.__last_nvg_time is not None:
+            # sense to act: the newest navigation update to the command based on it
+            self.__latency.add('nvg_to_command', now - self.__last_nvg_time)
+            
+        self.__logger.info(f"sending message {text}...")
         self.__client.send_message(msg)    
         
+    # p50/p95/p99 of each latency, in ms, over the last 1000 samples
+    def log_latency_summary(self):
+        summary = self.__latency.summary()
+        for name, latency in summary.items():
+            self.__logger.info(f"Latency {name}: n={latency['count']} "
+                               f"p50={1000*latency['p50']:.1f} ms "
+                               f"p95={1000*latency['p95']:.1f} ms "
+                               f"p99={1000*latency['p99']:.1f} ms "
+                               f"max={1000*latency['max']:.1f} ms")
+        self.__logger.info(f"Latency summary: {summary}")
+        
+    # calls and mean run time of each message handler, unknown message types
+    def log_handler_stats(self):
+        stats = self.__handlers.get_stats()
+        for name, handler in stats['handlers'].items():
+            if handler['calls'] > 0:
+                self.__logger.info(f"Handler {name}: {handler['calls']} calls, "
+                                   f"{1e6*handler['seconds']/handler['calls']:.1f} us/call, "
+                                   f"{handler['errors']} errors")
+        if stats['unknown']:
+            self.__logger.info(f"Unknown message types: {stats['unknown']}")
+        
+    # syscalls per second and bytes per syscall on the link to the front seat
+    def log_transport_stats(self):
+        stats = self.__client.get_stats()
+        self.__logger.info(f"Transport: {stats['send_calls_per_second']:.1f} sends/s, "
+                           f"{stats['bytes_per_send']:.1f} bytes/send, "
+                           f"{stats['recv_calls_per_second']:.1f} recvs/s, "
+                           f"{stats['bytes_per_recv']:.1f} bytes/recv")
+        self.__last_stats_time = self.__current_time
+        
     def send_status(self):
         #print("sending status...")
         self.__current_time = datetime.datetime.utcnow().timestamp()
-        hhmmss = datetime.datetime.fromtimestamp(self.__current_time).strftime('%H%M%S.%f')[:-4]
-        msg = BluefinMessages.BPSTS(hhmmss, 1, 'BWSI Autonomy OK')
+        msg = self.__status_encoder.encode(self.__current_time)
         self.send_message(msg)
             
     def get_mail(self):
         msgs = self.__client.receive_mail()
         return msgs
     
+    # hhmmss.ss (UTC, str or bytes) of the current day as time.monotonic() seconds
     def receive_nmea_time(self, hhmmss):
-        tm = datetime.datetime.utcnow()
-        nvg_time = datetime.datetime(tm.year,
-                                     tm.month,
-                                     tm.day,
-                                     int(hhmmss[0:2]), 
-                                     int(hhmmss[2:4]), 
-                                     int(hhmmss[4:6]),
-                                     0)
-        
-        return nvg_time
+        return self.__nmea_time.monotonic(hhmmss)
     
     def receive_nmea_latlon(self, latdeg, lathemi, londeg, lonhemi):
         latitude = int(latdeg[0:2]) + float(latdeg[2:]) / 60
@@ -318,6 +375,12 @@ def main():
     else:
         port = 29500
         
+    # tcp, or unix / udp when the front seat runs on the same machine
+    if len(sys.argv) > 3:
+        transport = sys.argv[3]
+    else:
+        transport = 'tcp'
+        
     file_handler = logging.FileHandler(f"backseat_{datetime.datetime.utcnow().timestamp()}.log")
     file_handler.setLevel(logging.DEBUG)
     logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", handlers=[logging.StreamHandler(sys.stdout), file_handler])
@@ -325,7 +388,7 @@ def main():
     logger.setLevel(logging.INFO)
     
     logger.info(f"host = {host}, port = {port}")
-    backseat = BackSeat(host=host, port=port, logger=logger)
+    backseat = BackSeat(host=host, port=port, logger=logger, transport=transport)
     backseat.run()
     
 if __name__ == '__main__':
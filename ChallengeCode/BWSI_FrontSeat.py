@@ -10,21 +10,62 @@ This is the simulated Sandshark front seat
 """
 import sys
 
-from BWSI_Sandshark import Sandshark
+from BWSI_Sandshark import Sandshark, SandsharkFleet
 from BWSI_BuoyField import BuoyField
-from Sandshark_Interface import SandsharkServer
+from Sandshark_Interface import SandsharkServer, SandsharkSessionServer
+from Live_Plotter import LivePlotter
+from Track_History import TrackHistory
 
 import threading
+import traceback
 
 import time
 import datetime
 
 import numpy as np
-import matplotlib.pyplot as plt
+
+# apply a payload command to the vehicle (a Sandshark, or a FleetVehicle)
+def parse_payload_command(vehicle, msg, verbose=True):
+    # the only one I care about for now is BPRMB
+    if verbose:
+        print(f"Parsing {msg}")
+    payld = msg.split('*')
+    vals = payld[0].split(',')
+    if vals[0] == '$BPRMB':
+        if verbose:
+            print("Here!")
+            
+        # heading / rudder request
+        if vals[2] != '':
+            if verbose:
+                print("Here?")
+            heading_mode = int(vals[7])
+            if heading_mode == 0:
+                # this is a heading request!
+                print("SORRY, I DO NOT ACCEPT HEADING REQUESTS! I ONLY HAVE CAMERA SENSOR!")
+            elif heading_mode == 1:
+                # this is a rudder adjustment!
+                rudder = float(vals[2])
+                if verbose:
+                    print(f"SETTING RUDDER TO {rudder} DEGREES")
+                vehicle.set_rudder(rudder)
+            
+        # speed request
+        if vals[5] != '':
+            speed_mode = int(vals[6])
+            if speed_mode == 0:
+                RPM = int(vals[5])
+                if verbose:
+                    print(f"SETTING THRUSTER TO {RPM} RPM")
+                vehicle.set_rpm(RPM)
+            elif speed_mode == 1:
+                # speed_request
+                print("SORRY, RPM SPEED REQUESTS ONLY! I HAVE NO GPS!")
 
 class FrontSeat():
     # we assign the mission parameters on init
-    def __init__(self, port=8000, warp=1):
+    def __init__(self, port=8000, warp=1, physics_rate=100, nvg_rate=10, plots=True, track_file=None,
+                 observer_port=None, transport='tcp'):
         # start up the vehicle, in setpoint mode
         self.__datum = (42.3, -71.1)
         self.__vehicle = Sandshark(latlon=self.__datum,
@@ -34,31 +75,36 @@ class FrontSeat():
                                    rudder_position=0.0,
                                    engine_speed='STOP',
                                    engine_direction='AHEAD',
-                                   datum=self.__datum)
+                                   datum=self.__datum,
+                                   physics_rate=physics_rate,
+                                   nvg_rate=nvg_rate)
         
-        # front seat acts as server
-        self.__server = SandsharkServer(port=port)
+        # front seat acts as server; observers on observer_port get the same
+        # telemetry as the backseat but cannot command the vehicle
+        self.__server = SandsharkServer(port=port, observer_port=observer_port,
+                                        transport=transport)
         self.__current_time = datetime.datetime.utcnow().timestamp()
         self.__start_time = self.__current_time
         self.__warp = warp
         
-        self.__position_history = list()
-        self.__doPlots = True
+        # bounded track in memory; the full track is spilled to track_file for
+        # post-run analysis only when one is given
+        self.__track = TrackHistory(capacity=1000, spill_file=track_file)
+        
+        # the live view runs in its own process; headless runs skip it entirely
+        self.__doPlots = plots
+        self.__plotter = None
         
         # has heard from the backseat
         self.__isConnected = False
     
     
     def run(self):
+        # start up the server
+        server = threading.Thread(target=self.__server.run, args=())
+        server.start()
         try:
-            # start up the server
-            server = threading.Thread(target=self.__server.run, args=())
-            server.start()
-            
             if self.__doPlots:
-                fig = plt.figure()
-                ax = fig.add_subplot(111)
-                
                 self.__simField = BuoyField(self.__datum)
 
                 config = {'nGates': 5,
@@ -70,8 +116,8 @@ class FrontSeat():
                     
                 self.__simField.configure(config)
                 G, R = self.__simField.get_buoy_positions()
-                green_buoys = np.asarray(G)
-                red_buoys = np.asarray(R)
+                self.__plotter = LivePlotter(G, R)
+                self.__plotter.start()
 
 
             count = 0
@@ -79,7 +125,8 @@ class FrontSeat():
                 now = datetime.datetime.utcnow().timestamp()
                 delta_time = (now-self.__current_time) * self.__warp
                 msg = self.__vehicle.update_state(delta_time)
-                self.__server.send_command(msg)
+                if msg is not None:
+                    self.__server.send_command(msg)
                 self.__current_time = now
                 
                 msgs = self.__server.receive_mail()
@@ -91,59 +138,101 @@ class FrontSeat():
                         print(f"{str(msg, 'utf-8')}")
                         
                     
-                if self.__doPlots and self.__isConnected:
+                if self.__isConnected:
                     current_position = self.__vehicle.get_position()
-                    self.__position_history.append(current_position)
-                    ax.clear()
-                    ax.plot(green_buoys[:,0], green_buoys[:,1], 'go')
-                    ax.plot(red_buoys[:,0], red_buoys[:,1], 'ro')
-                    trk = np.array(self.__position_history)
-                    ax.plot(trk[-10:,0], trk[-10:,1], 'k')            
-    
-                    ax.set_xlim(current_position[0]-10, current_position[0]+10)
-                    ax.set_ylim(current_position[1]-10, current_position[1]+10)
-                    ax.set_aspect('equal')
+                    self.__track.append(self.__current_time,
+                                        current_position[0],
+                                        current_position[1],
+                                        self.__vehicle.get_heading())
                     
-                    plt.pause(0.01)
-                    plt.draw()
+                    if self.__doPlots:
+                        self.__plotter.update(current_position, self.__track.recent_positions(10))
  
                 count += 1
                 time.sleep(.25/self.__warp)
-        except:
+        except KeyboardInterrupt:
+            pass # Ctrl-C is how the front seat is stopped
+        except Exception:
+            traceback.print_exc()
+        finally:
+            # the track first, so it is on disk even if shutting down the plotter is interrupted
+            self.__track.close()
+            if self.__plotter is not None:
+                self.__plotter.stop()
             self.__server.cleanup()
             server.join()
             
     def parse_payload_command(self, msg):
-        # the only one I care about for now is BPRMB
-        print(f"Parsing {msg}")
-        payld = msg.split('*')
-        vals = payld[0].split(',')
-        if vals[0] == '$BPRMB':
-            print("Here!")
+        parse_payload_command(self.__vehicle, msg)
+            
+# one front seat process hosting many independent simulated vehicles, one per
+# backseat connection, all stepped together and serviced by one event loop
+class FleetFrontSeat():
+    def __init__(self, port=8000, warp=1, max_vehicles=8, physics_rate=100, nvg_rate=10):
+        self.__datum = (42.3, -71.1)
+        self.__fleet = SandsharkFleet(max_vehicles=max_vehicles,
+                                      latlon=self.__datum,
+                                      depth=1.0,
+                                      heading=45.0,
+                                      datum=self.__datum,
+                                      physics_rate=physics_rate,
+                                      nvg_rate=nvg_rate)
+        
+        self.__server = SandsharkSessionServer(port=port, max_sessions=max_vehicles)
+        self.__current_time = datetime.datetime.utcnow().timestamp()
+        self.__warp = warp
+        self.__tick = 0.25
+        
+        # session id -> vehicle
+        self.__vehicles = dict()
+        
+    def run(self):
+        try:
+            next_tick = time.monotonic()
+            while True:
+                # service the sockets until the next physics tick is due
+                for event in self.__server.poll(max(0.0, next_tick - time.monotonic())):
+                    self.__handle_event(event)
+                    
+                if time.monotonic() < next_tick:
+                    continue
+                next_tick += self.__tick / self.__warp
                 
-            # heading / rudder request
-            if vals[2] != '':
-                print("Here?")
-                heading_mode = int(vals[7])
-                if heading_mode == 0:
-                    # this is a heading request!
-                    print("SORRY, I DO NOT ACCEPT HEADING REQUESTS! I ONLY HAVE CAMERA SENSOR!")
-                elif heading_mode == 1:
-                    # this is a rudder adjustment!
-                    rudder = float(vals[2])
-                    print(f"SETTING RUDDER TO {rudder} DEGREES")
-                    self.__vehicle.set_rudder(rudder)
+                now = datetime.datetime.utcnow().timestamp()
+                delta_time = (now-self.__current_time) * self.__warp
+                self.__current_time = now
                 
-            # speed request
-            if vals[5] != '':
-                speed_mode = int(vals[6])
-                if speed_mode == 0:
-                    RPM = int(vals[5])
-                    print(f"SETTING THRUSTER TO {RPM} RPM")
-                    self.__vehicle.set_rpm(RPM)
-                elif speed_mode == 1:
-                    # speed_request
-                    print("SORRY, RPM SPEED REQUESTS ONLY! I HAVE NO GPS!")
+                reports = self.__fleet.update_state(delta_time)
+                for session in self.__server.sessions():
+                    vehicle = self.__vehicles.get(session.session_id)
+                    if vehicle is not None and vehicle.get_slot() in reports:
+                        self.__server.send_command(session, reports[vehicle.get_slot()])
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self.__server.cleanup()
+            
+    def __handle_event(self, event):
+        session = event[1]
+        if event[0] == 'connect':
+            slot = self.__fleet.add_vehicle()
+            if slot is None:
+                self.__server.close_session(session)
+                return
+            
+            self.__vehicles[session.session_id] = self.__fleet.vehicle(slot)
+            print(f"Vehicle {slot} launched for backseat {session.address}")
+            
+        elif event[0] == 'disconnect':
+            vehicle = self.__vehicles.pop(session.session_id, None)
+            if vehicle is not None:
+                self.__fleet.remove_vehicle(vehicle.get_slot())
+                print(f"Vehicle {vehicle.get_slot()} recovered from backseat {session.address}")
+                
+        elif event[0] == 'message':
+            vehicle = self.__vehicles.get(session.session_id)
+            if vehicle is not None:
+                parse_payload_command(vehicle, str(event[2], 'utf-8'), verbose=False)
 
 def main():
     if len(sys.argv) > 1:
@@ -151,9 +240,43 @@ def main():
     else:
         port = 29500
         
+    # more than one vehicle runs the multi-session front seat
+    if len(sys.argv) > 2:
+        num_vehicles = int(sys.argv[2])
+    else:
+        num_vehicles = 1
+        
+    # loggers, plotters or a shadow backseat can subscribe to the telemetry here
+    if len(sys.argv) > 3:
+        observer_port = int(sys.argv[3]) or None # 0 for none
+    else:
+        observer_port = None
+        
+    # tcp, or unix / udp when the backseat runs on the same machine
+    if len(sys.argv) > 4:
+        transport = sys.argv[4]
+    else:
+        transport = 'tcp'
+        
+    # the full-rate track is kept on disk only when asked for
+    if len(sys.argv) > 5:
+        track_file = sys.argv[5] or None
+    else:
+        track_file = None
+        
+    # 0 for a headless run (no display, or CI): the plotter process is not started
+    if len(sys.argv) > 6:
+        plots = int(sys.argv[6]) != 0
+    else:
+        plots = True
+        
     print(f"port = {port}")
         
-    front_seat = FrontSeat(port=port)
+    if num_vehicles > 1:
+        front_seat = FleetFrontSeat(port=port, max_vehicles=num_vehicles)
+    else:
+        front_seat = FrontSeat(port=port, observer_port=observer_port, transport=transport,
+                               track_file=track_file, plots=plots)
     front_seat.run()
 
 if __name__ == '__main__':
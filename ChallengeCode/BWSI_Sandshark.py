@@ -31,6 +31,157 @@ def nmea_lon(lon_deg):
     muval = int((minflt - minval)*1e6)
     return f"{int(degval):03d}{int(minval):02d}.{int(muval):06d}"
 
+# layout of the vehicle state vector
+STATE_X = 0         # local easting from datum (m)
+STATE_Y = 1         # local northing from datum (m)
+STATE_HEADING = 2   # degrees, clockwise from north
+STATE_SPEED = 3     # meters per second
+STATE_RUDDER = 4    # degrees, positive to starboard
+STATE_BATTERY = 5   # remaining battery (m of travel)
+STATE_RUDDER_ACTUAL = 6 # degrees, where the rudder actually is
+STATE_YAW_RATE = 7  # degrees per second, clockwise
+STATE_SIZE = 8
+
+# rudder response fitted with Rudder_Fit.py against the Baygull-0.3.0 pool run
+# (rudder orders vs. BFNVG heading changes on the real vehicle)
+RUDDER_MODEL_PARAMS = {'rudder_tau': 0.2,
+                       'yaw_tau': 1.0,
+                       'dead_time': 0.2,
+                       'max_turning_rate': 25.4}
+
+class RudderModel(object):
+    """ First-order rudder actuator and yaw-rate response behind a dead time.
+    The dead time is a ring buffer of the last rudder orders, so a step is O(1).
+    Works on one state vector or on a (N, STATE_SIZE) fleet of them; the time
+    constants may also be arrays broadcastable to the fleet
+    """
+    def __init__(self, dt, shape=(),
+                 rudder_tau=RUDDER_MODEL_PARAMS['rudder_tau'],
+                 yaw_tau=RUDDER_MODEL_PARAMS['yaw_tau'],
+                 dead_time=RUDDER_MODEL_PARAMS['dead_time'],
+                 max_turning_rate=RUDDER_MODEL_PARAMS['max_turning_rate'],
+                 hard_rudder_deg=25,
+                 max_speed_mps=5*0.514444):
+        self.__rudder_tau = np.asarray(rudder_tau, dtype=float)
+        self.__yaw_tau = np.asarray(yaw_tau, dtype=float)
+        self.__max_turning_rate = max_turning_rate
+        self.__hard_rudder_deg = hard_rudder_deg
+        self.__max_speed_mps = max_speed_mps
+        
+        # dead time is counted in steps of the nominal dt; without one there is no delay
+        delay_steps = 0 if dt is None else int(round(dead_time / dt))
+        self.__history = np.zeros(tuple(shape) + (delay_steps + 1,))
+        self.__head = 0
+        
+    def reset(self, rudder=0.0, index=Ellipsis):
+        self.__history[index] = rudder
+        
+    def step(self, state, dt):
+        # push the current order, pop the one that is arriving at the rudder now
+        length = self.__history.shape[-1]
+        self.__history[..., self.__head] = state[..., STATE_RUDDER]
+        self.__head = (self.__head + 1) % length
+        arriving = self.__history[..., self.__head]
+        
+        # the taus can be 0 for an instantaneous response
+        rudder_gain = 1.0 - np.exp(-dt / np.maximum(self.__rudder_tau, 1e-9))
+        yaw_gain = 1.0 - np.exp(-dt / np.maximum(self.__yaw_tau, 1e-9))
+        
+        state[..., STATE_RUDDER_ACTUAL] += (arriving - state[..., STATE_RUDDER_ACTUAL]) * rudder_gain
+        
+        steady_yaw_rate = (self.__max_turning_rate
+                           * (-state[..., STATE_RUDDER_ACTUAL] / self.__hard_rudder_deg)
+                           * (state[..., STATE_SPEED] / self.__max_speed_mps))
+        state[..., STATE_YAW_RATE] += (steady_yaw_rate - state[..., STATE_YAW_RATE]) * yaw_gain
+        
+        return state
+
+def integrate_state(state, dt):
+    """ Dead-reckon one step of dt seconds, in place, in local metric coordinates.
+    state may be a single state vector or a (N, STATE_SIZE) array of them
+    """
+    heading = state[..., STATE_HEADING]
+    speed = state[..., STATE_SPEED]
+    
+    delta_heading = state[..., STATE_YAW_RATE] * dt
+    avg_heading = np.radians(heading + delta_heading/2.0)
+    
+    dist = speed * dt
+    state[..., STATE_X] += dist * np.sin(avg_heading)
+    state[..., STATE_Y] += dist * np.cos(avg_heading)
+    state[..., STATE_HEADING] = np.mod(heading + delta_heading + 360.0, 360.0)
+    
+    # battery usage
+    state[..., STATE_BATTERY] -= np.abs(dist)
+    
+    return state
+
+class PhysicsClock(object):
+    """ Splits elapsed time into fixed physics steps and says when an NVG
+    report is due. A rate of None means one step per update / a report on
+    every update
+    """
+    def __init__(self, physics_rate=None, nvg_rate=None):
+        self.__physics_dt = None if physics_rate is None else 1.0 / physics_rate
+        self.__nvg_interval = None if nvg_rate is None else 1.0 / nvg_rate
+        self.__physics_time = 0.0   # integration time owed to the physics
+        self.__report_time = 0.0    # time since the last NVG report
+        
+    def get_physics_dt(self):
+        return self.__physics_dt
+        
+    def steps(self, dt):
+        if self.__physics_dt is None:
+            return [dt]
+        
+        self.__physics_time += dt
+        nsteps = int(self.__physics_time / self.__physics_dt + 1e-9)
+        self.__physics_time -= nsteps * self.__physics_dt
+        return [self.__physics_dt] * nsteps
+    
+    def report_due(self, step):
+        if self.__nvg_interval is None:
+            return True
+        
+        self.__report_time += step
+        if self.__report_time >= self.__nvg_interval - 1e-9:
+            self.__report_time = max(0.0, self.__report_time - self.__nvg_interval)
+            return True
+        
+        return False
+
+def nvg_message(timestamp, latlon, altitude, depth, heading, roll, pitch):
+    """ format a navigation update as an NMEA string
+    """
+    lat_hemi = 'N'
+    lat_deg = nmea_lat(latlon[0])
+    
+    if latlon[0] < 0:
+        lat_hemi = 'S'
+        
+    lon_hemi = 'E'
+    lon_deg = nmea_lon(latlon[1])
+    
+    if latlon[1] < 0:
+        lon_hemi = 'W'
+    
+    # JRE: in strftime %f is microseconds...
+    hhmmss = datetime.datetime.fromtimestamp(timestamp).strftime('%H%M%S.%f')[:-4]
+    msg = BluefinMessages.NVG('BF','NVG',(f'{hhmmss}',
+                                          f'{lat_deg}',
+                                          f'{lat_hemi}',
+                                          f'{lon_deg}',
+                                          f'{lon_hemi}',
+                                          '0',
+                                          f'{altitude:.1f}',
+                                          f'{depth:.1f}',
+                                          f'{heading:.1f}',
+                                          f'{roll:.1f}',
+                                          f'{pitch:.1f}',
+                                          f'{hhmmss}'))
+    
+    return str(msg) + '\n'
+
 
 class Sandshark(object):
     def __init__(self,                  
@@ -42,7 +193,10 @@ class Sandshark(object):
                  engine_speed='STOP',
                  engine_direction='AHEAD',
                  visibility=100,
-                 datum=(0.0,0.0)):
+                 datum=(0.0,0.0),
+                 physics_rate=None,
+                 nvg_rate=None,
+                 rudder_model=None):
 
         ####
         ## state components that we control
@@ -58,26 +212,29 @@ class Sandshark(object):
 
         self.__engine_state = (engine_speed, engine_direction)
         
+        ######
+        ## the dynamic state is one fixed-size float vector (see STATE_*),
+        ## integrated in local metric coordinates relative to the datum
+        self.__state = np.zeros(STATE_SIZE)
+        
         # helm command, conning order
-        self.__rudder_position = rudder_position
+        self.__state[STATE_RUDDER] = rudder_position
+        self.__state[STATE_RUDDER_ACTUAL] = rudder_position
         
         ######
         ## state components that we observe but don't directly control
-        self.__latlon = latlon
         self.__depth = depth
         self.__altitude = 10
         
         self.__speed_knots = speed_knots
-        self.__speed_mps = speed_knots * 0.514444
-        self.__heading = heading
-        self.__battery = float('inf')
+        self.__state[STATE_SPEED] = speed_knots * 0.514444
+        self.__state[STATE_HEADING] = heading
+        self.__state[STATE_BATTERY] = float('inf')
         
         self.__pitch = 0.0
         self.__roll = 0.0
         self.__yaw = 0.0
         
-        self.__rudder_history = list() # history of rudder commands
-        
         ######
         ## sensors
         #self.__laser = BWSI_Laser(visibility)
@@ -87,79 +244,50 @@ class Sandshark(object):
         ## external information and parameters
         self.__datum = datum
         self.__datum_position = utm.from_latlon(self.__datum[0], self.__datum[1])
-        self.__position = self.__get_local_position()
+        self.__state[STATE_X], self.__state[STATE_Y] = self.__get_local_position(latlon)
+        
+        ## physics and reporting rates (Hz). None integrates each update_state
+        ## call in a single step / reports an NVG on every update_state call
+        self.__clock = PhysicsClock(physics_rate, nvg_rate)
 
         ## characteristic of vehicle; should be overwritten by a subclass
         self.__MAX_SPEED_KNOTS = 5
+        self.__MAX_SPEED_MPS = self.__MAX_SPEED_KNOTS * 0.514444
         self.__HARD_RUDDER_DEG = 25
         self.__FULL_RUDDER_DEG = 15
         self.__STANDARD_RUDDER_DEG = 10
-        self.__MAX_TURNING_RATE = 15.64
         self.__RUDDER_COST = 0.35
         
         self.__MAX_RPM = 2500
+        
+        # rudder and yaw response, with the history of rudder orders
+        if rudder_model is None:
+            rudder_model = RudderModel(self.__clock.get_physics_dt(),
+                                       hard_rudder_deg=self.__HARD_RUDDER_DEG,
+                                       max_speed_mps=self.__MAX_SPEED_MPS)
+        self.__rudder_model = rudder_model
+        self.__rudder_model.reset(rudder_position)
 
     ##############################################################
     ## User request functions
-    # update the vehicle state, dt seconds have passed since last update
+    # update the vehicle state, dt seconds have passed since last update.
+    # returns the NVG report(s) due in that time, or None if none are due
     def update_state(self, dt):
-        self.__timestamp += dt
-        
-        delta_heading = self.__MAX_TURNING_RATE * (-self.__rudder_position / self.__HARD_RUDDER_DEG) * (self.__speed_knots / self.__MAX_SPEED_KNOTS) * dt
-        # adjust the delta heading based on rudder history
-        delta_heading += self.__rudder_hydro_effect()
-        
-        final_heading = np.mod(self.__heading + delta_heading + 360.0, 360.0)
-        avg_heading = np.mod( self.__heading + delta_heading/2.0 + 360.0, 360.0)
-        
-        # just march forward
-        dx = self.__speed_mps * dt * np.sin(np.radians(avg_heading))
-        dy = self.__speed_mps * dt * np.cos(np.radians(avg_heading))
-        x = self.__position[0] + dx
-        y = self.__position[1] + dy
-        self.__position = (x,y)
-        self.__latlon = utm.to_latlon(self.__position[0] + self.__datum_position[0],
-                                      self.__position[1] + self.__datum_position[1],
-                                      self.__datum_position[2],
-                                      self.__datum_position[3])
-        
-        # battery usage
-        self.__battery = self.__battery - np.sqrt(dx**2 + dy**2)
-                
-        self.__heading = final_heading
+        reports = list()
+        for step in self.__clock.steps(dt):
+            self.__timestamp += step
+            # the rudder orders reach the heading through the rudder model
+            self.__rudder_model.step(self.__state, step)
+            integrate_state(self.__state, step)
+            
+            if self.__clock.report_due(step):
+                reports.append(self.__nvg_message())
         
-        # return an NMEA string
-        lat_hemi = 'N'
-        lat_deg = nmea_lat(self.__latlon[0])
+        if len(reports) == 0:
+            return None
         
-        if self.__latlon[0] < 0:
-            lat_hemi = 'S'
-            
-        lon_hemi = 'E'
-        lon_deg = nmea_lon(self.__latlon[1])
-        
-        if self.__latlon[1] < 0:
-            lon_hemi = 'W'
-        
-        # JRE: in strftime %f is microseconds...
-        hhmmss = datetime.datetime.fromtimestamp(self.__timestamp).strftime('%H%M%S.%f')[:-4]
-        msg = BluefinMessages.NVG('BF','NVG',(f'{hhmmss}',
-                                              f'{lat_deg}',
-                                              f'{lat_hemi}',
-                                              f'{lon_deg}',
-                                              f'{lon_hemi}',
-                                              '0',
-                                              f'{self.__altitude:.1f}',
-                                              f'{self.__depth:.1f}',
-                                              f'{self.__heading:.1f}',
-                                              f'{self.__roll:.1f}',
-                                              f'{self.__pitch:.1f}',
-                                              f'{hhmmss}'))
-      
-        print(f'{str(msg)}\n')
-        return str(msg) + '\n'
+        return ''.join(reports)
                 
-                        
     def engine_command(self, command):
         # break into words & force upper case
         words = command.upper().split()
@@ -173,6 +301,7 @@ class Sandshark(object):
         new_engine_speed = words[1]
         if (words[1] == "STOP"):
             self.__speed_knots = 0
+            self.__state[STATE_SPEED] = 0
             new_engine_direction = self.__engine_state[1]
             self.__engine_state = (new_engine_speed, new_engine_direction)
             return command
@@ -191,25 +320,25 @@ class Sandshark(object):
             return "COMMAND"
         
         if (words[2] != self.__engine_state[1]):
-            self.__heading = np.mod(self.__heading + 180, 360)
+            self.__state[STATE_HEADING] = np.mod(self.__state[STATE_HEADING] + 180, 360)
             
         self.__engine_state = (new_engine_speed, new_engine_direction)
         self.__speed_knots = speed_knots
-        self.__speed_mps = self.__speed_knots * 0.514444
+        self.__state[STATE_SPEED] = self.__speed_knots * 0.514444
         
         return command
     
     def set_rpm(self, rpm):
         if rpm >= 0 and rpm <= self.__MAX_RPM:
             self.__speed_knots = self.__MAX_SPEED_KNOTS * rpm / self.__MAX_RPM
-            self.__speed_mps = self.__speed_knots * 0.514444
+            self.__state[STATE_SPEED] = self.__speed_knots * 0.514444
         else:
             print(f"INVALID RPM REQUEST: {rpm}")
         
     def set_rudder(self, rudder):
         desired = rudder
         if np.abs(desired) <= self.__HARD_RUDDER_DEG:
-            self.__rudder_position = desired
+            self.__state[STATE_RUDDER] = desired
         else:
             print(f"INVALID RUDDER REQUEST: {desired}")
     
@@ -237,24 +366,25 @@ class Sandshark(object):
             # do nothing
             return self.__reply_success(command)
         elif (command == "HOW IS YOUR RUDDER"):
-            if (self.__rudder_position == 0):
+            rudder_position = self.__state[STATE_RUDDER]
+            if (rudder_position == 0):
                 reply = "RUDDER AMIDSHIPS"
             else:
                 direction = "RIGHT"
-                if (self.__rudder_position < 0):
+                if (rudder_position < 0):
                     direction = "LEFT"
-                reply = f"RUDDER {direction} {np.abs(self.__rudder_position):.1f} DEGREES"
+                reply = f"RUDDER {direction} {np.abs(rudder_position):.1f} DEGREES"
             return reply
         elif (command == "MARK YOUR HEAD"):
-            reply = f"HEADING {self.__heading:.1f} DEGREES"
+            reply = f"HEADING {self.__state[STATE_HEADING]:.1f} DEGREES"
             return reply
         elif (command == "SHIFT YOUR RUDDER"):
-            self.__rudder_position = -self.__rudder_position
-            self.__battery = self.__battery - 2*self.__RUDDER_COST*np.abs(self.__rudder_position)
+            self.__state[STATE_RUDDER] = -self.__state[STATE_RUDDER]
+            self.__state[STATE_BATTERY] -= 2*self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER])
             return self.__reply_success(command)
         elif (command == "RUDDER AMIDSHIPS"):
-            self.__battery = self.__battery - self.__RUDDER_COST*np.abs(self.__rudder_position)
-            self.__rudder_position = 0
+            self.__state[STATE_BATTERY] -= self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER])
+            self.__state[STATE_RUDDER] = 0
             return self.__reply_success(command)
         elif (cmd[0] == "INCREASE"):
             return self.__parse_increase_command(command)
@@ -266,37 +396,49 @@ class Sandshark(object):
         
     ## accessor functions
     def get_state(self):
-        auv_state = {'heading': self.__heading,
-                     'rudder': self.__rudder_position,
-                     'speed': self.__speed_mps,        
-                     'position': self.__position}
+        auv_state = {'heading': self.__state[STATE_HEADING],
+                     'rudder': self.__state[STATE_RUDDER],
+                     'rudder_actual': self.__state[STATE_RUDDER_ACTUAL],
+                     'yaw_rate': self.__state[STATE_YAW_RATE],
+                     'speed': self.__state[STATE_SPEED],        
+                     'position': self.get_position()}
         
         return auv_state
         
+    def get_state_vector(self):
+        return self.__state
+        
     def get_position(self):
-        return self.__position
+        return (self.__state[STATE_X], self.__state[STATE_Y])
+    
+    # lat/lon is only derived on request; the simulator works in local coordinates
+    def get_latlon(self):
+        return utm.to_latlon(self.__state[STATE_X] + self.__datum_position[0],
+                             self.__state[STATE_Y] + self.__datum_position[1],
+                             self.__datum_position[2],
+                             self.__datum_position[3])
     
     def get_heading(self):
-        return self.__heading
+        return self.__state[STATE_HEADING]
     
     def get_rudder(self):
-        return self.__rudder_position
+        return self.__state[STATE_RUDDER]
     
     def set_battery(self, val):
-        self.__battery = val
+        self.__state[STATE_BATTERY] = val
     
     def get_battery(self):
-        return self.__battery
+        return self.__state[STATE_BATTERY]
     
     def get_speed(self, units='mps'):
         if units.lower() == 'mps':
-            return self.__speed_mps
+            return self.__state[STATE_SPEED]
         else:
             return self.__speed_knots
             
     ## sensors    
     def read_laser(self, buoy_field):
-        g, r = self.__laser.get_visible_buoys(self.__position, self.__heading, buoy_field)
+        g, r = self.__laser.get_visible_buoys(self.get_position(), self.__state[STATE_HEADING], buoy_field)
         
         g = random.shuffle(g, list(g))
         r = random.shuffle(r, list(r))
@@ -304,7 +446,7 @@ class Sandshark(object):
         return g, r
     
     def read_camera(self, buoy_field):
-        g, r = self.__camera.get_visible_buoys(self.__position, self.__heading, buoy_field)
+        g, r = self.__camera.get_visible_buoys(self.get_position(), self.__state[STATE_HEADING], buoy_field)
         
         g = random.shuffle(g, list(g))
         r = random.shuffle(r, list(r))
@@ -356,8 +498,8 @@ class Sandshark(object):
                 return "COMMAND"
         
         #made it through
-        self.__battery = self.__battery - self.__RUDDER_COST*np.abs(self.__rudder_position-deg) 
-        self.__rudder_position = mult*deg
+        self.__state[STATE_BATTERY] -= self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER]-deg) 
+        self.__state[STATE_RUDDER] = mult*deg
         
         return self.__reply_success(command)
         
@@ -369,7 +511,7 @@ class Sandshark(object):
             # improper command format
             return "COMMAND"
         
-        if (self.__rudder_position == 0):
+        if (self.__state[STATE_RUDDER] == 0):
             # ambiguous which direction to turn
             return "COMMAND"
         
@@ -379,13 +521,13 @@ class Sandshark(object):
             # increasing too much
             return "COMMAND"
         
-        if (deg < np.abs(self.__rudder_position)):
+        if (deg < np.abs(self.__state[STATE_RUDDER])):
             # this is not increasing the rudder
             return "COMMAND"
         
         # looks like a valid command
-        self.__battery = self.__battery-self.__RUDDER_COST*np.abs(self.rudder_position-deg)
-        self.__rudder_position = np.sign(self.__rudder_position)*deg
+        self.__state[STATE_BATTERY] -= self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER]-deg)
+        self.__state[STATE_RUDDER] = np.sign(self.__state[STATE_RUDDER])*deg
 
         return self.__reply_success(command)
     
@@ -399,12 +541,12 @@ class Sandshark(object):
             return "COMMAND"
         
         if (cmd[1] == "RIGHT"):
-            self.__battery = self.__battery-self.__RUDDER_COST*np.abs(self.__rudder_position-self.__HARD_RUDDER_DEG)
-            self.__rudder_position = self.__HARD_RUDDER_DEG
+            self.__state[STATE_BATTERY] -= self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER]-self.__HARD_RUDDER_DEG)
+            self.__state[STATE_RUDDER] = self.__HARD_RUDDER_DEG
             return self.__reply_success(command)
         elif (cmd[1] == "LEFT"):
-            self.__battery = self.__battery-self.__RUDDER_COST*np.abs(self.__rudder_position+self.__HARD_RUDDER_DEG)
-            self.__rudder_position = -self.__HARD_RUDDER_DEG
+            self.__state[STATE_BATTERY] -= self.__RUDDER_COST*np.abs(self.__state[STATE_RUDDER]+self.__HARD_RUDDER_DEG)
+            self.__state[STATE_RUDDER] = -self.__HARD_RUDDER_DEG
             return self.__reply_success(command)
         else:
             return "COMMAND"
@@ -413,24 +555,160 @@ class Sandshark(object):
         reply_string = cmd + " AYE AYE"
         return reply_string
     
-    def __get_local_position(self):
+    def __get_local_position(self, latlon):
         # check that datum is in the same UTM zone, if not, shift datum
-        local_pos = utm.from_latlon(self.__latlon[0],
-                                    self.__latlon[1],
+        local_pos = utm.from_latlon(latlon[0],
+                                    latlon[1],
                                     force_zone_number=self.__datum_position[2],
                                     force_zone_letter=self.__datum_position[3])
         
         return (local_pos[0]-self.__datum_position[0], local_pos[1]-self.__datum_position[1])
     
-    def __update_latlon(self):
-        self.__latlon = utm.to_latlon(self.__position + self.__datum_position)
-        
-    def __rudder_hydro_effect(self):
-        for count, pos in enumerate(self.__rudder_history):
-            pass
+    # format the current state as an NMEA string
+    def __nvg_message(self):
+        msg = nvg_message(self.__timestamp,
+                          self.get_latlon(),
+                          self.__altitude,
+                          self.__depth,
+                          self.__state[STATE_HEADING],
+                          self.__roll,
+                          self.__pitch)
+        
+        print(f'{msg}\n')
+        return msg
         
-        return 0
-                
     #    
     ## done private helpers
-    ##################################
\ No newline at end of file
+    ##################################
+
+
+class SandsharkFleet(object):
+    """ Many independent simulated Sandsharks stepped together on one
+    (max_vehicles, STATE_SIZE) state array. Vehicles occupy slots; a free
+    slot is still integrated (standing still) but never reported
+    """
+    def __init__(self,
+                 max_vehicles=8,
+                 latlon=(0.0,0.0),
+                 depth=0.0,
+                 heading=0.0,
+                 datum=(0.0,0.0),
+                 physics_rate=None,
+                 nvg_rate=None):
+        
+        self.__timestamp = datetime.datetime.utcnow().timestamp()
+        
+        self.__state = np.zeros((max_vehicles, STATE_SIZE))
+        self.__active = np.zeros(max_vehicles, dtype=bool)
+        
+        self.__depth = depth
+        self.__altitude = 10
+        self.__pitch = 0.0
+        self.__roll = 0.0
+        
+        self.__datum = datum
+        self.__datum_position = utm.from_latlon(self.__datum[0], self.__datum[1])
+        start = utm.from_latlon(latlon[0],
+                                latlon[1],
+                                force_zone_number=self.__datum_position[2],
+                                force_zone_letter=self.__datum_position[3])
+        self.__start = (start[0]-self.__datum_position[0], start[1]-self.__datum_position[1], heading)
+        
+        self.__clock = PhysicsClock(physics_rate, nvg_rate)
+        
+        ## characteristic of vehicle
+        self.__MAX_SPEED_KNOTS = 5
+        self.__MAX_SPEED_MPS = self.__MAX_SPEED_KNOTS * 0.514444
+        self.__HARD_RUDDER_DEG = 25
+        self.__MAX_RPM = 2500
+        
+        self.__rudder_model = RudderModel(self.__clock.get_physics_dt(),
+                                          shape=(max_vehicles,),
+                                          hard_rudder_deg=self.__HARD_RUDDER_DEG,
+                                          max_speed_mps=self.__MAX_SPEED_MPS)
+        
+    # put a new vehicle at the start position; returns its slot, or None if the fleet is full
+    def add_vehicle(self):
+        free = np.flatnonzero(~self.__active)
+        if len(free) == 0:
+            return None
+        
+        slot = int(free[0])
+        self.__state[slot] = 0.0
+        self.__state[slot, STATE_X], self.__state[slot, STATE_Y], self.__state[slot, STATE_HEADING] = self.__start
+        self.__state[slot, STATE_BATTERY] = float('inf')
+        self.__rudder_model.reset(0.0, slot)
+        self.__active[slot] = True
+        
+        return slot
+    
+    def remove_vehicle(self, slot):
+        self.__active[slot] = False
+        self.__state[slot, STATE_SPEED] = 0.0
+        
+    def vehicle(self, slot):
+        return FleetVehicle(self, slot)
+        
+    def num_vehicles(self):
+        return int(np.count_nonzero(self.__active))
+    
+    def get_state_vectors(self):
+        return self.__state
+    
+    def set_rpm(self, slot, rpm):
+        if rpm >= 0 and rpm <= self.__MAX_RPM:
+            self.__state[slot, STATE_SPEED] = self.__MAX_SPEED_MPS * rpm / self.__MAX_RPM
+        else:
+            print(f"INVALID RPM REQUEST: {rpm}")
+        
+    def set_rudder(self, slot, rudder):
+        if np.abs(rudder) <= self.__HARD_RUDDER_DEG:
+            self.__state[slot, STATE_RUDDER] = rudder
+        else:
+            print(f"INVALID RUDDER REQUEST: {rudder}")
+    
+    # step every vehicle dt seconds; returns {slot: NVG report(s)} for the reports that fell due
+    def update_state(self, dt):
+        reports = dict()
+        for step in self.__clock.steps(dt):
+            self.__timestamp += step
+            self.__rudder_model.step(self.__state, step)
+            integrate_state(self.__state, step)
+            
+            if self.__clock.report_due(step):
+                slots = np.flatnonzero(self.__active)
+                if len(slots) == 0:
+                    continue
+                
+                # one vectorized conversion for the whole fleet
+                lat, lon = utm.to_latlon(self.__state[slots, STATE_X] + self.__datum_position[0],
+                                         self.__state[slots, STATE_Y] + self.__datum_position[1],
+                                         self.__datum_position[2],
+                                         self.__datum_position[3])
+                for i, slot in enumerate(slots.tolist()):
+                    msg = nvg_message(self.__timestamp,
+                                      (lat[i], lon[i]),
+                                      self.__altitude,
+                                      self.__depth,
+                                      self.__state[slot, STATE_HEADING],
+                                      self.__roll,
+                                      self.__pitch)
+                    reports[slot] = reports.get(slot, '') + msg
+                    
+        return reports
+
+class FleetVehicle(object):
+    """ Handle on one vehicle of a SandsharkFleet, with the Sandshark command interface
+    """
+    def __init__(self, fleet, slot):
+        self.__fleet = fleet
+        self.__slot = slot
+        
+    def get_slot(self):
+        return self.__slot
+        
+    def set_rpm(self, rpm):
+        self.__fleet.set_rpm(self.__slot, rpm)
+        
+    def set_rudder(self, rudder):
+        self.__fleet.set_rudder(self.__slot, rudder)
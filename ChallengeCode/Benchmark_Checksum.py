@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:02:37 2026
+
+NMEA checksums per second: XOR character by character (what
+NMEASentence.checksum and BluefinMessages.checksum used to do), the bytes fold
+in pynmea2's checksum.xor_checksum, and checksum.validate checking a whole
+buffer of sentences in one call, as NMEA_Loader does for each chunk.
+Before timing, validate is checked against commands from Bluefin_Encoder,
+whose checksums can be a single hex digit.
+
+python Benchmark_Checksum.py [sentences]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import operator
+from functools import reduce
+
+from pynmea2.pynmea2.checksum import xor_checksum, validate
+from Bluefin_Encoder import CommandEncoder
+
+SENTENCES = ("$BFNVG,120000.00,4218.000000,N,07106.000000,W,0,10.0,1.0,45.0,0.0,0.0,120000.00*",
+             "$BFNVR,120000.00,0.1,0.2,0.0,0.0,0.0,1.5*",
+             "$GPGGA,184353.07,1929.045,S,02410.506,E,1,04,2.6,100.00,M,-33.9,M,,0000*")
+
+def per_character(line):
+    star = line.rfind('*')
+    return reduce(operator.xor, map(ord, line[1:star]), 0) == int(line[star + 1:star + 3], 16)
+
+def folded(line):
+    star = line.rfind('*')
+    return xor_checksum(line[1:star]) == int(line[star + 1:star + 3], 16)
+
+# best of a few runs, the machine is rarely quiet
+def best_time(process, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        process()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    lines = [f"{s}{xor_checksum(s[1:-1]):02X}" for s in SENTENCES] * (count // len(SENTENCES))
+    buffer = ('\r\n'.join(lines) + '\r\n').encode()
+
+    assert all(per_character(line) for line in lines) and all(folded(line) for line in lines)
+    assert validate(buffer).all()
+
+    # the backseat's own commands, whose checksums are one hex digit below 0x10
+    commands = [CommandEncoder('BPLOG,{},{}').encode(0, key, state)
+                for key in ('ALL', 'NVG', 'NVR', 'DEP') for state in ('ON', 'OFF')]
+    commands += [CommandEncoder('BPRMB,{time},{},1,0,{},0,1').encode(1e9 + i * 0.37, i % 30 - 15, 750)
+                 for i in range(1000)]
+    assert validate(b''.join(commands)).all()
+    assert any(command.endswith(b'*8\n') for command in commands)
+
+    before = len(lines) / best_time(lambda: [per_character(line) for line in lines])
+    after = len(lines) / best_time(lambda: [folded(line) for line in lines])
+    batch = len(lines) / best_time(lambda: validate(buffer))
+    print(f"XOR per character:       {before:12.0f} sentences/s")
+    print(f"xor_checksum (fold):     {after:12.0f} sentences/s  ({after/before:.1f}x)")
+    print(f"validate (whole buffer): {batch:12.0f} sentences/s  ({batch/before:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 00:12:45 2026
+
+Memory and speed of a rolling window of recent sentences kept as pynmea2
+sentence objects (a __dict__, a data list of str, and the decoded field slots
+once a field has been read) and as CompactSentence (the sentence bytes and
+field offsets in __slots__).
+
+python Benchmark_Compact.py [window]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import collections
+import tracemalloc
+
+import BluefinMessages # registers the Bluefin sentence types with pynmea2
+from pynmea2 import pynmea2
+from pynmea2.pynmea2.compact import CompactSentence
+from Benchmark_Decoder import STREAM
+
+LINES = [str(line, 'utf-8') for line in STREAM.splitlines()] + \
+    ["$GPGGA,184353.07,1929.045,S,02410.506,E,1,04,2.6,100.00,M,-33.9,M,,0000*6D",
+     "$GPRMC,184353.07,A,1929.045,S,02410.506,E,0.13,309.62,120598,,*2C"]
+
+# bytes per sentence held by a full window, with or without reading a field
+def window_bytes(parse, lines, size, read):
+    window = collections.deque(maxlen=size)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(size):
+        sentence = parse(lines[i % len(lines)])
+        if read:
+            sentence.timestamp
+        window.append(sentence)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / size
+
+# best of a few runs, the machine is rarely quiet
+def rate(process, lines, repeats, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for line in lines:
+                process(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return repeats * len(lines) / best
+
+def read_two(sentence):
+    return sentence.timestamp, sentence.data[1]
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for line in LINES:
+        assert str(CompactSentence.parse(line)) == str(pynmea2.parse(line))
+
+    print(f"window of {size} sentences, bytes per sentence")
+    for read in (False, True):
+        full = window_bytes(pynmea2.parse, LINES, size, read)
+        compact = window_bytes(CompactSentence.parse, LINES, size, read)
+        print(f"  {'after reading a field' if read else 'as parsed':22s} "
+              f"pynmea2 {full:6.0f}   compact {compact:6.0f}  ({full/compact:.1f}x less)")
+
+    repeats = max(1, 20000 // len(LINES))
+    before = rate(pynmea2.parse, LINES, repeats)
+    after = rate(CompactSentence.parse, LINES, repeats)
+    print(f"parse:                    pynmea2 {before:8.0f}/s  compact {after:8.0f}/s")
+    before = rate(lambda line: read_two(pynmea2.parse(line)), LINES, repeats)
+    after = rate(lambda line: read_two(CompactSentence.parse(line)), LINES, repeats)
+    print(f"parse and read 2 fields:  pynmea2 {before:8.0f}/s  compact {after:8.0f}/s")
+
+if __name__ == '__main__':
+    main()
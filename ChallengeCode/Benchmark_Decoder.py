@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:07:51 2026
+
+Messages per second decoded by the backseat, from the framed sentence to the
+navigation state: BackSeat.process_message as it was before Bluefin_Decoder
+(decode to str, check the checksum one character at a time and compare hex
+strings, split on '*' and ',', float() each field, datetime for the fix time)
+against Bluefin_Decoder working on the framed bytes, with NMEA_Time for the
+fix time. Also Bluefin_Decoder.decode and pynmea2.parse on their own, for
+scale.
+
+python Benchmark_Decoder.py [messages]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import datetime
+
+import BluefinMessages
+from pynmea2 import pynmea2
+from NMEA_Framer import NMEAFramer
+from Bluefin_Decoder import BluefinDecoder, NVGRecord, NVRRecord, ACKRecord
+from NMEA_Time import NMEATimeOfDay
+
+def sentence(payload):
+    return f"${payload}*{BluefinMessages.checksum(payload):02X}\r\n".encode()
+
+# what the front seat sends: mostly navigation updates, some acks
+STREAM = (sentence("BFNVG,120000.00,4218.000000,N,07106.000000,W,0,10.0,1.0,45.0,0.0,0.0,120000.00") * 8 +
+          sentence("BFNVR,120000.00,0.1,0.2,0.0,0.0,0.0,1.5") +
+          sentence("BFACK,120000.02,RMB,120000.000,0,2,0,"))
+
+# BluefinMessages.checksum before pynmea2's checksum module
+def checksum(my_str):
+    cksum = 0
+    # checksum is bitwise XOR of ascii
+    for s in my_str:
+        cksum ^= ord(s)
+    
+    return cksum
+
+# the backseat's valid_checksum before Bluefin_Decoder, without the print on failure
+def valid_checksum(msg):
+    fields = msg.split('*')
+    cmd = fields[0][1:]
+    expected = str(hex(checksum(cmd))[2:])
+    return expected.upper() == fields[1].upper()
+
+def receive_nmea_latlon(latdeg, lathemi, londeg, lonhemi):
+    latitude = int(latdeg[0:2]) + float(latdeg[2:]) / 60
+    if lathemi == 'S':
+        latitude = -latitude
+    longitude = int(londeg[0:3]) + float(londeg[3:]) / 60
+    if lonhemi == 'W':
+        longitude = -longitude
+    return (latitude, longitude)
+
+def receive_nmea_time(hhmmss):
+    tm = datetime.datetime.utcnow()
+    return datetime.datetime(tm.year, tm.month, tm.day,
+                             int(hhmmss[0:2]), int(hhmmss[2:4]), int(hhmmss[4:6]), 0)
+
+# BackSeat.process_message before Bluefin_Decoder, from the framed sentence to
+# the values it kept, without the logging and the UTM conversion (the same
+# either way)
+def decode_str(frame, state):
+    msg = str(frame, 'utf-8')
+    if not valid_checksum(msg):
+        return False
+    
+    payld = msg.split('*')
+    fields = payld[0].split(',')
+    if fields[0] == '$BFNVG':
+        state['latlon'] = receive_nmea_latlon(fields[2], fields[3], fields[4], fields[5])
+        state['altitude'] = float(fields[7])
+        state['depth'] = float(fields[8])
+        state['heading'] = float(fields[9])
+        state['roll'] = float(fields[10])
+        state['pitch'] = float(fields[11])
+        state['last_fix_time'] = receive_nmea_time(fields[12])
+    elif fields[0] == '$BFNVR':
+        state['nvr'] = {'timestamp': fields[1],
+                        'east_velocity': float(fields[2]),
+                        'north_velocity': float(fields[3]),
+                        'down_velocity': float(fields[4]),
+                        'pitch_rate': float(fields[5]),
+                        'roll_rate': float(fields[6]),
+                        'yaw_rate': float(fields[7])}
+    elif fields[0] == '$BFACK':
+        state['ack'] = (fields[2], int(fields[5]), fields[7])
+    else:
+        return False
+    return True
+
+# the same with Bluefin_Decoder and the backseat's handlers, from the framed bytes
+def decode_bytes(decoder, nmea_time):
+    def decode(frame, state):
+        record = decoder.decode(frame)
+        if record is None:
+            return False
+        
+        kind = type(record)
+        if kind is NVGRecord:
+            state['latlon'] = (record.latitude, record.longitude)
+            state['altitude'] = record.altitude
+            state['depth'] = record.depth
+            state['heading'] = record.heading
+            state['roll'] = record.roll
+            state['pitch'] = record.pitch
+            state['last_fix_time'] = nmea_time.monotonic(record.fix_timestamp)
+        elif kind is NVRRecord:
+            state['nvr'] = record
+        elif kind is ACKRecord:
+            state['ack'] = (record.command_name, record.ack_status_code, record.ack_details)
+        return True
+    return decode
+
+def decode_pynmea2(frame):
+    return pynmea2.parse(str(frame, 'utf-8'), check=True)
+
+# best of a few runs, the machine is rarely quiet
+def rate(decode, frames, repeats, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(max(1, repeats // runs)):
+            for frame in frames:
+                decode(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return max(1, repeats // runs) * len(frames) / best
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    frames = NMEAFramer().feed(STREAM)
+    repeats = max(1, messages // len(frames))
+    decoder = BluefinDecoder()
+
+    decode = decode_bytes(decoder, NMEATimeOfDay())
+
+    # both must understand every sentence, with the same navigation state
+    before_state, after_state = dict(), dict()
+    for frame in frames:
+        assert decode_str(frame, before_state) and decode(frame, after_state)
+    assert before_state['latlon'] == after_state['latlon']
+    assert before_state['heading'] == after_state['heading']
+
+    state = dict()
+    before = rate(lambda frame: decode_str(frame, state), frames, repeats)
+    after = rate(lambda frame: decode(frame, state), frames, repeats)
+    print(f"process_message, str:     {before:10.0f} messages/s")
+    print(f"Bluefin_Decoder, bytes:   {after:10.0f} messages/s  ({after/before:.1f}x)")
+    print(f"decode() alone:           {rate(decoder.decode, frames, repeats):10.0f} messages/s")
+    print(f"pynmea2.parse:            {rate(decode_pynmea2, frames, max(1, repeats // 10)):10.0f} messages/s")
+    print(decoder.get_stats())
+
+if __name__ == '__main__':
+    main()
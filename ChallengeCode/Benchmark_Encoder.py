@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:48:10 2026
+
+Commands per second encoded by the backseat: the f-string path it used before
+(strftime for the timestamp, f-string, BluefinMessages.checksum of the whole
+command, then utf-8 bytes for the socket) against Bluefin_Encoder, for the
+BPRMB sent every loop and the BPSTS status message.
+
+python Benchmark_Encoder.py [commands]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import datetime
+
+import BluefinMessages
+from Bluefin_Encoder import CommandEncoder, COMMAND_TEMPLATES
+
+def rmb_fstring(now, rudder_angle, speed):
+    hhmmss = datetime.datetime.fromtimestamp(now).strftime('%H%M%S.%f')[:-4]
+    cmd = f"BPRMB,{hhmmss},{-rudder_angle},1,0,{speed},0,1"
+    msg = f"${cmd}*{hex(BluefinMessages.checksum(cmd))[2:]}\n"
+    return bytes(msg, 'utf-8')
+
+def sts_fstring(now):
+    hhmmss = datetime.datetime.fromtimestamp(now).strftime('%H%M%S.%f')[:-4]
+    return bytes(BluefinMessages.BPSTS(hhmmss, 1, 'BWSI Autonomy OK'), 'utf-8')
+
+# best of a few runs, the machine is rarely quiet
+def rate(encode, times, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for now in times:
+            encode(now)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(times) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    # a 10 Hz control loop
+    start = time.time()
+    times = [start + i * 0.1 for i in range(count)]
+    rmb = CommandEncoder('BPRMB,{time},{},1,0,{},0,1')
+    sts = CommandEncoder(COMMAND_TEMPLATES['BPSTS'].replace('{},{}', '1,BWSI Autonomy OK'))
+
+    for now in times[:1000]:
+        assert rmb.encode(now, -12.5, 750) == rmb_fstring(now, 12.5, 750)
+        assert sts.encode(now) == sts_fstring(now)
+
+    before = rate(lambda now: rmb_fstring(now, 12.5, 750), times)
+    after = rate(lambda now: rmb.encode(now, -12.5, 750), times)
+    print(f"BPRMB f-string:      {before:10.0f} commands/s")
+    print(f"BPRMB encoder:       {after:10.0f} commands/s  ({after/before:.1f}x)")
+
+    before = rate(sts_fstring, times)
+    after = rate(sts.encode, times)
+    print(f"BPSTS f-string:      {before:10.0f} commands/s")
+    print(f"BPSTS encoder:       {after:10.0f} commands/s  ({after/before:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:03:26 2026
+
+Parsing and field access in pynmea2 across all the talker sentence types in
+types/talker.py.
+
+Splitting a line: sentence_re and talker_re, as NMEASentence.parse used to for
+every line, against the split_talker fast path it now tries first.
+
+Field access: a sentence is parsed, then every field is read twice. Compares
+converting a field on every read (what NMEASentence.__getattr__ used to do)
+with the per-class decoders, which convert all fields on the first read and
+then load them from slots. With every field read twice that is about 1.1x
+here; the decoders gain more the more often a sentence's fields are read.
+
+python Benchmark_Pynmea2.py [sentences per type]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+
+from pynmea2 import pynmea2
+from pynmea2.pynmea2.types import talker
+
+# values tried, in order, until the field's converter accepts one
+_SAMPLES = ('123519.00', '230394', '12.5', '3', 'A')
+
+def sample_value(field):
+    if len(field) < 3:
+        return 'A'
+    for value in _SAMPLES:
+        try:
+            field[2](value)
+            return value
+        except Exception:
+            continue
+    return ''
+
+def talker_sentences():
+    sentences = list()
+    for name in sorted(vars(talker)):
+        cls = getattr(talker, name)
+        if isinstance(cls, type) and issubclass(cls, pynmea2.nmea.TalkerSentence) \
+                and cls.__module__ == talker.__name__:
+            data = [sample_value(field) for field in cls.fields]
+            sentences.append(str(cls('GP', name, data)))
+    return sentences
+
+# NMEASentence.__getattr__ before the decoders: convert on every read
+def read_field(sentence, name):
+    t = type(sentence)
+    i = t.name_to_idx[name]
+    f = t.fields[i]
+    v = sentence.data[i] if i < len(sentence.data) else ''
+    if len(f) >= 3:
+        if v == '':
+            return None
+        try:
+            return f[2](v)
+        except:
+            return v
+    return v
+
+def split_regex(line):
+    match = pynmea2.NMEASentence.sentence_re.match(line)
+    talker = pynmea2.NMEASentence.talker_re.match(match.group('sentence_type').upper())
+    return match.group('nmea_str'), match.group('data'), match.group('checksum'), talker.group('sentence')
+
+def per_read(sentence):
+    for _ in range(2):
+        for name in type(sentence).name_to_idx:
+            read_field(sentence, name)
+
+def decoded(sentence):
+    for _ in range(2):
+        for name in type(sentence).name_to_idx:
+            getattr(sentence, name)
+
+def rate(process, lines, repeats, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for line in lines:
+                process(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return repeats * len(lines) / best
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    lines = talker_sentences()
+    for line in lines:
+        assert pynmea2.NMEASentence.split_talker(line) is not None, line
+        sentence = pynmea2.parse(line)
+        for name in type(sentence).name_to_idx:
+            assert getattr(sentence, name) == read_field(sentence, name), (line, name)
+
+    print(f"{len(lines)} talker sentence types, split each line")
+    before = rate(split_regex, lines, repeats)
+    after = rate(pynmea2.NMEASentence.split_talker, lines, repeats)
+    print(f"sentence_re and talker_re: {before:10.0f} sentences/s")
+    print(f"split_talker:              {after:10.0f} sentences/s  ({after/before:.1f}x)")
+
+    print(f"{len(lines)} talker sentence types, parse and read every field twice")
+    parse_only = rate(pynmea2.parse, lines, repeats)
+    before = rate(lambda line: per_read(pynmea2.parse(line)), lines, repeats)
+    after = rate(lambda line: decoded(pynmea2.parse(line)), lines, repeats)
+    print(f"parse only:                {parse_only:10.0f} sentences/s")
+    print(f"convert on every read:     {before:10.0f} sentences/s")
+    print(f"decode once, read slots:   {after:10.0f} sentences/s  ({after/before:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:22 2026
+
+Benchmark the front seat SandsharkServer: CPU used by the server thread while
+a backseat is connected but nothing is sent, and the latency of messages in
+each direction.
+
+python Benchmark_Server.py [port] [idle seconds] [messages]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import socket
+import threading
+
+import numpy as np
+
+from Sandshark_Interface import SandsharkServer
+
+def percentiles(samples):
+    p50, p95, p99 = np.percentile(np.array(samples) * 1e6, [50, 95, 99])
+    return f"p50 {p50:8.1f} us   p95 {p95:8.1f} us   p99 {p99:8.1f} us"
+
+def idle_cpu(seconds):
+    start_cpu = time.process_time()
+    start = time.monotonic()
+    time.sleep(seconds)
+    return (time.process_time() - start_cpu) / (time.monotonic() - start)
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 29500
+    idle_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    num_messages = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    server = SandsharkServer(host="localhost", port=port)
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+
+    backseat = socket.create_connection(("localhost", port))
+    backseat.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    backseat.settimeout(5.0)
+
+    try:
+        print(f"idle CPU, backseat connected: {100*idle_cpu(idle_seconds):.1f}% of one core")
+
+        # front seat -> backseat: time from send_command() to the backseat's recv()
+        down = list()
+        remain = b''
+        for i in range(num_messages):
+            sent = time.perf_counter()
+            server.send_command(f"$BFNVG,{i}*00\r\n")
+            while b'\n' not in remain:
+                remain += backseat.recv(1024)
+            down.append(time.perf_counter() - sent)
+            remain = remain.split(b'\n', 1)[1]
+        print(f"front seat -> backseat: {percentiles(down)}")
+
+        # backseat -> front seat: time from send() until receive_mail() returns it
+        up = list()
+        for i in range(num_messages):
+            sent = time.perf_counter()
+            backseat.send(f"$BPSTS,{i}*00\r\n".encode())
+            while len(server.receive_mail()) == 0:
+                pass
+            up.append(time.perf_counter() - sent)
+        print(f"backseat -> front seat: {percentiles(up)}")
+
+        print(f"idle CPU after traffic: {100*idle_cpu(idle_seconds):.1f}% of one core")
+    finally:
+        backseat.close()
+        server.cleanup()
+        server_thread.join()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 01:24:18 2026
+
+Time decodes per second: the backseat's receive_nmea_time before NMEA_Time
+(datetime.utcnow() and a new datetime per navigation update) against
+NMEATimeOfDay.
+
+With a new time of day every decode, parsing the digits in Python costs about
+as much as the datetime it replaces, so the two run about even; that is the
+figure to expect in general. NMEATimeOfDay is only faster when the time of day
+repeats, as the fix time of navigation updates does between GPS fixes, which
+is shown second.
+
+python Benchmark_Time.py [decodes]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import datetime
+
+from NMEA_Time import NMEATimeOfDay
+
+def receive_nmea_time(hhmmss):
+    tm = datetime.datetime.utcnow()
+    return datetime.datetime(tm.year, tm.month, tm.day,
+                             int(hhmmss[0:2]), int(hhmmss[2:4]), int(hhmmss[4:6]), 0)
+
+# best of a few runs, the machine is rarely quiet
+def rate(decode, stamps, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        for stamp in stamps:
+            decode(stamp)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(stamps) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    # a 10 Hz navigation stream, as the bytes Bluefin_Decoder keeps
+    start = 12 * 3600
+    stamps = [b'%02d%02d%05.2f' % (t // 3600, t // 60 % 60, t % 60)
+              for t in (start + i / 10 for i in range(count))]
+    day = NMEATimeOfDay()
+
+    # and the fix time of those updates, which changes once a minute (a GPS fix
+    # each time the vehicle surfaces)
+    fixes = [stamps[i - i % 600] for i in range(count)]
+
+    for name, times in (('new time of day every decode', stamps),
+                        ('repeated fix time (only between GPS fixes)', fixes)):
+        before = rate(receive_nmea_time, times)
+        after = rate(day.decode, times)
+        monotonic = rate(day.monotonic, times)
+        print(f"{name}:")
+        print(f"  utcnow() and datetime:    {before:10.0f} decodes/s")
+        print(f"  NMEATimeOfDay.decode:     {after:10.0f} decodes/s  ({after/before:.1f}x)")
+        print(f"  NMEATimeOfDay.monotonic:  {monotonic:10.0f} decodes/s  ({monotonic/before:.1f}x)")
+
+if __name__ == '__main__':
+    main()
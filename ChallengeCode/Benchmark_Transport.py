@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:52:03 2026
+
+Compare the SandsharkServer / SandsharkClient transports on the exchange the
+seats actually have: the front seat sends a BFNVG, the backseat answers with
+a BPRMB. Reports the round trip latency, and the BFNVG throughput when the
+front seat sends as fast as it can.
+
+python Benchmark_Transport.py [port] [round trips] [seconds of throughput]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import threading
+
+import numpy as np
+
+from Sandshark_Interface import SandsharkServer, SandsharkClient, TRANSPORTS
+
+NVG = "$BFNVG,120000.00,4218.000000,N,07106.000000,W,0,10.0,1.0,45.0,0.0,0.0,120000.00*5C\r\n"
+RMB = "$BPRMB,120000.00,-5.0,1,0,750,0,1*67\n"
+
+def wait_for_mail(mailbox):
+    while True:
+        mail = mailbox.receive_mail()
+        if len(mail) > 0:
+            return mail
+        time.sleep(0)
+
+def benchmark(transport, port, round_trips, seconds):
+    server = SandsharkServer(host="localhost", port=port, transport=transport)
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+
+    client = SandsharkClient(host="localhost", port=port, transport=transport)
+    client_thread = threading.Thread(target=client.run)
+    client_thread.start()
+
+    try:
+        # the front seat only knows a udp backseat once it has heard from it
+        time.sleep(0.1)
+
+        latency = list()
+        for i in range(round_trips):
+            start = time.perf_counter()
+            server.send_command(NVG)
+            wait_for_mail(client)
+            client.send_message(RMB)
+            client.flush()
+            wait_for_mail(server)
+            latency.append(time.perf_counter() - start)
+
+        received = client.get_stats()['messages_received']
+        end = time.monotonic() + seconds
+        sent = 0
+        while time.monotonic() < end:
+            for i in range(100):
+                server.send_command(NVG)
+            sent += 100
+            time.sleep(0)
+        time.sleep(0.2)
+        received = client.get_stats()['messages_received'] - received
+
+        p50, p95, p99 = np.percentile(np.array(latency) * 1e6, [50, 95, 99])
+        print(f"{transport:5s}  round trip p50 {p50:7.1f} us  p95 {p95:7.1f} us  p99 {p99:7.1f} us"
+              f"  |  {received / seconds:9.0f} BFNVG/s delivered of {sent / seconds:9.0f} sent")
+    finally:
+        client.cleanup()
+        client_thread.join()
+        server.cleanup()
+        server_thread.join()
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 29500
+    round_trips = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    for i, transport in enumerate(TRANSPORTS):
+        benchmark(transport, port + i, round_trips, seconds)
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ Created on Sat Jul 17 10:27:35 2021
 from pynmea2 import pynmea2
 from pynmea2.pynmea2 import TalkerSentence
 from pynmea2.pynmea2.nmea_utils import timestamp
+from pynmea2.pynmea2.checksum import xor_checksum
 
 _TIMESTAMP_ = (
         ('Timestamp', 'timestamp', timestamp),
@@ -331,12 +332,8 @@ class DTL(TalkerSentence):
 # as a BF message but are BP messages, with a different format. Also to control
 # the print format
 def checksum(my_str):
-    cksum = 0
     # checksum is bitwise XOR of ascii
-    for s in my_str:
-        cksum ^= ord(s)
-    
-    return cksum
+    return xor_checksum(my_str)
 
 def str_to_cmd(msg_str):
     return f"${msg_str}*{hex(checksum(msg_str))[2:]}\n"
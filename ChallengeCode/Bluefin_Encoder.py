@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:31:52 2026
+
+Encoder for the BP* commands the backseat sends, the counterpart of
+Bluefin_Decoder. A CommandEncoder is built once from a template such as
+
+    'BPRMB,{time},{},1,0,{},0,1'
+
+(str.format fields, {time} being the command's hhmmss.ss timestamp). The
+constant text of the template is encoded once and its XOR kept, so encoding a
+command only formats the values, XORs them into the checksum and writes the
+pieces into a bytearray that is reused from one command to the next.
+
+The timestamp is written from epoch seconds as
+datetime.fromtimestamp(t).strftime('%H%M%S.%f')[:-4] would (local time,
+truncated to hundredths), with the hour and minute looked up once a minute and
+the seconds done in integers. The sentence ends as BluefinMessages.str_to_cmd
+ends it, '*' + hex(checksum)[2:] + '\n', so the bytes are the same as the
+f-string commands the backseat used to send.
+
+@author: Team Baygulls
+"""
+import time
+import string
+
+from pynmea2.pynmea2.checksum import xor_checksum
+
+# the templates of the commands in BluefinMessages; BPRMB as the front seat
+# parses it (heading, depth, depth mode, speed, speed mode, heading mode)
+COMMAND_TEMPLATES = {
+    'BPLOG': 'BPLOG,{},{}',
+    'BPSTS': 'BPSTS,{time},{},{}',
+    'BPTOP': 'BPTOP,{time},{},{},0',
+    'BPTRK': 'BPTRK,{time},{:05d},{:.2f},{},{:.2f},{},{:.2f},{},{:.2f},{},{},{:.1f},{:.1f},{},{}',
+    'BPTRC': 'BPTRC,{time},{:05d},{:.2f},{},{:.2f},{},{:.1f},{:.1f},{},{:.1f},{:.1f},{},{:.1f},{}',
+    'BPRCN': 'BPRCN,{time},{:05d}',
+    'BPRCA': 'BPRCA,{time}',
+    'BPRCB': 'BPRCB,{time},0',
+    'BPRCE': 'BPRCE,{time},0',
+    'BPRMB': 'BPRMB,{time},{},{},{},{},{},{}',
+    'BPABT': 'BPABT,{time},{}',
+    'BPKIL': 'BPKIL,{time},{}',
+    'BPMSG': 'BPMSG,{time},{}',
+    'BPRMP': 'BPRMP,{time}',
+    'BPSIL': 'BPSIL,{time},{}',
+    'BPVER': 'BPVER,{time},{}',
+    'BPLIT': 'BPLIT,{time},1,{}',
+}
+
+_TWO_DIGITS = [b'%02d' % i for i in range(100)]
+_CHECKSUM_END = [b'*%x\n' % i for i in range(256)] # as hex(checksum)[2:]
+
+## ---------------------------------------------------------------------------
+## hhmmss.ss of epoch seconds, in local time
+## ---------------------------------------------------------------------------
+class NMEAClock():
+    def __init__(self):
+        self.__minute = None
+        self.__hhmm = b''
+
+    def format(self, timestamp):
+        seconds = int(timestamp)
+        # rounded to microseconds first, as datetime.fromtimestamp does
+        micro = round((timestamp - seconds) * 1e6)
+        if micro >= 1000000:
+            seconds += 1
+            micro -= 1000000
+
+        # UTC offsets are whole minutes, so local minutes start with epoch minutes
+        minute = seconds // 60
+        if minute != self.__minute:
+            local = time.localtime(seconds)
+            self.__hhmm = _TWO_DIGITS[local.tm_hour] + _TWO_DIGITS[local.tm_min]
+            self.__minute = minute
+        return b'%s%s.%s' % (self.__hhmm, _TWO_DIGITS[seconds % 60], _TWO_DIGITS[micro // 10000])
+
+## ---------------------------------------------------------------------------
+## One command template -> $<command>*hh\n bytes
+## ---------------------------------------------------------------------------
+class CommandEncoder():
+    def __init__(self, template, clock=None):
+        if template.startswith('$'):
+            template = template[1:]
+        self.__clock = NMEAClock() if clock is None else clock
+
+        literals = list()
+        self.__specs = list() # None for the timestamp, else a format spec
+        for literal, name, spec, conversion in string.Formatter().parse(template):
+            literals.append(literal.encode())
+            if name is not None:
+                if conversion is not None or (name and name != 'time'):
+                    raise ValueError(f"unsupported field {{{name}}} in {template!r}")
+                self.__specs.append(None if name == 'time' else spec)
+        if len(literals) == len(self.__specs):
+            literals.append(b'')
+
+        self.__first = b'$' + literals[0]
+        self.__literals = literals[1:] # the text after each field
+        self.__constant_xor = xor_checksum(b''.join(literals))
+        self.__values = sum(spec is not None for spec in self.__specs)
+        self.__buffer = bytearray()
+        self.name = str(literals[0][:5], 'ascii')
+
+    # the command with its checksum and newline, from the timestamp (epoch
+    # seconds, ignored by templates without {time}) and the other field values
+    def encode(self, timestamp, *values):
+        if len(values) != self.__values:
+            raise TypeError(f"{self.name} takes {self.__values} values, {len(values)} given")
+
+        out = self.__buffer
+        out[:] = self.__first
+        variable = list()
+        i = 0
+        for spec, literal in zip(self.__specs, self.__literals):
+            if spec is None:
+                piece = self.__clock.format(timestamp)
+            else:
+                piece = format(values[i], spec).encode()
+                i += 1
+            variable.append(piece)
+            out += piece
+            out += literal
+
+        out += _CHECKSUM_END[self.__constant_xor ^ xor_checksum(b''.join(variable))]
+        return bytes(out)
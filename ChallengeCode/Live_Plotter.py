@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:47 2026
+
+Live view of the simulated vehicle, drawn in its own process so the front
+seat simulation never waits on matplotlib.
+
+The front seat writes the latest position and track into shared memory
+(guarded by a sequence counter, so a write never blocks and never waits on
+the reader); the plot process picks up whatever is newest when it is time
+for a frame, so intermediate updates are simply dropped. Buoy changes go
+over a one-slot queue. Frames are blitted: the buoys are only redrawn when
+the view has to be recentred.
+
+@author: Team Baygulls
+"""
+import time
+import multiprocessing
+import queue
+
+import numpy as np
+
+# layout of the shared update: [sequence, x, y, track length, track x/y pairs...]
+_SEQ = 0
+_X = 1
+_Y = 2
+_NTRACK = 3
+_TRACK = 4
+
+class LivePlotter():
+    def __init__(self, green_buoys, red_buoys, track_length=10, max_fps=10, view_size=20):
+        self.__track_length = track_length
+        self.__shared = multiprocessing.RawArray('d', _TRACK + 2*track_length)
+        self.__buoys = multiprocessing.Queue(maxsize=1)
+        self.__stop = multiprocessing.Event()
+        self.__process = multiprocessing.Process(target=_plot_loop,
+                                                 args=(self.__shared, self.__buoys, self.__stop,
+                                                       np.asarray(green_buoys), np.asarray(red_buoys),
+                                                       max_fps, view_size),
+                                                 daemon=True)
+
+    def start(self):
+        self.__process.start()
+
+    def is_alive(self):
+        return self.__process.is_alive()
+
+    # publish the newest position and track; never blocks
+    def update(self, position, track=()):
+        shared = self.__shared
+        track = track[-self.__track_length:]
+
+        seq = shared[_SEQ]
+        shared[_SEQ] = seq + 1 # odd while writing
+        shared[_X] = position[0]
+        shared[_Y] = position[1]
+        shared[_NTRACK] = len(track)
+        for i, (x, y) in enumerate(track):
+            shared[_TRACK + 2*i] = x
+            shared[_TRACK + 2*i + 1] = y
+        shared[_SEQ] = seq + 2
+
+    # replace the buoy positions; an update the plotter has not picked up yet is dropped
+    def update_buoys(self, green_buoys, red_buoys):
+        try:
+            self.__buoys.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            self.__buoys.put_nowait((np.asarray(green_buoys), np.asarray(red_buoys)))
+        except queue.Full:
+            pass
+
+    def stop(self):
+        self.__stop.set()
+        self.__process.join(timeout=1)
+        if self.__process.is_alive():
+            self.__process.terminate()
+
+def _read_update(shared, last_seq):
+    # retry until we get a consistent copy; returns None if nothing is new
+    while True:
+        seq = shared[_SEQ]
+        if seq == last_seq:
+            return None
+
+        if seq % 2 == 1:
+            time.sleep(0)
+            continue
+
+        ntrack = int(shared[_NTRACK])
+        position = (shared[_X], shared[_Y])
+        track = np.array(shared[_TRACK:_TRACK + 2*ntrack]).reshape((ntrack, 2))
+        if shared[_SEQ] == seq:
+            return seq, position, track
+
+def _plot_loop(shared, buoys, stop, green_buoys, red_buoys, max_fps, view_size):
+    # only the plot process pays for matplotlib
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    ax.set_aspect('equal')
+
+    green_plot, = ax.plot([], [], 'go')
+    red_plot, = ax.plot([], [], 'ro')
+    track_plot, = ax.plot([], [], 'k', animated=True)
+
+    def set_buoys(green, red):
+        green = green.reshape((-1, 2))
+        red = red.reshape((-1, 2))
+        green_plot.set_data(green[:,0], green[:,1])
+        red_plot.set_data(red[:,0], red[:,1])
+
+    set_buoys(green_buoys, red_buoys)
+
+    background = [None]
+    def capture_background(event=None):
+        background[0] = fig.canvas.copy_from_bbox(ax.bbox)
+    fig.canvas.mpl_connect('draw_event', capture_background)
+
+    def recentre(position):
+        half = view_size / 2.0
+        ax.set_xlim(position[0] - half, position[0] + half)
+        ax.set_ylim(position[1] - half, position[1] + half)
+        fig.canvas.draw() # recaptures the background
+
+    plt.show(block=False)
+
+    frame_time = 1.0 / max_fps
+    last_seq = None
+    centre = None
+    while not stop.is_set() and plt.fignum_exists(fig.number):
+        start = time.monotonic()
+
+        try:
+            green, red = buoys.get_nowait()
+            set_buoys(green, red)
+            centre = None # force a full redraw
+        except queue.Empty:
+            pass
+
+        update = _read_update(shared, last_seq)
+        if update is not None:
+            last_seq, position, track = update
+
+            # only redraw the static parts when the vehicle leaves the middle of the view
+            if centre is None or np.max(np.abs(np.subtract(position, centre))) > view_size / 4.0:
+                centre = position
+                recentre(centre)
+
+            fig.canvas.restore_region(background[0])
+            track_plot.set_data(track[:,0], track[:,1])
+            ax.draw_artist(track_plot)
+            fig.canvas.blit(ax.bbox)
+
+        fig.canvas.flush_events()
+
+        # cap the frame rate
+        remaining = frame_time - (time.monotonic() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    plt.close(fig)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 00:41:06 2026
+
+Message handler registry for the backseat: each sentence tag (b'BFNVG') maps
+to the handlers subscribed to it, so dispatching a decoded record is one dict
+lookup instead of a chain of type tests, and the controller or a state
+estimator can subscribe to a message type without touching the backseat loop.
+
+Every handler has its call count, errors and cumulative run time in
+get_stats(). Sentences no handler is subscribed to are counted per tag and
+logged at most once every report_interval seconds per tag, with the number
+seen since the last report, instead of once per message.
+
+@author: Team Baygulls
+"""
+import time
+
+# b'BFNVG' for 'BFNVG' or b'BFNVG'
+def _tag(tag):
+    return tag if isinstance(tag, bytes) else bytes(tag, 'ascii')
+
+def _handler_name(tag, handler):
+    return f"{str(tag, 'ascii')}:{getattr(handler, '__qualname__', repr(handler))}"
+
+class MessageRegistry():
+    def __init__(self, logger=None, report_interval=10.0):
+        self.__logger = logger
+        self.__report_interval = report_interval
+        self.__handlers = dict() # tag -> tuple of (handler, stats)
+        self.__stats = dict()    # handler name -> {'calls', 'errors', 'seconds'}
+        self.__unknown = dict()  # tag -> {'count', 'reported', 'last_report'}
+
+    # call handler(record) for every record of this tag, after the handlers
+    # already subscribed to it
+    def subscribe(self, tag, handler):
+        tag = _tag(tag)
+        name = _handler_name(tag, handler)
+        stats = self.__stats.setdefault(name, dict([
+            ('calls', 0),
+            ('errors', 0),
+            ('seconds', 0.0),
+        ]))
+        self.__handlers[tag] = self.__handlers.get(tag, ()) + ((handler, stats),)
+        return handler
+
+    def unsubscribe(self, tag, handler):
+        tag = _tag(tag)
+        handlers = tuple(entry for entry in self.__handlers.get(tag, ()) if entry[0] != handler)
+        if handlers:
+            self.__handlers[tag] = handlers
+        else:
+            self.__handlers.pop(tag, None)
+
+    def handles(self, tag):
+        return _tag(tag) in self.__handlers
+
+    # hand the record to the handlers of its tag; False if there are none.
+    # A handler that raises is logged and counted, and the others still run.
+    def dispatch(self, tag, record):
+        handlers = self.__handlers.get(tag)
+        if handlers is None:
+            self.unknown(tag)
+            return False
+
+        for handler, stats in handlers:
+            start = time.perf_counter()
+            try:
+                handler(record)
+            except Exception:
+                stats['errors'] += 1
+                if self.__logger is not None:
+                    self.__logger.error(f"Handler {_handler_name(tag, handler)} failed on {record}",
+                                        exc_info=True)
+            stats['seconds'] += time.perf_counter() - start
+            stats['calls'] += 1
+        return True
+
+    # a sentence of a type nobody handles: counted, and logged the first time
+    # and then at most once per report_interval
+    def unknown(self, tag):
+        entry = self.__unknown.get(tag)
+        if entry is None:
+            entry = self.__unknown[tag] = dict([
+                ('count', 0),
+                ('reported', 0),
+                ('last_report', None),
+            ])
+        entry['count'] += 1
+
+        now = time.monotonic()
+        if entry['last_report'] is not None and now - entry['last_report'] < self.__report_interval:
+            return
+        if self.__logger is not None:
+            if entry['last_report'] is None:
+                self.__logger.warning(f"I do not know how to process this message type: {tag}")
+            else:
+                self.__logger.warning(f"I do not know how to process this message type: {tag} "
+                                      f"({entry['count'] - entry['reported']} since the last report)")
+        entry['reported'] = entry['count']
+        entry['last_report'] = now
+
+    # {'handlers': {'BFNVG:BackSeat.on_nvg': {'calls', 'errors', 'seconds'}},
+    #  'unknown': {b'BFXYZ': count}}
+    def get_stats(self):
+        return dict([
+            ('handlers', dict((name, dict(stats)) for name, stats in self.__stats.items())),
+            ('unknown', dict((tag, entry['count']) for tag, entry in self.__unknown.items())),
+        ])
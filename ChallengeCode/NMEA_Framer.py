@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:48:10 2026
+
+Incremental framer for the NMEA sentences exchanged between the front seat
+and the backseat. Received bytes are copied once into a preallocated buffer of
+chunk_size bytes as they arrive, and complete sentences come back as
+memoryview slices of it, without the line ending:
+$<talker><type>,...*<1-2 hex digits>
+
+The framer keeps a read offset (the start of the partial line) and a write
+offset into the buffer, so nothing already there is moved when a frame is
+handed out. Frames keep pointing into the buffer, which therefore never
+changes size and is never written over: only once it is full does the framer
+start a new one, copying just the partial line (never more than max_length
+bytes). Lines without a $...*HH sentence are dropped and counted as malformed;
+lines longer than max_length are dropped and counted as oversized.
+
+@author: Team Baygulls
+"""
+
+_HEX_DIGITS = frozenset(b'0123456789abcdefABCDEF')
+
+class NMEAFramer():
+    def __init__(self, max_length=256, chunk_size=16384):
+        self.__max_length = max_length
+        self.__chunk_size = max(chunk_size, 4 * max_length)
+        self.__buffer = bytearray(self.__chunk_size)
+        self.__start = 0   # the partial line starts here
+        self.__end = 0     # and the bytes received end here
+        self.__scanned = 0 # no newline before this offset
+        self.__discarding = False # dropping the rest of an oversized line
+
+        self.__stats = dict([
+            ('bytes', 0),
+            ('frames', 0),
+            ('malformed', 0),
+            ('oversized', 0),
+        ])
+
+    # add received bytes, returns the list of sentences they completed
+    def feed(self, data):
+        n = len(data)
+        self.__stats['bytes'] += n
+
+        buffer = self.__buffer
+        start = self.__start
+        stop = self.__end
+        scanned = self.__scanned
+        if stop + n > len(buffer):
+            # full: the frames handed out keep the old buffer, and only the
+            # partial line moves to the new one
+            partial = stop - start
+            buffer = bytearray(max(self.__chunk_size, partial + n))
+            buffer[:partial] = self.__buffer[start:stop]
+            scanned -= start
+            start, stop = 0, partial
+            self.__buffer = buffer
+        buffer[stop:stop + n] = data # same size, so allowed while frames point into it
+        stop += n
+
+        frames = list()
+        view = None
+        end = buffer.find(b'\n', scanned, stop)
+        while end >= 0:
+            if self.__discarding:
+                self.__discarding = False # this newline ends the oversized line
+            elif end - start > self.__max_length:
+                self.__stats['oversized'] += 1
+            else:
+                frame = self.__find_sentence(buffer, start, end)
+                if frame is not None:
+                    if view is None:
+                        view = memoryview(buffer)
+                    frames.append(view[frame[0]:frame[1]])
+
+            start = end + 1
+            end = buffer.find(b'\n', start, stop)
+
+        # give up on a partial line that is already too long
+        if stop - start > self.__max_length:
+            if not self.__discarding:
+                self.__stats['oversized'] += 1
+                self.__discarding = True
+            start = stop
+
+        self.__start = start
+        self.__end = stop
+        self.__scanned = stop
+
+        self.__stats['frames'] += len(frames)
+        return frames
+
+    def get_stats(self):
+        return dict(self.__stats)
+
+    # (start, end) of the sentence on the line buffer[start:end], or None
+    def __find_sentence(self, buffer, start, end):
+        if end > start and buffer[end - 1] == 13: # \r
+            end -= 1
+        if end == start:
+            return None # blank line
+
+        # resynchronise on the last $; anything before it is noise
+        dollar = buffer.rfind(b'$', start, end)
+        if dollar > start:
+            self.__stats['malformed'] += 1
+        if dollar < 0:
+            self.__stats['malformed'] += 1
+            return None
+
+        star = buffer.rfind(b'*', dollar, end)
+        if star < 0 or not 1 <= end - star - 1 <= 2:
+            self.__stats['malformed'] += 1
+            return None
+
+        for digit in buffer[star + 1:end]:
+            if digit not in _HEX_DIGITS:
+                self.__stats['malformed'] += 1
+                return None
+
+        return dollar, end
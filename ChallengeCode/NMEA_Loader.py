@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:14:09 2026
+
+Bulk loader for NMEA logs: instead of one NMEASentence object per line (what
+pynmea2's NMEAFile.read gives), every talker sentence type in the log becomes
+one NumPy structured array, with a column per field. Bluefin sentences are
+keyed by their whole identifier ('BFNVG', 'BPRMB'), since backseat commands
+share their 3-letter type with other NMEA sentences ($BPRMB is not $GPRMB);
+other talkers by the sentence type ('GGA'). The column types come from the
+`fields` declarations of the pynmea2 sentence classes, the BF ones from
+BluefinMessages:
+
+    float, int, Decimal   float64 / int64 / float64
+    timestamp             float64, seconds of the day (hhmmss.ss)
+    datestamp             datetime64[D]
+    anything else         bytes, as wide as the longest value
+
+BP commands have no sentence classes: their columns follow
+Bluefin_Encoder.COMMAND_TEMPLATES, with the time as 'timestamp' and the other
+fields as bytes columns field_2, field_3, ...
+
+Empty or unreadable values are NaN (NaT for dates, INT_MISSING for ints, b''
+for bytes). Each array also has a 'talker' column ('BF' of $BFNVG).
+
+A sentence runs from a '$' to the next '$' or the end of the line, so a log
+line holding several (the backseat logs what it received as a list of them)
+gives each one; text before the first '$' of a line is skipped. Sentences are
+counted as loaded, bad_checksum, unknown or malformed one by one, and a line
+without any '$' counts as one malformed.
+
+The file is read in chunks of chunk_size bytes split on the last newline, the
+checksums of a chunk are validated together (pynmea2's checksum.validate), and
+each chunk is turned into column arrays that are written straight into the
+result arrays before the next is read. Those grow in place (realloc) by a
+quarter at a time and are trimmed to their rows at the end, so the memory used
+beyond the result is about one chunk plus at most a quarter of the result. A
+bytes column that meets a longer value than it holds is widened, which copies
+its array; the new width is rounded up to a power of two so that this stays
+rare. With workers > 1 the file is cut at newlines into ranges that are loaded
+in parallel processes, and the range results are appended to the result in
+file order, each freed as soon as it is in.
+
+python NMEA_Loader.py <log> [workers] [compare]
+
+@author: Team Baygulls
+"""
+import sys
+import os
+import time
+import decimal
+import concurrent.futures
+
+import numpy as np
+
+import BluefinMessages # registers the Bluefin sentence types with pynmea2
+from Bluefin_Encoder import COMMAND_TEMPLATES
+from NMEA_Framer import NMEAFramer
+from pynmea2 import pynmea2
+from pynmea2.pynmea2 import nmea_utils
+from pynmea2.pynmea2.checksum import validate
+
+INT_MISSING = np.iinfo(np.int64).min
+
+# column kind of a field converter
+_KINDS = {float: 'float', decimal.Decimal: 'float', int: 'int',
+          nmea_utils.timestamp: 'time', nmea_utils.datestamp: 'date'}
+
+# (column name, kind) for each field of a sentence class
+def sentence_columns(cls):
+    columns = list()
+    names = set(['talker'])
+    for i, field in enumerate(cls.fields):
+        name = field[1]
+        if name in names:
+            name = f"{name}_{i}" # some classes repeat a field name
+        names.add(name)
+        kind = _KINDS.get(field[2], 'bytes') if len(field) >= 3 else 'bytes'
+        columns.append((name, kind))
+    return columns
+
+# talkers whose sentences are keyed by the whole identifier
+BLUEFIN_TALKERS = ('BF', 'BP')
+
+# (column name, kind) for each field of a BP command, from its template
+def command_columns(identifier):
+    columns = list()
+    for i, field in enumerate(COMMAND_TEMPLATES[identifier].split(',')[1:], 1):
+        columns.append(('timestamp', 'time') if field == '{time}' else (f"field_{i}", 'bytes'))
+    return columns
+
+# sentence_columns or command_columns of a key ('BFNVG', 'BPRMB', 'GGA'), or
+# None if no sentence class or command template describes it
+def key_columns(key):
+    if len(key) == 3:
+        cls = pynmea2.TalkerSentence.sentence_types.get(key)
+        return None if cls is None else sentence_columns(cls)
+    if key[:2] == 'BP':
+        return command_columns(key) if key in COMMAND_TEMPLATES else None
+    cls = getattr(BluefinMessages, key[2:], None)
+    if isinstance(cls, type) and issubclass(cls, pynmea2.TalkerSentence):
+        return sentence_columns(cls)
+    return None
+
+# fixed-width bytes column with the empty values replaced by fill
+def _filled(values, fill):
+    column = np.array(values, dtype=bytes)
+    empty = column == b''
+    if empty.any():
+        column = column.astype(f"S{max(column.itemsize, len(fill))}")
+        column[empty] = fill
+    return column, empty
+
+def _float_column(values):
+    column, _ = _filled(values, b'nan')
+    try:
+        return column.astype(np.float64)
+    except ValueError:
+        pass
+
+    result = np.empty(len(values))
+    for i, value in enumerate(values):
+        try:
+            result[i] = float(value)
+        except ValueError:
+            result[i] = np.nan
+    return result
+
+def _int_column(values):
+    column, empty = _filled(values, b'0')
+    try:
+        result = column.astype(np.int64)
+        result[empty] = INT_MISSING
+        return result
+    except ValueError:
+        pass
+
+    result = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        try:
+            result[i] = int(value)
+        except ValueError:
+            result[i] = INT_MISSING
+    return result
+
+def _time_column(values):
+    hhmmss = _float_column(values)
+    return (hhmmss // 10000) * 3600 + (hhmmss // 100 % 100) * 60 + hhmmss % 100
+
+def _date_column(values):
+    ddmmyy = _int_column(values)
+    missing = (ddmmyy == INT_MISSING) | (ddmmyy < 10100)
+    ddmmyy[missing] = 10100 # 01/01/00 as a placeholder
+    year = ddmmyy % 100
+    year = np.where(year < 69, 2000 + year, 1900 + year) # as strptime's %y
+    month = ddmmyy // 100 % 100
+    day = ddmmyy // 10000
+    dates = ((year - 1970).astype('datetime64[Y]').astype('datetime64[M]') +
+             (month - 1).astype('timedelta64[M]')).astype('datetime64[D]') + \
+            (day - 1).astype('timedelta64[D]')
+    dates[missing] = np.datetime64('NaT')
+    return dates
+
+_COLUMN_BUILDERS = {'float': _float_column,
+                    'int': _int_column,
+                    'time': _time_column,
+                    'date': _date_column,
+                    'bytes': lambda values: np.array(values, dtype=bytes)}
+
+## ---------------------------------------------------------------------------
+## One sentence key's structured array, grown in place as chunks come in
+## ---------------------------------------------------------------------------
+class _Table():
+    def __init__(self, columns):
+        self.__names = ['talker'] + [name for name, _ in columns]
+        self.__array = None
+        self.__rows = 0
+
+    # add rows given as one array per column (talker first)
+    def append(self, columns):
+        count = len(columns[0])
+        dtype = np.dtype([(name, self.__column_dtype(name, column))
+                          for name, column in zip(self.__names, columns)])
+        if self.__array is None:
+            self.__array = np.empty(count, dtype)
+        elif dtype != self.__array.dtype:
+            self.__widen(dtype)
+
+        size = len(self.__array)
+        if self.__rows + count > size:
+            # realloc; only this table refers to the array
+            self.__array.resize(max(self.__rows + count, size + size // 4), refcheck=False)
+
+        rows = self.__array[self.__rows:self.__rows + count]
+        for name, column in zip(self.__names, columns):
+            rows[name] = column
+        self.__rows += count
+
+    # the rows, in an array no longer than they are
+    def result(self):
+        self.__array.resize(self.__rows, refcheck=False)
+        array = self.__array
+        self.__array = None
+        return array
+
+    # as wide as the first values; one that has to widen goes to a power of two
+    def __column_dtype(self, name, column):
+        if column.dtype.kind != 'S' or self.__array is None:
+            return column.dtype
+        width = self.__array.dtype[name].itemsize
+        if column.itemsize > width:
+            width = 1 << (column.itemsize - 1).bit_length()
+        return np.dtype(f"S{width}")
+
+    # a bytes column has to hold longer values: copy into a wider array
+    def __widen(self, dtype):
+        dtype = np.dtype([(name, max(self.__array.dtype[name], dtype[name],
+                                     key=lambda t: t.itemsize))
+                          for name in self.__names])
+        array = np.empty(len(self.__array), dtype)
+        for name in self.__names:
+            array[name][:self.__rows] = self.__array[name][:self.__rows]
+        self.__array = array
+
+## ---------------------------------------------------------------------------
+## One chunk of complete lines -> {key: [talker column, field columns...]}
+## ---------------------------------------------------------------------------
+class _ChunkParser():
+    def __init__(self, check=True):
+        self.__check = check
+        self.__columns = dict() # key -> key_columns
+        self.stats = dict([
+            ('lines', 0),
+            ('sentences', 0),
+            ('loaded', 0),
+            ('bad_checksum', 0),
+            ('unknown', 0),
+            ('malformed', 0),
+        ])
+
+    def parse(self, chunk):
+        rows = dict() # key -> list of (talker, fields)
+        columns = self.__columns
+        stats = self.stats
+        # one sentence per line, each line's text before its first '$' on a
+        # line of its own (empty if the line starts with '$'), and every
+        # checksum in one pass over the buffer
+        chunk = chunk.replace(b'$', b'\n$')
+        valid = validate(chunk).tolist() if self.__check else None
+        lines = chunk.split(b'\n')
+        for i, line in enumerate(lines):
+            if line[:1] != b'$':
+                if i + 1 < len(lines) and lines[i + 1][:1] == b'$':
+                    stats['lines'] += 1 # sentences follow
+                elif line.strip():
+                    stats['lines'] += 1
+                    stats['malformed'] += 1
+                continue
+
+            stats['sentences'] += 1
+            star = line.rfind(b'*')
+            end = len(line.rstrip()) if star < 0 else star
+            if end < 7 or line[6] != 44: # ,
+                stats['malformed'] += 1
+                continue
+
+            if valid is not None and not valid[i]:
+                stats['bad_checksum'] += 1
+                continue
+
+            talker = line[1:3]
+            if talker in _BLUEFIN_TALKERS:
+                key = str(line[1:6], 'latin-1')
+            else:
+                key = str(line[3:6], 'latin-1')
+            if key not in columns:
+                columns[key] = key_columns(key)
+            if columns[key] is None:
+                stats['unknown'] += 1
+                continue
+
+            if key not in rows:
+                rows[key] = list()
+            rows[key].append((talker, line[7:end].split(b',')))
+            stats['loaded'] += 1
+
+        return dict((key, self.__to_columns(key, rows[key])) for key in rows)
+
+    def __to_columns(self, key, rows):
+        columns = [np.array([talker for talker, _ in rows], dtype='S2')]
+        for i, (_, column_kind) in enumerate(self.__columns[key]):
+            values = [fields[i] if i < len(fields) else b'' for _, fields in rows]
+            columns.append(_COLUMN_BUILDERS[column_kind](values))
+        return columns
+
+_BLUEFIN_TALKERS = tuple(talker.encode('ascii') for talker in BLUEFIN_TALKERS)
+
+# append {key: columns} to the tables, adding tables for new keys
+def _append(tables, parts):
+    for key, columns in parts.items():
+        if key not in tables:
+            tables[key] = _Table(key_columns(key))
+        tables[key].append(columns)
+
+# load the complete lines in [start, end) of a file into {key: structured
+# array}; run in the worker processes
+def _load_range(filename, start, end, chunk_size, check):
+    parser = _ChunkParser(check)
+    tables = dict()
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        tail = b'' # the partial line at the end of the last chunk
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if len(data) == 0:
+                break
+            remaining -= len(data)
+
+            data = tail + data
+            cut = data.rfind(b'\n') + 1
+            tail = data[cut:]
+            if cut > 0:
+                _append(tables, parser.parse(data[:cut]))
+
+        if tail: # the last line may have no newline
+            _append(tables, parser.parse(tail))
+    return dict((key, table.result()) for key, table in tables.items()), parser.stats
+
+# offsets that cut the file into about n ranges, each starting a line
+def _line_ranges(filename, n):
+    size = os.path.getsize(filename)
+    cuts = [0]
+    with open(filename, 'rb') as f:
+        for i in range(1, n):
+            f.seek(max(size * i // n, cuts[-1]))
+            f.readline()
+            cuts.append(min(f.tell(), size))
+    cuts.append(size)
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+class NMEALoader():
+    def __init__(self, chunk_size=1 << 22, workers=None, check=True):
+        self.__chunk_size = chunk_size
+        self.__workers = workers
+        self.__check = check
+        self.__stats = dict()
+
+    # {key: structured array}, e.g. {'BFNVG': ..., 'BPRMB': ..., 'GGA': ...}
+    def load(self, filename):
+        self.__stats = dict()
+        if self.__workers is None or self.__workers <= 1:
+            arrays, stats = _load_range(filename, 0, os.path.getsize(filename),
+                                        self.__chunk_size, self.__check)
+            self.__add_stats(stats)
+            return dict((key, arrays[key]) for key in sorted(arrays))
+
+        tables = dict()
+        ranges = _line_ranges(filename, self.__workers)
+        with concurrent.futures.ProcessPoolExecutor(self.__workers) as pool:
+            futures = [pool.submit(_load_range, filename, start, end,
+                                   self.__chunk_size, self.__check)
+                       for start, end in ranges]
+            # in file order, dropping each range's arrays once they are appended
+            for i in range(len(futures)):
+                arrays, stats = futures[i].result()
+                futures[i] = None
+                self.__add_stats(stats)
+                _append(tables, dict((key, [array[name] for name in array.dtype.names])
+                                     for key, array in arrays.items()))
+                del arrays
+
+        return dict((key, tables[key].result()) for key in sorted(tables))
+
+    # lines, sentences, loaded, bad_checksum, unknown, malformed of the last load
+    def get_stats(self):
+        return dict(self.__stats)
+
+    def __add_stats(self, stats):
+        for key, count in stats.items():
+            self.__stats[key] = self.__stats.get(key, 0) + count
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python NMEA_Loader.py <log> [workers] [compare]")
+        sys.exit(1)
+    filename = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    loader = NMEALoader(workers=workers)
+    start = time.perf_counter()
+    arrays = loader.load(filename)
+    elapsed = time.perf_counter() - start
+
+    print(f"{filename}: {elapsed:.2f} s, {loader.get_stats()}")
+    for kind, array in arrays.items():
+        print(f"  {kind}: {len(array)} rows, {array.nbytes / 1e6:.1f} MB, columns {array.dtype.names}")
+
+    # the sentences framed out of the log lines (a backseat log has a time and
+    # level in front of them), one pynmea2 object each
+    if len(sys.argv) > 3 and sys.argv[3] == 'compare':
+        start = time.perf_counter()
+        framer = NMEAFramer()
+        sentences = list()
+        with open(filename, 'rb') as f:
+            for data in iter(lambda: f.read(1 << 16), b''):
+                for frame in framer.feed(data):
+                    try:
+                        sentences.append(pynmea2.parse(str(frame, 'latin-1'), check=True))
+                    except pynmea2.ParseError:
+                        pass
+        print(f"one pynmea2 sentence per framed line: {time.perf_counter() - start:.2f} s, "
+              f"{len(sentences)} sentences")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:31:44 2026
+
+Mailbox for received NMEA sentences, keyed by sentence type ($BFNVG -> b'BFNVG').
+
+Navigation updates only matter while they are the newest, so for the
+latest_types just the last sentence of each type is kept (plus, optionally,
+a bounded history of the previous ones); a burst of them replaces a single
+slot instead of filling the queue. Everything else (acks, commands) is kept
+in strict FIFO order. take() hands back both, in the order they arrived.
+
+put() and take() are O(1) per message and only hold the lock for a few
+dictionary and deque operations, so the socket thread never waits on the
+reader.
+
+@author: Team Baygulls
+"""
+import threading
+import collections
+
+LATEST_TYPES = (b'BFNVG', b'BFNVR')
+
+# b'BFNVG' for $BFNVG,...
+def sentence_type(sentence):
+    return bytes(sentence[1:6])
+
+class NMEAMailbox():
+    def __init__(self, latest_types=LATEST_TYPES, history=0, maxlen=50):
+        self.__latest_types = frozenset(latest_types)
+        self.__lock = threading.Lock()
+        self.__latest = dict()      # type -> (arrival, item)
+        self.__fifo = collections.deque() # (arrival, item)
+        self.__maxlen = maxlen
+        self.__history = None
+        if history > 0:
+            self.__history = dict((kind, collections.deque(maxlen=history))
+                                  for kind in self.__latest_types)
+        self.__arrivals = 0
+
+        self.__stats = dict([
+            ('received', 0),
+            ('coalesced', 0), # replaced by a newer sentence of the same type
+            ('dropped', 0),   # FIFO overflow, oldest first
+        ])
+
+    # store a sentence; item is what take() returns for it (defaults to the sentence)
+    def put(self, sentence, item=None):
+        if item is None:
+            item = sentence
+        kind = sentence_type(sentence)
+
+        with self.__lock:
+            self.__arrivals += 1
+            self.__stats['received'] += 1
+            if kind in self.__latest_types:
+                if kind in self.__latest:
+                    self.__stats['coalesced'] += 1
+                self.__latest[kind] = (self.__arrivals, item)
+                if self.__history is not None:
+                    self.__history[kind].append(item)
+            else:
+                if len(self.__fifo) >= self.__maxlen:
+                    self.__fifo.popleft()
+                    self.__stats['dropped'] += 1
+                self.__fifo.append((self.__arrivals, item))
+
+    # everything since the last take(), oldest first
+    def take(self):
+        with self.__lock:
+            latest = self.__latest
+            fifo = self.__fifo
+            if len(latest) == 0 and len(fifo) == 0:
+                return list()
+            self.__latest = dict()
+            self.__fifo = collections.deque()
+
+        if len(latest) == 0:
+            return [item for _, item in fifo]
+
+        mail = list(fifo)
+        mail.extend(latest.values())
+        mail.sort(key=lambda entry: entry[0])
+        return [item for _, item in mail]
+
+    # up to history items of a coalesced type, oldest first
+    def get_history(self, kind):
+        if self.__history is None or kind not in self.__history:
+            return list()
+        with self.__lock:
+            return list(self.__history[kind])
+
+    def __len__(self):
+        return len(self.__latest) + len(self.__fifo)
+
+    def get_stats(self):
+        return dict(self.__stats)
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:55:37 2026
+
+Stand-in for an imperfect vehicle link. ImpairmentProxy sits between a
+SandsharkClient and a SandsharkServer (tcp) and impairs the NMEA sentences
+going each way: delay with jitter (normal, uniform or exponential), loss,
+duplication, reordering and a bandwidth cap. Every random choice comes from
+one seeded generator, so a run can be repeated exactly.
+
+Proxy between a backseat and a front seat:
+python Network_Impairment.py proxy <listen port> <front seat port> [delay s] [jitter s] [loss] [seed]
+
+Closed-loop benchmark over a range of impairments (reports gates cleared
+and sense-to-act latency):
+python Network_Impairment.py benchmark [seconds per scenario] [port] [seed]
+
+@author: Team Baygulls
+"""
+import sys
+import time
+import errno
+import logging
+import socket
+import selectors
+import heapq
+import random
+import threading
+import traceback
+import contextlib
+import os
+
+import numpy as np
+import utm
+
+from NMEA_Framer import NMEAFramer
+
+JITTER_DISTRIBUTIONS = ('normal', 'uniform', 'exponential')
+
+_CONNECT_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN,
+                        getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK))
+
+# one client connection and the front seat connection made for it
+class _ProxiedConnection():
+    def __init__(self, client, upstream, connecting):
+        self.sockets = (client, upstream)
+        # direction 0 goes client -> front seat, 1 goes front seat -> client
+        self.framers = (NMEAFramer(), NMEAFramer())
+        self.outgoing = (bytearray(), bytearray()) # indexed by destination
+        # the front seat side waits for write readiness until it is connected,
+        # and what the client sends meanwhile is kept in outgoing
+        self.connecting = connecting
+        self.writing = [False, connecting]
+        self.closed = False
+
+class ImpairmentProxy():
+    def __init__(self,
+                 listen_port,
+                 target_port,
+                 host="localhost",
+                 target_host="localhost",
+                 delay=0.0,
+                 jitter=0.0,
+                 jitter_distribution='normal',
+                 loss=0.0,
+                 duplicate=0.0,
+                 reorder=0.0,
+                 reorder_delay=0.1,
+                 bandwidth=None,
+                 seed=0,
+                 PACKET_SIZE=1024):
+
+        if jitter_distribution not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution {jitter_distribution}")
+
+        # resolved once, so accepting a client never waits on a name lookup
+        self.__target = socket.getaddrinfo(target_host, target_port,
+                                           socket.AF_INET, socket.SOCK_STREAM)[0][4]
+        self.__PACKET_SIZE = PACKET_SIZE
+
+        self.__delay = delay
+        self.__jitter = jitter
+        self.__jitter_distribution = jitter_distribution
+        self.__loss = loss
+        self.__duplicate = duplicate
+        self.__reorder = reorder             # probability a sentence is held back...
+        self.__reorder_delay = reorder_delay # ...by this much longer
+        self.__bandwidth = bandwidth         # bytes/s in each direction, None for no cap
+        self.__random = random.Random(seed)
+
+        self.__listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__listener.bind((host, listen_port))
+        self.__listener.listen(5)
+        self.__listener.setblocking(False)
+
+        self.__wakeup_recv, self.__wakeup_send = socket.socketpair()
+        self.__wakeup_recv.setblocking(False)
+
+        self.__selector = selectors.DefaultSelector()
+        self.__connections = list()
+        self.__schedule = list() # heap of (due, sequence, connection, direction, sentence)
+        self.__sequence = 0
+        self.__link_free = dict() # (connection, direction) -> time the link is next idle
+        self.__closed = False
+
+        self.__stats = dict([
+            ('forwarded', 0),
+            ('lost', 0),
+            ('duplicated', 0),
+            ('reordered', 0),
+        ])
+
+    def run(self):
+        try:
+            self.__selector.register(self.__listener, selectors.EVENT_READ, None)
+            self.__selector.register(self.__wakeup_recv, selectors.EVENT_READ, None)
+
+            while not self.__closed:
+                timeout = None
+                if len(self.__schedule) > 0:
+                    timeout = max(0.0, self.__schedule[0][0] - time.monotonic())
+
+                for key, mask in self.__selector.select(timeout):
+                    if key.fileobj is self.__listener:
+                        self.__accept()
+                    elif key.fileobj is self.__wakeup_recv:
+                        self.__drain_wakeup()
+                    else:
+                        connection, side = key.data
+                        if connection.closed:
+                            continue # dropped earlier in this batch
+                        if connection.connecting and side == 1:
+                            self.__finish_connect(connection)
+                            continue
+                        if mask & selectors.EVENT_READ:
+                            self.__read(connection, side)
+                        if mask & selectors.EVENT_WRITE and not connection.closed:
+                            self.__write(connection, side)
+
+                self.__deliver_due()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self.__close()
+
+    def cleanup(self):
+        self.__closed = True
+        try:
+            self.__wakeup_send.send(b'\0')
+        except OSError:
+            pass
+
+    def get_stats(self):
+        return dict(self.__stats)
+
+    def __close(self):
+        for connection in self.__connections:
+            for sockt in connection.sockets:
+                sockt.close()
+        self.__selector.close()
+        self.__listener.close()
+        self.__wakeup_recv.close()
+        self.__wakeup_send.close()
+
+    def __drain_wakeup(self):
+        try:
+            while self.__wakeup_recv.recv(64):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    # the front seat connection is made without blocking the other links: it
+    # is registered for write readiness and finished in __finish_connect
+    def __accept(self):
+        try:
+            client, _ = self.__listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+
+        upstream = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        upstream.setblocking(False)
+        try:
+            err = upstream.connect_ex(self.__target)
+        except OSError:
+            err = errno.ECONNREFUSED
+        if err != 0 and err not in _CONNECT_IN_PROGRESS:
+            upstream.close()
+            client.close() # the client will retry once the front seat is up
+            return
+
+        connection = _ProxiedConnection(client, upstream, connecting=err != 0)
+        for side, sockt in enumerate(connection.sockets):
+            sockt.setblocking(False)
+            sockt.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            mask = selectors.EVENT_WRITE if connection.writing[side] else selectors.EVENT_READ
+            self.__selector.register(sockt, mask, (connection, side))
+        self.__connections.append(connection)
+
+    def __finish_connect(self, connection):
+        upstream = connection.sockets[1]
+        try:
+            failed = upstream.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) != 0
+        except OSError:
+            failed = True
+        if failed:
+            self.__drop(connection) # the client will retry once the front seat is up
+            return
+
+        connection.connecting = False
+        # sends what the client has sent meanwhile, and goes back to reading
+        self.__write(connection, 1)
+
+    # either end closing closes the pair
+    def __drop(self, connection):
+        if connection.closed:
+            return
+        connection.closed = True
+        for sockt in connection.sockets:
+            self.__selector.unregister(sockt)
+            sockt.close()
+        self.__connections.remove(connection)
+
+    def __read(self, connection, side):
+        try:
+            data = connection.sockets[side].recv(self.__PACKET_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+
+        if not data:
+            self.__drop(connection)
+            return
+
+        # data read from side 0 (the client) travels in direction 0
+        now = time.monotonic()
+        for sentence in connection.framers[side].feed(data):
+            self.__impair(now, connection, side, bytes(sentence) + b'\r\n')
+
+    def __impair(self, now, connection, direction, sentence):
+        if self.__random.random() < self.__loss:
+            self.__stats['lost'] += 1
+            return
+
+        copies = 1
+        if self.__random.random() < self.__duplicate:
+            copies = 2
+            self.__stats['duplicated'] += 1
+
+        for copy in range(copies):
+            due = now + self.__sample_delay()
+            if self.__random.random() < self.__reorder:
+                due += self.__reorder_delay
+                self.__stats['reordered'] += 1
+
+            # a capped link sends one sentence after the other
+            if self.__bandwidth is not None:
+                link = (connection, direction)
+                due = max(due, self.__link_free.get(link, 0.0)) + len(sentence) / self.__bandwidth
+                self.__link_free[link] = due
+
+            heapq.heappush(self.__schedule, (due, self.__sequence, connection, direction, sentence))
+            self.__sequence += 1
+
+    def __sample_delay(self):
+        if self.__jitter <= 0:
+            return self.__delay
+        if self.__jitter_distribution == 'normal':
+            jitter = self.__random.gauss(0.0, self.__jitter)
+        elif self.__jitter_distribution == 'uniform':
+            jitter = self.__random.uniform(-self.__jitter, self.__jitter)
+        else:
+            jitter = self.__random.expovariate(1.0 / self.__jitter)
+        return max(0.0, self.__delay + jitter)
+
+    def __deliver_due(self):
+        now = time.monotonic()
+        touched = set()
+        while len(self.__schedule) > 0 and self.__schedule[0][0] <= now:
+            _, _, connection, direction, sentence = heapq.heappop(self.__schedule)
+            if connection.closed:
+                continue
+            destination = 1 - direction
+            connection.outgoing[destination].extend(sentence)
+            touched.add((connection, destination))
+            self.__stats['forwarded'] += 1
+
+        for connection, side in touched:
+            if not connection.closed and not connection.writing[side]:
+                self.__write(connection, side)
+
+    def __write(self, connection, side):
+        outgoing = connection.outgoing[side]
+        sockt = connection.sockets[side]
+        try:
+            sent = sockt.send(outgoing)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self.__drop(connection)
+            return
+
+        del outgoing[:sent]
+        writing = len(outgoing) > 0
+        if writing != connection.writing[side]:
+            connection.writing[side] = writing
+            mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self.__selector.modify(sockt, mask, (connection, side))
+
+## ---------------------------------------------------------------------------
+## Closed-loop benchmark: a simulated vehicle and front seat, the proxy, and a
+## minimal backseat steering through the pool_1 gates with an ideal camera
+## (the angles to the buoys it can see). The backseat stamps each BPRMB with
+## the time of the BFNVG it acted on, so the front seat can measure sense to
+## act: from sending the BFNVG to receiving the command based on it.
+## ---------------------------------------------------------------------------
+
+BENCHMARK_SCENARIOS = (
+    ('ideal link', {}),
+    ('50 ms delay', {'delay': 0.05}),
+    ('200 ms delay', {'delay': 0.2}),
+    ('100 +/- 50 ms jitter', {'delay': 0.1, 'jitter': 0.05}),
+    ('10% loss', {'loss': 0.1}),
+    ('30% loss', {'loss': 0.3}),
+    ('10% duplicated, 10% reordered', {'duplicate': 0.1, 'reorder': 0.1}),
+    ('16 kB/s cap', {'bandwidth': 16000}),
+    ('8 kB/s cap', {'bandwidth': 8000}),
+    ('combined', {'delay': 0.1, 'jitter': 0.05, 'loss': 0.1, 'duplicate': 0.05,
+                  'reorder': 0.05, 'bandwidth': 16000}),
+)
+
+_DATUM = (42.3, -71.1)
+_POOL = {'nGates': 5,
+         'gate_spacing': 5,
+         'gate_width': 2,
+         'style': 'pool_1',
+         'max_offset': 5,
+         'heading': 0}
+
+def _nmea_latlon(latdeg, lathemi, londeg, lonhemi):
+    latitude = int(latdeg[0:2]) + float(latdeg[2:]) / 60
+    if lathemi == 'S':
+        latitude = -latitude
+    longitude = int(londeg[0:3]) + float(londeg[3:]) / 60
+    if lonhemi == 'W':
+        longitude = -longitude
+    return latitude, longitude
+
+# relative (horizontal, vertical) angles to the buoys within the camera's view
+def _camera_angles(field, position, heading, max_angle=24.4, visibility=50):
+    left = np.mod(heading - max_angle, 360)
+    right = np.mod(heading + max_angle, 360)
+    green, red = field.detectable_buoys(position, visibility, left, right, sensor_type='ANGLE')
+    relative = lambda angle: (float(np.mod(angle - heading + 180, 360) - 180), 0.0)
+    return [relative(a) for a in green], [relative(a) for a in red]
+
+def run_scenario(impairments, seconds=60, port=29700, seed=0, control_period=0.125):
+    # imported here so the proxy on its own only needs the socket modules
+    import BluefinMessages
+    from BWSI_Sandshark import Sandshark
+    from BWSI_BuoyField import BuoyField
+    from BWSI_FrontSeat import parse_payload_command
+    from AUV_Controller import AUVController
+    from Sandshark_Interface import SandsharkServer, SandsharkClient
+
+    server = SandsharkServer(host="localhost", port=port)
+    proxy = ImpairmentProxy(port + 1, port, seed=seed, **impairments)
+    client = SandsharkClient(host="localhost", port=port + 1, reconnect_min=0.05)
+    threads = [threading.Thread(target=x.run) for x in (server, proxy, client)]
+    for thread in threads:
+        thread.start()
+
+    vehicle = Sandshark(latlon=_DATUM, depth=1.0, speed_knots=0.0, heading=45.0,
+                        rudder_position=0.0, engine_speed='STOP', engine_direction='AHEAD',
+                        datum=_DATUM)
+    field = BuoyField(_DATUM)
+    field.configure(_POOL)
+    controller = AUVController(logger=logging.getLogger('Network_Impairment'))
+    datum = utm.from_latlon(*_DATUM)
+
+    nvg_sent = dict()
+    sense_to_act = list()
+    commands_sent = 0
+    commands_received = 0
+    try:
+        client.wait_connected(5)
+        start = time.monotonic()
+        last = start
+        next_control = start
+        position = vehicle.get_position()
+        while last - start < seconds:
+            time.sleep(0.01)
+            now = time.monotonic()
+
+            # front seat
+            report = vehicle.update_state(now - last)
+            last = now
+            if report is not None:
+                for line in report.split('\n'):
+                    if line.startswith('$BFNVG'):
+                        nvg_sent[line.split(',')[1]] = now
+                server.send_command(report)
+
+            for msg in server.receive_mail():
+                msg = str(msg, 'utf-8')
+                parse_payload_command(vehicle, msg, verbose=False)
+                if msg.startswith('$BPRMB'):
+                    commands_received += 1
+                    sent = nvg_sent.get(msg.split(',')[1])
+                    if sent is not None:
+                        sense_to_act.append(now - sent)
+
+            new_position = vehicle.get_position()
+            field.check_buoy_gates(position, new_position)
+            position = new_position
+
+            # backseat, acting on the newest navigation update it has
+            if now < next_control:
+                continue
+            next_control += control_period
+
+            nvg = None
+            for msg in client.receive_mail():
+                if bytes(msg[:6]) == b'$BFNVG':
+                    nvg = str(msg, 'utf-8').split('*')[0].split(',')
+            if nvg is None:
+                continue
+
+            latlon = _nmea_latlon(nvg[2], nvg[3], nvg[4], nvg[5])
+            local = utm.from_latlon(*latlon, force_zone_number=datum[2], force_zone_letter=datum[3])
+            state = {'position': (local[0] - datum[0], local[1] - datum[1]),
+                     'heading': float(nvg[9])}
+            green, red = _camera_angles(field, state['position'], state['heading'])
+            rudder, speed = controller.decide(state, green, red)
+
+            cmd = f"BPRMB,{nvg[1]},{-rudder},1,0,{speed},0,1"
+            client.send_message(f"${cmd}*{hex(BluefinMessages.checksum(cmd))[2:]}\n")
+            client.flush()
+            commands_sent += 1
+    finally:
+        client.cleanup()
+        proxy.cleanup()
+        server.cleanup()
+        for thread in threads:
+            thread.join()
+
+    result = {'gates_cleared': int(field.clearedBuoys()),
+              'commands_sent': commands_sent,
+              'commands_received': commands_received,
+              'proxy': proxy.get_stats()}
+    if len(sense_to_act) > 0:
+        p50, p95, p99 = np.percentile(sense_to_act, [50, 95, 99])
+        result.update({'p50': p50, 'p95': p95, 'p99': p99})
+    return result
+
+def benchmark(seconds=60, port=29700, seed=0, scenarios=BENCHMARK_SCENARIOS):
+    print(f"{'scenario':34s} gates  commands  sense to act p50 / p95 / p99 (ms)")
+    for i, (name, impairments) in enumerate(scenarios):
+        # fresh ports, so nothing lingers from the previous scenario; the
+        # simulated vehicle prints every NVG, so keep that out of the report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = run_scenario(impairments, seconds=seconds, port=port + 2*i, seed=seed)
+        latency = "no commands arrived"
+        if 'p50' in result:
+            latency = f"{1000*result['p50']:7.1f} / {1000*result['p95']:7.1f} / {1000*result['p99']:7.1f}"
+        print(f"{name:34s} {result['gates_cleared']:3d}/{_POOL['nGates']}"
+              f"  {result['commands_received']:4d}/{result['commands_sent']:<4d}  {latency}")
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'proxy':
+        listen_port = int(sys.argv[2])
+        target_port = int(sys.argv[3])
+        delay = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+        jitter = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+        loss = float(sys.argv[6]) if len(sys.argv) > 6 else 0.0
+        seed = int(sys.argv[7]) if len(sys.argv) > 7 else 0
+
+        proxy = ImpairmentProxy(listen_port, target_port, delay=delay, jitter=jitter,
+                                loss=loss, seed=seed)
+        print(f"impairing localhost:{listen_port} -> localhost:{target_port}")
+        try:
+            proxy.run()
+        finally:
+            print(proxy.get_stats())
+
+    elif len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 29700
+        seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+        benchmark(seconds, port, seed)
+
+    else:
+        print("usage: python Network_Impairment.py proxy <listen port> <front seat port> [delay] [jitter] [loss] [seed]")
+        print("       python Network_Impairment.py benchmark [seconds per scenario] [port] [seed]")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:31 2026
+
+Fit the simulated rudder response (BWSI_Sandshark.RudderModel) to a backseat
+log from the real vehicle: the BPRMB rudder orders we sent, timed by the BFACK
+that acknowledged them, against the BFNVG heading changes that followed.
+
+python Rudder_Fit.py <backseat log>
+
+@author: Team Baygulls
+"""
+import sys
+import re
+
+import numpy as np
+
+from BWSI_Sandshark import RudderModel, STATE_SIZE, STATE_RUDDER, STATE_SPEED, STATE_YAW_RATE
+
+# any BF sentence logged by the backseat, either on its own or inside a received batch
+_BF_RE = re.compile(r"\$BF(NVG|NVR|ACK),([^*\\']*)\*")
+_BPRMB_RE = re.compile(r"ending message \$BPRMB,([^*]*)\*")
+
+def seconds_of_day(hhmmss):
+    return int(hhmmss[0:2])*3600 + int(hhmmss[2:4])*60 + float(hhmmss[4:])
+
+def parse_log(filename):
+    """ returns heading (time, deg), speed (time, m/s) and rudder orders (time, deg),
+    all on the vehicle clock
+    """
+    with open(filename) as f:
+        text = f.read()
+
+    headings = dict()
+    speeds = dict()
+    acks = dict()
+    for match in _BF_RE.finditer(text):
+        fields = match.group(2).split(',')
+        if match.group(1) == 'NVG':
+            headings[seconds_of_day(fields[0])] = float(fields[8])
+        elif match.group(1) == 'NVR':
+            speeds[seconds_of_day(fields[0])] = np.hypot(float(fields[1]), float(fields[2]))
+        elif fields[1] == 'RMB':
+            # the ack carries the timestamp of the command it acknowledges
+            acks[fields[2]] = seconds_of_day(fields[0])
+
+    orders = list()
+    for match in _BPRMB_RE.finditer(text):
+        fields = match.group(1).split(',')
+        if fields[1] == '':
+            continue
+
+        key = f"{float(fields[0]):010.3f}"
+        if key in acks:
+            orders.append((acks[key], float(fields[1])))
+
+    if len(orders) == 0:
+        raise ValueError(f"{filename}: no acknowledged BPRMB rudder orders (was BPLOG ACK on?)")
+
+    def as_arrays(samples):
+        t = np.array(sorted(samples))
+        return t, np.array([samples[x] for x in t])
+
+    orders.sort()
+    return as_arrays(headings), as_arrays(speeds), (np.array([o[0] for o in orders]),
+                                                    np.array([o[1] for o in orders]))
+
+def fit_rudder_model(heading, speed, orders, dt=0.1,
+                     rudder_taus=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5),
+                     yaw_taus=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0),
+                     dead_times=np.arange(0.0, 1.5, 0.1),
+                     hard_rudder_deg=25,
+                     max_speed_mps=5*0.514444):
+    """ grid search over the time constants and dead time; the turning rate
+    enters linearly, so it is solved by least squares for every grid point
+    """
+    t_hdg, hdg = heading
+    t_spd, spd = speed
+    t_ord, ord_rudder = orders
+
+    # resample onto the fixed step the model runs at
+    t = np.arange(max(t_hdg[0], t_ord[0]), t_hdg[-1], dt)
+    hdg = np.interp(t, t_hdg, np.degrees(np.unwrap(np.radians(hdg))))
+    spd = np.interp(t, t_spd, spd)
+    rudder = ord_rudder[np.maximum(np.searchsorted(t_ord, t, side='right') - 1, 0)]
+    measured = np.diff(hdg)
+
+    taus = np.array([(r, y) for r in rudder_taus for y in yaw_taus])
+    best = None
+    for dead_time in dead_times:
+        model = RudderModel(dt, shape=(len(taus),),
+                            rudder_tau=taus[:, 0],
+                            yaw_tau=taus[:, 1],
+                            dead_time=dead_time,
+                            max_turning_rate=1.0,
+                            hard_rudder_deg=hard_rudder_deg,
+                            max_speed_mps=max_speed_mps)
+
+        state = np.zeros((len(taus), STATE_SIZE))
+        predicted = np.zeros((len(measured), len(taus)))
+        for k in range(len(measured)):
+            state[:, STATE_RUDDER] = rudder[k]
+            state[:, STATE_SPEED] = spd[k]
+            model.step(state, dt)
+            predicted[k] = state[:, STATE_YAW_RATE] * dt
+
+        power = np.sum(predicted**2, axis=0)
+        gain = (measured @ predicted) / np.maximum(power, 1e-12)
+        sse = np.sum((measured[:, None] - predicted * gain)**2, axis=0)
+
+        i = np.argmin(sse)
+        if best is None or sse[i] < best[0]:
+            best = (sse[i], {'rudder_tau': float(taus[i, 0]),
+                             'yaw_tau': float(taus[i, 1]),
+                             'dead_time': round(float(dead_time), 3),
+                             'max_turning_rate': round(float(gain[i]), 1)})
+
+    explained = 1.0 - best[0] / np.sum(measured**2)
+    return best[1], explained
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python Rudder_Fit.py <backseat log>")
+        sys.exit(1)
+
+    params, explained = fit_rudder_model(*parse_log(sys.argv[1]))
+    print(f"RUDDER_MODEL_PARAMS = {params}")
+    print(f"explains {100*explained:.1f}% of the heading change")
+
+if __name__ == '__main__':
+    main()
@@ -7,247 +7,1027 @@ Created on Fri Jul 16 23:04:06 2021
 """
 
 import time
-#import sys, os
+import os
+import tempfile
+#import sys
 
 import socket
-import select
-#import threading
-import queue
+import selectors
+import threading
+import errno
+import collections
+import itertools
 
 import traceback
 
+from NMEA_Framer import NMEAFramer
+from NMEA_Mailbox import NMEAMailbox
+
 #import numpy as np
 
 #from pynmea2 import pynmea2
 #import BluefinMessages
 
+SLOW_CONSUMER_POLICIES = ('drop_oldest', 'drop_newest', 'disconnect')
+
+# tcp: TCP with Nagle's algorithm off
+# unix: Unix domain stream socket, for seats on the same machine
+# udp: one NMEA sentence per datagram
+TRANSPORTS = ('tcp', 'unix', 'udp')
+
+# where a unix transport listens instead of the port
+def unix_socket_path(port):
+    return os.path.join(tempfile.gettempdir(), f"sandshark_{port}.sock")
+
+def _check_transport(transport):
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport}, expected one of {TRANSPORTS}")
+
+# a bound (and for streams, listening) non-blocking server socket
+def _server_socket(transport, host, port):
+    if transport == 'unix':
+        path = unix_socket_path(port)
+        if os.path.exists(path):
+            os.unlink(path) # left behind by an earlier run
+        sockt = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sockt.bind(path)
+    else:
+        kind = socket.SOCK_DGRAM if transport == 'udp' else socket.SOCK_STREAM
+        sockt = socket.socket(socket.AF_INET, kind)
+        if transport == 'tcp' and os.name != 'nt':
+            # a restarted front seat can listen again while old connections linger
+            sockt.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sockt.bind((host, port))
+        
+    if transport != 'udp':
+        sockt.listen(5)
+    sockt.setblocking(False)
+    return sockt
+
+_CONNECT_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN,
+                        getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK))
+
+# start a non-blocking connect. Returns the socket and whether the connect is
+# still in progress (it is done when the socket becomes writeable); raises
+# OSError if the front seat is not there
+def _start_connect(transport, host, port):
+    if transport == 'unix':
+        sockt = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = unix_socket_path(port)
+    else:
+        kind = socket.SOCK_DGRAM if transport == 'udp' else socket.SOCK_STREAM
+        sockt = socket.socket(socket.AF_INET, kind)
+        address = (host, port)
+        
+    sockt.setblocking(False)
+    try:
+        err = sockt.connect_ex(address)
+    except OSError:
+        sockt.close()
+        raise
+    
+    if err == 0:
+        return sockt, False
+    if err in _CONNECT_IN_PROGRESS:
+        return sockt, True
+    sockt.close()
+    raise OSError(err, os.strerror(err))
+
+# scatter/gather writes where the platform has them (not on Windows)
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+_MAX_IOV = 64
+
+def _no_delay(sockt, transport):
+    if transport == 'tcp':
+        sockt.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+# queue msg for a session, in a buffer bounded to its max_messages. Returns
+# False if the session fell behind and its policy is to be disconnected
+def _enqueue(session, msg):
+    pending = session.pending
+    if len(pending) >= session.max_messages:
+        if session.policy == 'disconnect':
+            return False
+        
+        session.dropped += 1
+        if session.policy == 'drop_newest':
+            return True
+        
+        # drop_oldest, but a message that is partly written has to be finished
+        if session.offset == 0:
+            pending.popleft()
+        elif len(pending) > 1:
+            del pending[1]
+        else:
+            return True
+        
+    pending.append(msg)
+    return True
+
+# all queued messages of a session in one call
+def _send_pending(session):
+    pending = session.pending
+    buffers = [memoryview(pending[0])[session.offset:]]
+    buffers.extend(itertools.islice(pending, 1, _MAX_IOV))
+    if _HAS_SENDMSG:
+        return session.connection.sendmsg(buffers)
+    return session.connection.send(b''.join(buffers))
+
+# retire the messages that were written completely; returns the bytes
+# written of the next one
+def _retire(session, sent):
+    pending = session.pending
+    sent += session.offset
+    while len(pending) > 0 and sent >= len(pending[0]):
+        sent -= len(pending[0])
+        pending.popleft()
+        session.sent += 1
+    session.offset = sent
+    return sent
+
 ## The main message handler
+## run() is one selector loop for the listening sockets and every connected
+## subscriber. Every message given to send_command() is encoded once and the
+## same bytes are queued for each subscriber, in a buffer of its own bounded
+## to max_messages; when a subscriber falls behind its policy decides what
+## gives: drop its oldest queued message, drop the new one, or disconnect it.
+## A connection only asks for write readiness while it has something unsent,
+## so the loop sleeps in select() when there is nothing to do.
+##
+## Connections on port are backseats, and their commands reach receive_mail().
+## Connections on observer_port (loggers, plotters, a shadow autonomy build)
+## get the same stream but anything they send is discarded.
+##
+## With the udp transport there are no connections: a client subscribes by
+## sending a datagram (SandsharkClient sends an empty line when it starts),
+## and every message goes out as its own datagram.
 class SandsharkServer():
     def __init__(self,
                  host="",
                  port=8000,
-                 PACKET_SIZE=1024):
+                 PACKET_SIZE=1024,
+                 observer_port=None,
+                 max_messages=64,
+                 policy='drop_oldest',
+                 transport='tcp'):
 
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy {policy}")
+        _check_transport(transport)
+        
         self.__host = host
         self.__port = port
         self.__PACKET_SIZE = PACKET_SIZE
+        self.__max_messages = max_messages
+        self.__policy = policy
+        self.__transport = transport
+        self.__udp = transport == 'udp'
         
-        # bind to port
-        self.__sockt = socket.socket(socket.AF_INET,
-                                     socket.SOCK_STREAM)
-        self.__sockt.bind((host, port))
-        self.__sockt.listen(5)
-        self.__outgoing = queue.Queue(maxsize=10)
-        self.__incoming = queue.Queue(maxsize=50)
+        # bind to port; the value says whether clients there are observers
+        self.__listeners = dict()
+        self.__sockt = _server_socket(transport, host, port)
+        self.__listeners[self.__sockt] = False
+        if observer_port is not None:
+            self.__listeners[_server_socket(transport, host, observer_port)] = True
+        self.__ports = [port] if observer_port is None else [port, observer_port]
+        self.__udp_writers = dict((listener, set()) for listener in self.__listeners)
+        
+        # messages wait here until a subscriber is connected; when full the
+        # oldest is dropped, and counted in get_stats() as messages_dropped
+        self.__outgoing = collections.deque(maxlen=10)
+        self.__incoming = NMEAMailbox()
+        
+        # lets other threads interrupt select() when there is something to send
+        self.__wakeup_recv, self.__wakeup_send = socket.socketpair()
+        self.__wakeup_recv.setblocking(False)
+        self.__wakeup_send.setblocking(False)
+        
+        self.__selector = selectors.DefaultSelector()
+        self.__connections = dict() # socket, or (socket, address) for udp -> SandsharkSubscriber
+        self.__next_id = 0
+        self.__running = False
+        self.__closed = False
+        
+        self.__start_time = time.monotonic()
+        self.__stats = dict([
+            ('bytes_sent', 0),
+            ('bytes_received', 0),
+            ('send_calls', 0),
+            ('recv_calls', 0),
+            ('messages_dropped', 0), # outbound, before any subscriber took them
+        ])
         
     def run(self):
+        self.__running = True
         try:
-            inputs = [ self.__sockt ]
-            outputs = [ ]
+            for listener in self.__listeners:
+                self.__selector.register(listener, selectors.EVENT_READ, None)
+            self.__selector.register(self.__wakeup_recv, selectors.EVENT_READ, None)
             
-            while inputs:
-                try:
-                    readable, writeable, exceptional = select.select(inputs, outputs, inputs)
-                except ValueError:
-                    # remove the closed sockets from the list
-                    removelist = list()
-                    for s in inputs:
-                        if s.fileno() < 0:
-                            removelist.append(s)
-                    for s in removelist:
-                        print(f"removing {s} from input")
-                        inputs.remove(s)
-                    removelist = list()
-                    for s in outputs:
-                        if s.fileno() < 0:
-                            removelist.append(s)
-                    for s in removelist:
-                        print(f"removing {s} from output")
-                        outputs.remove(s)
-                    readable, writeable, exceptional = select.select(inputs, outputs, inputs)
-                    continue
-                        
-                
-                for s in readable:
-                    if s is self.__sockt:
-                        connection, client_address = s.accept()
-                        #print(f"New connection from {client_address}")
-                        connection.setblocking(0)
-                        inputs.append(connection)
+            while not self.__closed:
+                for key, mask in self.__selector.select():
+                    if key.fileobj in self.__listeners and self.__udp:
+                        if mask & selectors.EVENT_READ:
+                            self.__receive_datagrams(key.fileobj)
+                        if mask & selectors.EVENT_WRITE:
+                            for subscriber in list(self.__udp_writers[key.fileobj]):
+                                self.__write(subscriber)
+                    elif key.fileobj in self.__listeners:
+                        self.__accept(key.fileobj)
+                    elif key.fileobj is self.__wakeup_recv:
+                        self.__drain_wakeup()
                     else:
-                        data = s.recv(self.__PACKET_SIZE)
-                        if data:
-                            self.__incoming.put(data)
-                            #print(f"Received: {str(data, 'UTF-8')}")
-                            if s not in outputs:
-                                # use this open connection to send data
-                                outputs.append(s) 
-                        else: # closed
-                            if s in outputs:
-                                outputs.remove(s)
-                            inputs.remove(s)
-                            s.close()
-                for s in writeable:
-                    while not self.__outgoing.empty():
-                        try:
-                            next_msg = self.__outgoing.get()
-                        except:
-                            outputs.remove(s)
-                        else:
-                            print(f"To Backseat: {str(next_msg, 'utf-8')}\n")
-                            s.send(next_msg)
-                            self.__outgoing.task_done()
-                            
-                for s in exceptional:
-                    inputs.remove(s)
-                    if s in outputs:
-                        outputs.remove(s)
-                    s.close()            
-
-        except:
+                        if mask & selectors.EVENT_READ:
+                            self.__read(key.data)
+                        if mask & selectors.EVENT_WRITE and key.fileobj in self.__connections:
+                            self.__write(key.data)
+                
+                # hand newly queued messages to every subscriber
+                if len(self.__outgoing) > 0 and len(self.__connections) > 0:
+                    self.__take_outgoing()
+        except Exception:
             traceback.print_exc()
-            print(f"inputs = {inputs}")
-            print(f"outputs = {outputs}")
-            self.cleanup()
+        finally:
+            self.__running = False
+            self.__close()
             
-    # send message to the payload - try without a worker thread for now
+    # send message to the payload, and to every observer
     def send_command(self, cmd):
-        if self.__outgoing.full():
-            _ = self.__outgoing.get() # dump message
-            self.__outgoing.task_done()
-        self.__outgoing.put(bytes(cmd, 'utf-8'))
+        if len(self.__outgoing) == self.__outgoing.maxlen:
+            self.__stats['messages_dropped'] += 1
+        self.__outgoing.append(bytes(cmd, 'utf-8'))
+        try:
+            self.__wakeup_send.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass # already woken, or closed
                     
     def cleanup(self):
-        self.__sockt.close()
+        self.__closed = True
+        if self.__running:
+            try:
+                self.__wakeup_send.send(b'\0')
+            except OSError:
+                pass
+        else:
+            self.__close()
+            
+    # pick up whatever messages have been accumulated since last request
+    def receive_mail(self):
+        return self.__incoming.take()
+    
+    def subscribers(self):
+        return list(self.__connections.values())
+    
+    # byte and syscall counters per direction, over all subscribers
+    def get_stats(self):
+        stats = dict(self.__stats)
+        elapsed = time.monotonic() - self.__start_time
+        stats['send_calls_per_second'] = stats['send_calls'] / elapsed
+        stats['recv_calls_per_second'] = stats['recv_calls'] / elapsed
+        stats['bytes_per_send'] = stats['bytes_sent'] / max(1, stats['send_calls'])
+        stats['bytes_per_recv'] = stats['bytes_received'] / max(1, stats['recv_calls'])
+        return stats
+    
+    # change how much one subscriber may fall behind, and what happens when it does
+    def set_subscriber_policy(self, subscriber, policy=None, max_messages=None):
+        if policy is not None:
+            if policy not in SLOW_CONSUMER_POLICIES:
+                raise ValueError(f"Unknown slow consumer policy {policy}")
+            subscriber.policy = policy
+        if max_messages is not None:
+            subscriber.max_messages = max_messages
+    
+    def __close(self):
+        self.__closed = True
+        if not self.__udp:
+            for connection in list(self.__connections):
+                connection.close()
+        self.__connections.clear()
+        self.__selector.close()
+        for listener in self.__listeners:
+            listener.close()
+        if self.__transport == 'unix':
+            for port in self.__ports:
+                if os.path.exists(unix_socket_path(port)):
+                    os.unlink(unix_socket_path(port))
+        self.__wakeup_recv.close()
+        self.__wakeup_send.close()
+        
+    def __drain_wakeup(self):
+        try:
+            while self.__wakeup_recv.recv(self.__PACKET_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        
+    def __accept(self, listener):
+        try:
+            connection, client_address = listener.accept()
+        except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+            return
+        
+        connection.setblocking(False)
+        _no_delay(connection, self.__transport)
+        subscriber = SandsharkSubscriber(self.__next_id, connection, client_address,
+                                         observer=self.__listeners[listener],
+                                         max_messages=self.__max_messages,
+                                         policy=self.__policy)
+        self.__next_id += 1
+        self.__connections[connection] = subscriber
+        self.__selector.register(connection, selectors.EVENT_READ, subscriber)
+        
+    # datagrams from a new address subscribe it
+    def __receive_datagrams(self, listener):
+        while True:
+            try:
+                data, address = listener.recvfrom(self.__PACKET_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue # ICMP error from an earlier send
+            
+            self.__stats['recv_calls'] += 1
+            self.__stats['bytes_received'] += len(data)
+            subscriber = self.__connections.get((listener, address))
+            if subscriber is None:
+                subscriber = SandsharkSubscriber(self.__next_id, listener, address,
+                                                 observer=self.__listeners[listener],
+                                                 max_messages=self.__max_messages,
+                                                 policy=self.__policy)
+                self.__next_id += 1
+                self.__connections[(listener, address)] = subscriber
+                
+            self.__receive(subscriber, data if data.endswith(b'\n') else data + b'\n')
             
-    def __listener_thread(self, client):
-        done = False
-        msg_list = list()
-        while not done:
-            data = client.recv(self.__PACKET_SIZE)
-        
-            if data:
-                msg_list.append(str(data, 'utf-8'))
+    def __drop(self, subscriber):
+        if self.__udp:
+            key = (subscriber.connection, subscriber.address)
+            if key in self.__connections:
+                self.__set_udp_writer(subscriber, False)
+        else:
+            key = subscriber.connection
+        if self.__connections.pop(key, None) is None:
+            return
+        
+        if not self.__udp:
+            self.__selector.unregister(subscriber.connection)
+            subscriber.connection.close()
+        
+    def __take_outgoing(self):
+        # popped one by one, as send_command may append from another thread
+        msgs = list()
+        while len(self.__outgoing) > 0:
+            msgs.append(self.__outgoing.popleft())
+        for subscriber in list(self.__connections.values()):
+            for msg in msgs:
+                if not self.__enqueue(subscriber, msg):
+                    break
             else:
-                done = True
+                if not subscriber.writing:
+                    self.__write(subscriber)
+                    
+    # returns False if the subscriber was disconnected for falling behind
+    def __enqueue(self, subscriber, msg):
+        if not _enqueue(subscriber, msg):
+            self.__drop(subscriber)
+            return False
+        return True
         
-        client.close()
+    def __read(self, subscriber):
+        try:
+            data = subscriber.connection.recv(self.__PACKET_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+            
+        if not data: # closed
+            self.__drop(subscriber)
+            return
         
-        self.__handle_data(msg_list)
+        self.__stats['recv_calls'] += 1
+        self.__stats['bytes_received'] += len(data)
+        self.__receive(subscriber, data)
         
-    # interpret the received strings
-    def receive_mail(self):
-        your_mail = list()
-        while not self.__incoming.empty():
-            msg = self.__incoming.get()
-            your_mail.append(msg)
-            self.__incoming.task_done()
+    def __receive(self, subscriber, data):
+        for msg in subscriber.framer.feed(data):
+            if not subscriber.observer:
+                self.__incoming.put(msg)
             
-        return your_mail
+    # write what the socket will take, all queued messages in one call (one
+    # datagram each for udp); only ask for write readiness while data is left over
+    def __write(self, subscriber):
+        pending = subscriber.pending
+        while len(pending) > 0:
+            try:
+                if self.__udp:
+                    sent = subscriber.connection.sendto(pending[0], subscriber.address)
+                else:
+                    sent = _send_pending(subscriber)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self.__drop(subscriber)
+                return
+            
+            self.__stats['send_calls'] += 1
+            self.__stats['bytes_sent'] += sent
+            
+            if _retire(subscriber, sent) > 0:
+                break # the socket took part of a message, so it is full
+        
+        writing = len(pending) > 0
+        if writing != subscriber.writing:
+            subscriber.writing = writing
+            if self.__udp:
+                self.__set_udp_writer(subscriber, writing)
+            else:
+                mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+                self.__selector.modify(subscriber.connection, mask, subscriber)
+                
+    # udp subscribers share their server socket, which asks for write
+    # readiness while any of them has something unsent
+    def __set_udp_writer(self, subscriber, writing):
+        writers = self.__udp_writers[subscriber.connection]
+        before = len(writers) > 0
+        if writing:
+            writers.add(subscriber)
+        else:
+            writers.discard(subscriber)
+            
+        if before != (len(writers) > 0):
+            mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if len(writers) > 0 else 0)
+            self.__selector.modify(subscriber.connection, mask, None)
 
-    
-# the backseat acts as client
-class SandsharkClient():
+
+# one connected backseat of a SandsharkSessionServer, with its own queue of
+# whole messages bounded to max_messages
+class SandsharkSession():
+    def __init__(self, session_id, connection, address,
+                 max_messages=64, policy='drop_oldest'):
+        self.session_id = session_id
+        self.connection = connection
+        self.address = address
+        self.framer = NMEAFramer()
+        self.pending = collections.deque()
+        self.offset = 0 # bytes of pending[0] already written
+        self.max_messages = max_messages
+        self.policy = policy
+        self.sent = 0
+        self.dropped = 0
+        self.writing = False # registered for write readiness
+        
+    def __repr__(self):
+        return f"SandsharkSession({self.session_id}, {self.address})"
+        
+# one connection to a SandsharkServer; the bytes in its queue are shared
+# between subscribers
+class SandsharkSubscriber(SandsharkSession):
+    def __init__(self, session_id, connection, address, observer=False,
+                 max_messages=64, policy='drop_oldest'):
+        super().__init__(session_id, connection, address, max_messages, policy)
+        self.observer = observer # what it sends is discarded
+        
+    def __repr__(self):
+        role = "observer" if self.observer else "backseat"
+        return f"SandsharkSubscriber({self.session_id}, {self.address}, {role})"
+        
+## Front seat server hosting many independent vehicle sessions, one per
+## accepted connection. Nothing runs in the background: the owner calls
+## poll() from its own loop, which services every session at once.
+## Each session queues at most max_messages, and a session that falls behind
+## is handled by policy as SandsharkServer handles a slow subscriber.
+class SandsharkSessionServer():
     def __init__(self,
-                 host="localhost",
+                 host="",
                  port=8000,
-                 PACKET_SIZE=1024):
+                 PACKET_SIZE=1024,
+                 max_sessions=8,
+                 max_messages=64,
+                 policy='drop_oldest'):
 
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy {policy}")
+        
         self.__host = host
         self.__port = port
         self.__PACKET_SIZE = PACKET_SIZE
+        self.__max_sessions = max_sessions
+        self.__max_messages = max_messages
+        self.__policy = policy
         
         # bind to port
         self.__sockt = socket.socket(socket.AF_INET,
                                      socket.SOCK_STREAM)
-        connected = False
-        while not connected:
+        self.__sockt.bind((host, port))
+        self.__sockt.listen(5)
+        self.__sockt.setblocking(False)
+        
+        self.__selector = selectors.DefaultSelector()
+        self.__selector.register(self.__sockt, selectors.EVENT_READ, None)
+        self.__sessions = dict()
+        self.__next_id = 0
+        self.__events = list()
+        
+    # wait up to timeout seconds for socket activity and service it. Returns
+    # a list of events: ('connect', session), ('message', session, sentence)
+    # or ('disconnect', session), where sentence is a memoryview
+    # from the session's NMEAFramer
+    def poll(self, timeout=None):
+        if len(self.__events) > 0:
+            timeout = 0
+            
+        for key, mask in self.__selector.select(timeout):
+            session = key.data
+            if session is None:
+                self.__accept()
+                continue
+            
+            if mask & selectors.EVENT_READ:
+                self.__read(session)
+                
+            if mask & selectors.EVENT_WRITE and session.session_id in self.__sessions:
+                self.__write(session)
+                
+        events = self.__events
+        self.__events = list()
+        return events
+    
+    def sessions(self):
+        return list(self.__sessions.values())
+    
+    # queue a message for one session; it is written as soon as the socket takes it
+    def send_command(self, session, cmd):
+        if session.session_id not in self.__sessions:
+            return
+        
+        if not _enqueue(session, bytes(cmd, 'utf-8')):
+            self.close_session(session)
+            return
+        if not session.writing:
+            self.__write(session)
+            
+    def close_session(self, session):
+        if self.__sessions.pop(session.session_id, None) is None:
+            return
+        
+        self.__selector.unregister(session.connection)
+        session.connection.close()
+        self.__events.append(('disconnect', session))
+            
+    def cleanup(self):
+        for session in self.sessions():
+            self.close_session(session)
+        self.__selector.close()
+        self.__sockt.close()
+        
+    def __accept(self):
+        try:
+            connection, client_address = self.__sockt.accept()
+        except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+            return # nothing to accept, or the client reset before we got to it
+        
+        if len(self.__sessions) >= self.__max_sessions:
+            connection.close()
+            return
+        
+        connection.setblocking(False)
+        _no_delay(connection, 'tcp')
+        session = SandsharkSession(self.__next_id, connection, client_address,
+                                   max_messages=self.__max_messages, policy=self.__policy)
+        self.__next_id += 1
+        self.__sessions[session.session_id] = session
+        self.__selector.register(connection, selectors.EVENT_READ, session)
+        self.__events.append(('connect', session))
+        
+    def __read(self, session):
+        try:
+            data = session.connection.recv(self.__PACKET_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+            
+        if not data:
+            self.close_session(session)
+            return
+        
+        for msg in session.framer.feed(data):
+            self.__events.append(('message', session, msg))
+    
+    # write what the socket will take; only ask for write readiness while data is left over
+    def __write(self, session):
+        while len(session.pending) > 0:
             try:
-                self.__sockt.connect((host, port))
-                connected = True
-            except:
-                print("waiting to connect to front seat...")
-                time.sleep(1)
-        self.__outgoing = queue.Queue(maxsize=10)
-        self.__incoming = queue.Queue(maxsize=50)
+                sent = _send_pending(session)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self.close_session(session)
+                return
+            
+            if _retire(session, sent) > 0:
+                break # the socket took part of a message, so it is full
+        
+        writing = len(session.pending) > 0
+        if writing != session.writing:
+            mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self.__selector.modify(session.connection, mask, session)
+            session.writing = writing
+    
+# connection states reported by SandsharkClient
+LINK_STATES = ('connecting', 'connected', 'disconnected', 'closed')
+
+# the backseat acts as client, over any of the TRANSPORTS; the front seat
+# has to use the same one. run() is one selector loop that reads as soon
+# as the front seat sends, and writes the messages queued in a tick together
+# when flush() is called or flush_deadline has passed; it sleeps in select()
+# otherwise.
+#
+# Connecting happens in the same loop and never blocks: a failed attempt or a
+# dropped connection is retried after reconnect_min seconds, doubling up to
+# reconnect_max. While there is no connection up to max_buffered outbound
+# messages are kept (the oldest are dropped) and sent once it is back.
+# on_state_change(state) is called from the loop with each of LINK_STATES.
+# udp has no connection to lose: the front seat hears from the backseat
+# again with its next message.
+class SandsharkClient():
+    def __init__(self,
+                 host="localhost",
+                 port=8000,
+                 PACKET_SIZE=1024,
+                 transport='tcp',
+                 flush_deadline=0.005,
+                 reconnect_min=0.5,
+                 reconnect_max=8.0,
+                 max_buffered=10,
+                 on_state_change=None):
+
+        _check_transport(transport)
+        self.__host = host
+        self.__port = port
+        self.__PACKET_SIZE = PACKET_SIZE
+        self.__transport = transport
+        self.__udp = transport == 'udp'
+        self.__flush_deadline = flush_deadline
+        
+        # connection management; run() makes the first attempt straight away
+        self.__sockt = None
+        self.__state = 'disconnected'
+        self.__on_state_change = on_state_change
+        self.__connected = threading.Event()
+        self.__reconnect_min = reconnect_min
+        self.__reconnect_max = reconnect_max
+        self.__backoff = reconnect_min
+        self.__reconnect_at = 0.0
+        
+        # (time queued, message); the oldest message is dropped when full
+        self.__outgoing = collections.deque(maxlen=max_buffered)
+        # only the newest navigation update of each type is kept
+        self.__incoming = NMEAMailbox()
+        self.__send_buffer = bytearray()
+        self.__datagrams = collections.deque() # udp: one sentence each
+        self.__framer = NMEAFramer()
+        self.__writing = False # registered for write readiness
+        
+        # lets other threads interrupt select() when there is something to send
+        self.__wakeup_recv, self.__wakeup_send = socket.socketpair()
+        self.__wakeup_recv.setblocking(False)
+        self.__wakeup_send.setblocking(False)
+        
+        # messages wait to be written together until flush() or the deadline
+        self.__flush_at = None
+        self.__flush_requested = False
+        
+        self.__selector = selectors.DefaultSelector()
+        self.__running = False
+        self.__closed = False
+        
+        self.__start_time = time.monotonic()
+        self.__stats = dict([
+            ('bytes_sent', 0),
+            ('bytes_received', 0),
+            ('send_calls', 0),
+            ('recv_calls', 0),
+            ('messages_sent', 0),
+            ('messages_received', 0),
+            ('messages_delivered', 0),      # picked up by receive_mail()
+            ('messages_dropped', 0),        # outbound, queue full (e.g. during an outage)
+            ('connects', 0),
+            ('disconnects', 0),
+            ('last_send_time', None),
+            ('last_receive_time', None),
+            ('send_queue_latency', 0.0),    # total s from send_message() to the socket
+            ('receive_queue_latency', 0.0), # total s from the socket to receive_mail()
+            ('max_send_queue_latency', 0.0),
+            ('max_receive_queue_latency', 0.0),
+        ])
         
     def run(self):
+        self.__running = True
         try:
-            remain = b''
-            while True:
-                if not self.__outgoing.empty():
-                    next_msg = self.__outgoing.get()
-                    try:
-                        self.__sockt.connect((self.__host, self.__port))
-                    except:
-                        pass
-                    self.__sockt.send(next_msg)
-                    self.__outgoing.task_done()
-    
-                    #time.sleep(0.01)
+            if self.__closed:
+                return # cleanup() came first and has closed the selector
+            self.__selector.register(self.__wakeup_recv, selectors.EVENT_READ)
+            
+            while not self.__closed:
+                if self.__sockt is None and time.monotonic() >= self.__reconnect_at:
+                    self.__connect()
+                    
+                for key, mask in self.__selector.select(self.__next_timeout()):
+                    if key.fileobj is self.__wakeup_recv:
+                        self.__drain_wakeup()
+                        continue
                     
-                    # now check for messages in return
-                    data = self.__sockt.recv(self.__PACKET_SIZE)
-                    #msgs = list()
-                    if data:
-                        data = remain + data
-                        msgs = data.split(b'\n')
-                        #print(f"msgs = {msgs}")
-                        # check if msgs[-1] is complete
-                        if len(msgs[-1])<10 or (msgs[-1][-1] != '\r' and msgs[-1][-3] != '*'):
-                            remain = msgs[-1]
-                            msgs = msgs[:-1]
-                            #print(f"remain = {remain}")
-                            #print(f"msgs2 = {msgs}")
-                            
-                        for msg in msgs:
-                            self.__incoming.put(msg)
+                    if self.__state == 'connecting':
+                        self.__finish_connect()
+                        continue
+                    
+                    if mask & selectors.EVENT_READ:
+                        if not self.__read():
+                            self.__disconnect()
+                            break
                         
-                time.sleep(0.01)
-        except:
+                    if mask & selectors.EVENT_WRITE:
+                        self.__write()
+                
+                # on flush() or the deadline, move everything queued to the socket
+                # in one write; without a connection it stays queued
+                flush_at = self.__flush_at
+                if self.__flush_requested or (flush_at is not None and time.monotonic() >= flush_at):
+                    self.__flush_requested = False
+                    self.__flush_at = None
+                    self.__send_queued()
+                
+                self.__update_write_interest()
+        except Exception:
             traceback.print_exc()
-            self.cleanup()
+        finally:
+            self.__running = False
+            self.__close()
             
-    # send command to the vehicle - try without a worker thread for now
+    # send command (str, or bytes) to the vehicle. It goes out with the others
+    # queued in the same tick, on flush() or at most flush_deadline seconds later
     def send_message(self, cmd):
-        if self.__outgoing.full():
-            _ = self.__outgoing.get() # dump message
-            self.__outgoing.task_done()
-        self.__outgoing.put(bytes(cmd, 'utf-8'))
+        if len(self.__outgoing) == self.__outgoing.maxlen:
+            self.__stats['messages_dropped'] += 1
+        if isinstance(cmd, str):
+            cmd = bytes(cmd, 'utf-8')
+        self.__outgoing.append((time.time(), cmd))
+        if self.__flush_at is None:
+            self.__flush_at = time.monotonic() + self.__flush_deadline
+            self.__wake()
+            
+    # write everything queued so far now, e.g. at the end of a control tick
+    def flush(self):
+        self.__flush_requested = True
+        self.__wake()
+        
+    # one of LINK_STATES
+    def get_state(self):
+        return self.__state
+    
+    # block until connected; returns False on timeout
+    def wait_connected(self, timeout=None):
+        return self.__connected.wait(timeout)
+        
+    def __wake(self):
+        try:
+            self.__wakeup_send.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass # already woken, or closed
+        
+    def __next_timeout(self):
+        deadlines = list()
+        if self.__flush_at is not None:
+            deadlines.append(self.__flush_at)
+        if self.__sockt is None:
+            deadlines.append(self.__reconnect_at)
+        if len(deadlines) == 0:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+    
+    def __set_state(self, state):
+        if state == self.__state:
+            return
+        
+        self.__state = state
+        if state == 'connected':
+            self.__connected.set()
+        else:
+            self.__connected.clear()
+            
+        if self.__on_state_change is not None:
+            try:
+                self.__on_state_change(state)
+            except Exception:
+                traceback.print_exc()
+                
+    def __connect(self):
+        self.__set_state('connecting')
+        try:
+            self.__sockt, in_progress = _start_connect(self.__transport, self.__host, self.__port)
+        except OSError:
+            self.__retry_later()
+            return
+        
+        if in_progress:
+            self.__selector.register(self.__sockt, selectors.EVENT_WRITE)
+        else:
+            self.__selector.register(self.__sockt, selectors.EVENT_READ)
+            self.__on_connected()
+            
+    # the socket became writeable: the connect finished, one way or the other
+    def __finish_connect(self):
+        err = self.__sockt.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            self.__selector.unregister(self.__sockt)
+            self.__sockt.close()
+            self.__sockt = None
+            self.__retry_later()
+            return
+        
+        self.__selector.modify(self.__sockt, selectors.EVENT_READ)
+        self.__on_connected()
+        
+    def __on_connected(self):
+        _no_delay(self.__sockt, self.__transport)
+        if self.__udp:
+            try:
+                self.__sockt.send(b'\n') # subscribe
+            except OSError:
+                pass
+        
+        self.__framer = NMEAFramer() # nothing carries over from an old connection
+        self.__writing = False
+        self.__backoff = self.__reconnect_min
+        self.__stats['connects'] += 1
+        self.__set_state('connected')
+        
+        # whatever was buffered during the outage
+        self.__send_queued()
+        
+    def __retry_later(self):
+        self.__set_state('disconnected')
+        self.__reconnect_at = time.monotonic() + self.__backoff
+        self.__backoff = min(2*self.__backoff, self.__reconnect_max)
+        
+    # the connection dropped; a partly written batch is lost
+    def __disconnect(self):
+        if self.__sockt is None:
+            return
+        
+        self.__selector.unregister(self.__sockt)
+        self.__sockt.close()
+        self.__sockt = None
+        self.__send_buffer.clear()
+        self.__datagrams.clear()
+        self.__writing = False
+        self.__stats['disconnects'] += 1
+        self.__retry_later()
+        
+    def __send_queued(self):
+        if len(self.__outgoing) > 0 and self.__state == 'connected' and not self.__closed:
+            self.__take_outgoing()
+            self.__write()
+            
+    # only ask for write readiness while something is still waiting
+    def __update_write_interest(self):
+        if self.__state != 'connected' or self.__closed:
+            return
+        
+        writing = self.__has_unsent()
+        if writing != self.__writing:
+            self.__writing = writing
+            mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self.__selector.modify(self.__sockt, mask)
         
     # pick up whatever messages have been accumulated since last request
     def receive_mail(self):        
         your_mail = list()
-        while not self.__incoming.empty():
-            msg = self.__incoming.get()
+        now = time.time()
+        for received, msg in self.__incoming.take():
             your_mail.append(msg)
-            self.__incoming.task_done()
+            self.__stats['messages_delivered'] += 1
+            self.__count_latency('receive_queue_latency', now - received)
             
         return your_mail
-
+    
+    # byte, message and syscall counters per direction, connects and
+    # disconnects, queueing latency, framing errors (on the current
+    # connection) and mailbox coalescing
+    def get_stats(self):
+        stats = dict(self.__stats)
+        elapsed = time.monotonic() - self.__start_time
+        stats['send_calls_per_second'] = stats['send_calls'] / elapsed
+        stats['recv_calls_per_second'] = stats['recv_calls'] / elapsed
+        stats['bytes_per_send'] = stats['bytes_sent'] / max(1, stats['send_calls'])
+        stats['bytes_per_recv'] = stats['bytes_received'] / max(1, stats['recv_calls'])
+        stats['framing'] = self.__framer.get_stats()
+        stats['mailbox'] = self.__incoming.get_stats()
+        return stats
                     
     def cleanup(self):
-        self.__sockt.close()
+        self.__closed = True
+        if self.__running:
+            self.__wake()
+        else:
+            self.__close()
             
-    def __listener_thread(self, client):
-        done = False
-        msg_list = list()
-        while not done:
-            data = client.recv(self.__PACKET_SIZE)
-        
-            if data:
-                msg_list.append(str(data, 'utf-8'))
+    def __close(self):
+        self.__closed = True
+        self.__selector.close()
+        if self.__sockt is not None:
+            self.__sockt.close()
+            self.__sockt = None
+        self.__set_state('closed')
+        self.__wakeup_recv.close()
+        self.__wakeup_send.close()
+        
+    def __drain_wakeup(self):
+        try:
+            while self.__wakeup_recv.recv(self.__PACKET_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        
+    def __take_outgoing(self):
+        now = time.time()
+        while len(self.__outgoing) > 0:
+            queued, msg = self.__outgoing.popleft()
+            if self.__udp:
+                self.__datagrams.append(msg)
             else:
-                done = True
+                self.__send_buffer += msg
+            self.__stats['messages_sent'] += 1
+            self.__count_latency('send_queue_latency', now - queued)
+            
+    def __has_unsent(self):
+        return len(self.__send_buffer) > 0 or len(self.__datagrams) > 0
+            
+    def __write(self):
+        if self.__udp:
+            self.__write_datagrams()
+            return
         
-        client.close()
+        try:
+            sent = self.__sockt.send(self.__send_buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.__disconnect()
+            return
+        
+        self.__stats['send_calls'] += 1
+        del self.__send_buffer[:sent]
+        self.__stats['bytes_sent'] += sent
+        self.__stats['last_send_time'] = time.time()
+        
+    def __write_datagrams(self):
+        while len(self.__datagrams) > 0:
+            try:
+                sent = self.__sockt.send(self.__datagrams[0])
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                sent = 0 # e.g. nobody listening right now; the sentence is lost
+            
+            self.__stats['send_calls'] += 1
+            self.__datagrams.popleft()
+            self.__stats['bytes_sent'] += sent
+            self.__stats['last_send_time'] = time.time()
         
-        self.__handle_data(msg_list)
+    # returns False once the front seat has closed or reset the connection
+    def __read(self):
+        try:
+            data = self.__sockt.recv(self.__PACKET_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            # for udp, an ICMP error from an earlier datagram
+            return self.__udp
+        
+        self.__stats['recv_calls'] += 1
+        if self.__udp:
+            if not data.endswith(b'\n'):
+                data += b'\n' # a datagram is a whole sentence
+        elif not data:
+            return False
+        
+        now = time.time()
+        self.__stats['bytes_received'] += len(data)
+        self.__stats['last_receive_time'] = now
         
-    # interpret the received strings
-    def __handle_data(self, data):
-        print(f"Received {data}")
-        #nmea.parse(data)        
+        for msg in self.__framer.feed(data):
+            self.__incoming.put(msg, (now, msg))
+            self.__stats['messages_received'] += 1
+            
+        return True
+    
+    def __count_latency(self, name, latency):
+        self.__stats[name] += latency
+        if latency > self.__stats['max_' + name]:
+            self.__stats['max_' + name] = latency
         
 # for unit test
 def main():
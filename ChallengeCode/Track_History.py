@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:15 2026
+
+Bounded track history for the simulator.
+
+Samples go into a preallocated ring buffer that is stored twice, back to back,
+so the most recent K samples are always one contiguous slice: recent() hands
+out a view instead of a copy. The full-rate history is spilled every so often
+to an append-only binary file (float64 rows of TRACK_COLUMNS), which
+TrackHistory.load() reads back for post-run analysis.
+
+@author: Team Baygulls
+"""
+import numpy as np
+
+TRACK_COLUMNS = ('time', 'x', 'y', 'heading')
+
+class TrackHistory():
+    def __init__(self, capacity=1000, spill_file=None, spill_every=None):
+        self.__capacity = capacity
+        self.__buffer = np.zeros((2*capacity, len(TRACK_COLUMNS)))
+        self.__count = 0
+
+        # spill before anything unspilled can be overwritten
+        self.__spill_file = spill_file
+        self.__spill_every = capacity // 2 if spill_every is None else min(spill_every, capacity)
+        self.__spilled = 0
+
+    def __len__(self):
+        return min(self.__count, self.__capacity)
+
+    def append(self, time, x, y, heading=0.0):
+        slot = self.__count % self.__capacity
+        self.__buffer[slot] = (time, x, y, heading)
+        self.__buffer[slot + self.__capacity] = self.__buffer[slot]
+        self.__count += 1
+
+        if self.__spill_file is not None and self.__count - self.__spilled >= self.__spill_every:
+            self.spill()
+
+    # view (not a copy) of the last k samples, oldest first
+    def recent(self, k=None):
+        k = len(self) if k is None else min(k, len(self))
+        end = (self.__count - 1) % self.__capacity + self.__capacity + 1
+        return self.__buffer[end - k:end]
+
+    # view of the last k (x, y) positions
+    def recent_positions(self, k=None):
+        return self.recent(k)[:, 1:3]
+
+    def spill(self):
+        pending = self.__count - self.__spilled
+        if self.__spill_file is None or pending == 0:
+            return
+
+        start = self.__spilled % self.__capacity
+        with open(self.__spill_file, 'ab') as f:
+            self.__buffer[start:start + pending].tofile(f)
+        self.__spilled = self.__count
+
+    def close(self):
+        self.spill()
+
+    @staticmethod
+    def load(filename):
+        return np.fromfile(filename).reshape((-1, len(TRACK_COLUMNS)))
@@ -14,4 +14,5 @@ from .types import *
 
 from .stream import NMEAStreamReader
 from .nmea_file import NMEAFile
+from .compact import CompactSentence
 
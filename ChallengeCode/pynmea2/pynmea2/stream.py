@@ -9,13 +9,14 @@ class NMEAStreamReader(object):
     '''
     Reads NMEA sentences from a stream.
     '''
-    def __init__(self, stream=None, errors='raise'):
+    def __init__(self, stream=None, errors='raise', max_line_length=4096):
         '''
         Create NMEAStreamReader object.
 
         `stream`:   file-like object to read from, can be omitted to
                     pass data to `next` manually.
                     must support `.readline()` which returns a string
+                    (or bytes)
 
         `errors`: behaviour when a parse error is encountered. can be one of:
             `'raise'` (default) raise an exception immediately
@@ -23,21 +24,59 @@ class NMEAStreamReader(object):
                                 stream, and continue reading at the next line
             `'ignore'`          completely ignore and suppress the error, and
                                 continue reading at the next line
+            or a callable, which is given each ParseError, and reading
+            continues at the next line
+
+        `max_line_length`: longest line kept, in characters (bytes); the rest
+            of a longer line is dropped and reported as a ParseError. None
+            keeps lines of any length.
+
+        Data can be str, or bytes-like (bytes, bytearray, memoryview), which
+        is decoded as latin-1 one line at a time. Each character is scanned
+        once, so a long run without a newline costs no more than a short one.
         '''
 
-        if errors not in ERRORS:
-            raise ValueError('errors must be one of {!r} (was: {!r})'
+        if errors not in ERRORS and not callable(errors):
+            raise ValueError('errors must be one of {!r} or callable (was: {!r})'
                     .format(ERRORS, errors))
 
         self.errors = errors
         self.stream = stream
+        self.max_line_length = max_line_length
+
         self.buffer = ''
 
+    @property
+    def buffer(self):
+        '''
+        The partial line received so far. Assigning to it replaces it (str, or
+        bytes-like): the assigned data comes before the next data given to
+        `next`.
+        '''
+        if self._bytes is not None:
+            return bytes(self._bytes)
+        return self._carry + ''.join(self._pieces)
+
+    @buffer.setter
+    def buffer(self, value):
+        # the partial line: str pieces, or a bytearray for bytes-like data;
+        # assigned str is joined with the next data once
+        self._pieces = []
+        self._pending = 0
+        self._carry = ''
+        self._bytes = None
+        self._scanned = 0
+        self._discarding = False
+        if isinstance(value, str):
+            self._carry = value
+        else:
+            self._bytes = bytearray(value)
+
     def next(self, data=None):
         '''
-        consume `data` (if given, or calls `stream.read()` if `stream` was given
-        in the constructor) and yield a list of `NMEASentence` objects parsed
-        from the stream (may be empty)
+        consume `data` (if given, or calls `stream.readline()` if `stream` was
+        given in the constructor) and yield a list of `NMEASentence` objects
+        parsed from the stream (may be empty)
         '''
         if data is None:
             if self.stream:
@@ -45,10 +84,16 @@ class NMEAStreamReader(object):
             else:
                 return
 
-        lines = (self.buffer + data).split('\n')
-        self.buffer = lines.pop()
-
-        for line in lines:
+        for line in self._split(data):
+            if line.__class__ is not str:
+                # a ParseError for a line that was too long
+                if self.errors == 'raise':
+                    raise line
+                if self.errors == 'yield':
+                    yield line
+                elif self.errors != 'ignore':
+                    self.errors(line)
+                continue
             try:
                 msg = nmea.NMEASentence.parse(line)
                 yield msg
@@ -57,19 +102,106 @@ class NMEAStreamReader(object):
                     raise e
                 if self.errors == 'yield':
                     yield e
-                if self.errors == 'ignore':
-                    pass
+                elif self.errors != 'ignore':
+                    self.errors(e)
 
     __next__ = next
 
+    def next_batch(self, data=None):
+        '''
+        Like `next`, but returns the sentences as a list.
+        '''
+        return list(self.next(data))
+
     def __iter__(self):
         '''
         Support the iterator protocol.
 
-        This allows NMEAStreamReader object to be used in a for loop.
+        This allows NMEAStreamReader object to be used in a for loop, which
+        gets a list of sentences for every read from the stream and ends when
+        the stream does.
 
           for batch in NMEAStreamReader(stream):
               for msg in batch:
                   print msg
         '''
-        return self
+        while self.stream:
+            data = self.stream.readline()
+            if not data:
+                return
+            yield self.next_batch(data)
+
+    def _too_long(self, line):
+        return nmea.ParseError(
+            'line longer than %d characters' % self.max_line_length, line)
+
+    # the complete lines in data (str), and ParseErrors for lines too long
+    def _split(self, data):
+        if isinstance(data, str):
+            if self._bytes is not None:
+                raise TypeError('str data after bytes data on one stream')
+            return self._split_text(data)
+        if self._pieces or self._carry:
+            raise TypeError('bytes data after str data on one stream')
+        return self._split_bytes(data)
+
+    def _split_text(self, data):
+        if self._carry:
+            data = self._carry + data
+            self._carry = ''
+        lines = data.split('\n')
+        tail = lines.pop()
+        limit = self.max_line_length
+        if lines:
+            if self._pieces:
+                self._pieces.append(lines[0])
+                lines[0] = ''.join(self._pieces)
+                self._pieces = []
+            if self._discarding:
+                self._discarding = False
+                del lines[0]
+            if limit is not None:
+                lines = [line if len(line) <= limit else self._too_long(line[:limit])
+                         for line in lines]
+            self._pending = 0
+
+        if tail and not self._discarding:
+            self._pieces.append(tail)
+            self._pending += len(tail)
+            if limit is not None and self._pending > limit:
+                if not self._discarding:
+                    lines.append(self._too_long(''.join(self._pieces)[:limit]))
+                    self._discarding = True
+                self._pieces = []
+                self._pending = 0
+        return lines
+
+    def _split_bytes(self, data):
+        if self._bytes is None:
+            self._bytes = bytearray()
+        buf = self._bytes
+        buf += data
+        limit = self.max_line_length
+
+        lines = []
+        start = 0
+        end = buf.find(b'\n', self._scanned)
+        while end >= 0:
+            if self._discarding:
+                self._discarding = False
+            elif limit is not None and end - start > limit:
+                lines.append(self._too_long(str(buf[start:start + limit], 'latin-1')))
+            else:
+                lines.append(str(buf[start:end], 'latin-1'))
+            start = end + 1
+            end = buf.find(b'\n', start)
+
+        if limit is not None and len(buf) - start > limit:
+            if not self._discarding:
+                lines.append(self._too_long(str(buf[start:start + limit], 'latin-1')))
+                self._discarding = True
+            start = len(buf)
+
+        del buf[:start]
+        self._scanned = len(buf)
+        return lines
@@ -0,0 +1,60 @@
+import pytest
+
+import pynmea2
+from pynmea2 import CompactSentence
+
+DATA = "$GPGGA,184353.07,1929.045,S,02410.506,E,1,04,2.6,100.00,M,-33.9,M,,0000*6D"
+NOR = "$PNORBT0,1,040721,131335.3341,23.961,-48.122,-32.76800,10.00000,0.00,0x00000000*48"
+
+
+def test_compact_talker():
+    full = pynmea2.parse(DATA)
+    msg = CompactSentence.parse(DATA)
+    assert not hasattr(msg, '__dict__')
+    assert msg.talker == 'GP'
+    assert msg.sentence_type == 'GGA'
+    assert msg.data == full.data
+    assert msg.timestamp == full.timestamp
+    assert msg.latitude == full.latitude
+    assert msg.altitude == 100.0
+    assert msg.num_sats == '04'
+    assert str(msg) == DATA
+    assert repr(msg) == repr(full)
+    assert msg.render(dollar=False, checksum=False) == full.render(dollar=False, checksum=False)
+    with pytest.raises(AttributeError):
+        msg.foobar
+    with pytest.raises(AttributeError):
+        msg.lat = '0'
+
+
+def test_compact_proprietary():
+    full = pynmea2.parse(NOR)
+    msg = CompactSentence.from_sentence(full)
+    assert msg.manufacturer == 'NOR'
+    assert msg.sentence_type == 'NORBT0'
+    assert msg.datetime == full.datetime
+    assert msg.dt1 == full.dt1
+    assert str(msg) == NOR
+
+
+def test_compact_expand():
+    for data in (DATA, NOR):
+        full = pynmea2.parse(data)
+        expanded = CompactSentence.parse(data).expand()
+        assert type(expanded) is type(full)
+        assert expanded.data == full.data
+        assert str(expanded) == data
+
+    expanded = CompactSentence.parse(DATA).expand()
+    expanded.altitude = 5
+    assert expanded.altitude == 5.0
+
+
+def test_compact_errors():
+    with pytest.raises(pynmea2.ChecksumError):
+        CompactSentence.parse(DATA[:-2] + '00')
+    with pytest.raises(pynmea2.ChecksumError):
+        CompactSentence.parse(DATA[:-3], check=True)
+    with pytest.raises(pynmea2.SentenceTypeError):
+        CompactSentence.parse('$GPABC,1,2,3')
+    assert isinstance(CompactSentence.parse('$CCGPQ,GGA'), pynmea2.QuerySentence)
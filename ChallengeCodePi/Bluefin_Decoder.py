@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:42:18 2026
+
+Decoder for the Bluefin sentences the backseat acts on, working on the framed
+bytes (a memoryview from NMEAFramer, or bytes): $BFNVG, $BFNVR, $BFACK and
+$BFVER become fixed-layout records with __slots__.
+
+The framing (the '*' one or two bytes from the end, exactly one or two hex
+digits after it, the leading '$') is checked on the sentence as given, without
+copying it. Only then is the payload between '$' and '*' copied out once: its
+checksum is checked (pynmea2's checksum.xor_checksum folds the whole payload as
+one integer), the 5-byte tag picks the decoder, and fields are split once and
+converted straight from bytes by float()/int(), so no str is built on the way.
+Timestamps (hhmmss.ss) are kept as bytes; the command name and free text of an
+acknowledgement are the only fields decoded to str.
+
+decode() returns None for a sentence it cannot use and counts why: bad
+checksum, unknown type or malformed fields.
+
+@author: Team Baygulls
+"""
+from pynmea2.pynmea2.checksum import xor_checksum
+
+# value of each byte as a hex digit, -1 if it is not one
+_HEX_VALUES = tuple(int(chr(c), 16) if chr(c) in '0123456789abcdefABCDEF' else -1
+                    for c in range(256))
+
+class _Record():
+    __slots__ = ()
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.__slots__)
+
+class NVGRecord(_Record):
+    """ Navigation update
+    """
+    __slots__ = ('timestamp', 'latitude', 'longitude', 'gps_available', 'altitude',
+                 'depth', 'heading', 'roll', 'pitch', 'fix_timestamp')
+
+    def __init__(self, fields):
+        self.timestamp = fields[1]
+        latitude = fields[2]
+        self.latitude = int(latitude[:2]) + float(latitude[2:]) / 60
+        if fields[3] == b'S':
+            self.latitude = -self.latitude
+        longitude = fields[4]
+        self.longitude = int(longitude[:3]) + float(longitude[3:]) / 60
+        if fields[5] == b'W':
+            self.longitude = -self.longitude
+        self.gps_available = int(fields[6]) if fields[6] else None
+        self.altitude = float(fields[7])
+        self.depth = float(fields[8])
+        self.heading = float(fields[9])
+        self.roll = float(fields[10])
+        self.pitch = float(fields[11])
+        self.fix_timestamp = fields[12]
+
+class NVRRecord(_Record):
+    """ Velocity and rate update
+    """
+    __slots__ = ('timestamp', 'east_velocity', 'north_velocity', 'down_velocity',
+                 'pitch_rate', 'roll_rate', 'yaw_rate')
+
+    def __init__(self, fields):
+        self.timestamp = fields[1]
+        self.east_velocity = float(fields[2])
+        self.north_velocity = float(fields[3])
+        self.down_velocity = float(fields[4])
+        self.pitch_rate = float(fields[5])
+        self.roll_rate = float(fields[6])
+        self.yaw_rate = float(fields[7])
+
+class ACKRecord(_Record):
+    """ Acknowledgment
+    """
+    __slots__ = ('timestamp', 'command_name', 'command_timestamp', 'behavior_identifier',
+                 'ack_status_code', 'undefined_int', 'ack_details')
+
+    def __init__(self, fields):
+        self.timestamp = fields[1]
+        self.command_name = str(fields[2], 'ascii')
+        self.command_timestamp = fields[3]
+        self.behavior_identifier = int(fields[4]) if fields[4] else None
+        self.ack_status_code = int(fields[5])
+        self.undefined_int = int(fields[6]) if fields[6] else None
+        # the details are free text and may themselves contain commas
+        self.ack_details = str(b','.join(fields[7:]), 'utf-8', 'replace')
+
+class VERRecord(_Record):
+    """ Vehicle interface version
+    """
+    __slots__ = ('timestamp', 'version_number')
+
+    def __init__(self, fields):
+        self.timestamp = fields[1]
+        self.version_number = str(fields[2], 'ascii')
+
+# 5-byte tag -> record type
+RECORD_TYPES = {
+    b'BFNVG': NVGRecord,
+    b'BFNVR': NVRRecord,
+    b'BFACK': ACKRecord,
+    b'BFVER': VERRecord,
+}
+
+class BluefinDecoder():
+    def __init__(self, record_types=RECORD_TYPES):
+        self.__record_types = dict(record_types)
+
+        self.__stats = dict([
+            ('decoded', 0),
+            ('bad_checksum', 0),
+            ('unknown', 0),
+            ('malformed', 0),
+        ])
+
+    # a record for a $<tag>,...*H or *HH sentence (no line ending), or None
+    def decode(self, sentence):
+        n = len(sentence)
+        if n > 8 and sentence[n - 2] == 42: # *H
+            star = n - 2
+            expected = _HEX_VALUES[sentence[n - 1]]
+        elif n > 9 and sentence[n - 3] == 42: # *HH
+            star = n - 3
+            high = _HEX_VALUES[sentence[n - 2]]
+            low = _HEX_VALUES[sentence[n - 1]]
+            expected = high << 4 | low if high >= 0 and low >= 0 else -1
+        else:
+            expected = -1
+        if expected < 0 or sentence[0] != 36: # $
+            self.__stats['malformed'] += 1
+            return None
+
+        # one copy out of the framer's buffer, of the payload only
+        data = bytes(sentence[1:star])
+        if xor_checksum(data) != expected:
+            self.__stats['bad_checksum'] += 1
+            return None
+
+        record_type = self.__record_types.get(data[:5])
+        if record_type is None:
+            self.__stats['unknown'] += 1
+            return None
+
+        try:
+            record = record_type(data.split(b','))
+        except (ValueError, IndexError):
+            self.__stats['malformed'] += 1
+            return None
+
+        self.__stats['decoded'] += 1
+        return record
+
+    def knows(self, tag):
+        return tag in self.__record_types
+
+    def get_stats(self):
+        return dict(self.__stats)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:40:26 2026
+
+Rolling latency measurements for the backseat.
+
+LatencyTracker keeps the last `window` samples of each named latency and
+reports p50/p95/p99. CommandTracker stamps outbound commands with the time
+they were sent and matches the BFACK that acknowledges each one: the vehicle
+echoes the command type and the command's own timestamp (hhmmss.sss), which
+together identify it. Commands without a timestamp (BPLOG,ACK and BPLOG,ALL)
+are all acknowledged with 000000.000, so the sends waiting under one key are
+matched to acks in the order they were sent. Times are time.monotonic()
+seconds.
+
+@author: Team Baygulls
+"""
+import time
+import collections
+
+import numpy as np
+
+class LatencyTracker():
+    def __init__(self, window=1000):
+        self.__window = window
+        self.__samples = dict()
+
+    def add(self, name, latency):
+        if name not in self.__samples:
+            self.__samples[name] = collections.deque(maxlen=self.__window)
+        self.__samples[name].append(latency)
+
+    # {name: {'count', 'p50', 'p95', 'p99', 'max'}} in seconds, over the window
+    def summary(self):
+        summary = dict()
+        for name, samples in self.__samples.items():
+            if len(samples) == 0:
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            summary[name] = {'count': len(samples),
+                             'p50': float(p50),
+                             'p95': float(p95),
+                             'p99': float(p99),
+                             'max': float(max(samples))}
+        return summary
+
+# (type, hundredths of a second) from the timestamp field (str or bytes) of a
+# command or ack; commands without a timestamp are acknowledged with 000000.000
+def _command_key(msg_type, timestamp):
+    try:
+        return msg_type, round(float(timestamp) * 100)
+    except ValueError:
+        return msg_type, 0
+
+class CommandTracker():
+    def __init__(self, latency, max_pending=64):
+        self.__latency = latency
+        self.__max_pending = max_pending
+        self.__pending = collections.OrderedDict() # key -> deque of send times
+        self.__count = 0
+
+    # an outbound $BPxxx,<timestamp>,... sentence
+    def sent(self, msg, now=None):
+        fields = msg.split('*')[0].split(',')
+        if len(fields[0]) != 6:
+            return
+
+        key = _command_key(fields[0][3:], fields[1] if len(fields) > 1 else '')
+        if key not in self.__pending:
+            self.__pending[key] = collections.deque()
+        self.__pending[key].append(time.monotonic() if now is None else now)
+        self.__pending.move_to_end(key)
+        self.__count += 1
+        if self.__count > self.__max_pending:
+            # never acknowledged: the oldest send of the least recently sent key
+            key, times = next(iter(self.__pending.items()))
+            times.popleft()
+            if len(times) == 0:
+                del self.__pending[key]
+            self.__count -= 1
+
+    # the command name and command timestamp a $BFACK echoes;
+    # returns the command-to-ack latency, or None
+    def acknowledged(self, command_name, command_timestamp, now=None):
+        key = _command_key(command_name, command_timestamp)
+        times = self.__pending.get(key)
+        if times is None:
+            return None
+
+        sent = times.popleft()
+        if len(times) == 0:
+            del self.__pending[key]
+        self.__count -= 1
+
+        latency = (time.monotonic() if now is None else now) - sent
+        self.__latency.add('command_to_ack', latency)
+        self.__latency.add(f"command_to_ack_{command_name}", latency)
+        return latency
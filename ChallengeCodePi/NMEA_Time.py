@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 01:05:33 2026
+
+Time of day of NMEA sentences (hhmmss.ss, UTC) as float timestamps.
+
+NMEATimeOfDay turns the time of day into seconds since midnight with
+nmea_utils.timestamp_seconds (integer arithmetic, str or bytes) and adds the
+start of the current UTC day, which is worked out again only when the clock
+has moved on to the next day. The last time of day decoded is kept, as the fix
+time of navigation updates repeats until the next GPS fix. The result is the
+instant with that time of day nearest to now, so a fix stamped 235959.90 and
+read just after midnight belongs to the day before, and one stamped 000000.10
+read just before midnight to the day after.
+
+decode() gives epoch seconds (time.time()); monotonic() gives the same instant
+on the time.monotonic() clock, to compare with the backseat's other
+timestamps.
+
+@author: Team Baygulls
+"""
+import time
+
+from pynmea2.pynmea2.nmea_utils import timestamp_seconds
+
+SECONDS_PER_DAY = 86400
+
+class NMEATimeOfDay():
+    def __init__(self, clock=time.time):
+        self.__clock = clock
+        self.__day_start = None # epoch seconds of the current UTC midnight
+        self.__day_end = None
+        self.__text = None      # the last hhmmss decoded, and its seconds
+        self.__seconds = None
+
+    # epoch seconds of hhmmss (str or bytes) on the day nearest to now
+    def decode(self, hhmmss, now=None):
+        # the fix time of navigation updates stays the same between GPS fixes
+        if hhmmss != self.__text:
+            self.__seconds = timestamp_seconds(hhmmss)
+            self.__text = hhmmss
+        seconds = self.__seconds
+        if now is None:
+            now = self.__clock()
+
+        if self.__day_start is None or not self.__day_start <= now < self.__day_end:
+            # epoch time has no leap seconds, so UTC days are whole multiples
+            self.__day_start = now - now % SECONDS_PER_DAY
+            self.__day_end = self.__day_start + SECONDS_PER_DAY
+
+        stamp = self.__day_start + seconds
+        if stamp - now > SECONDS_PER_DAY / 2:
+            stamp -= SECONDS_PER_DAY # before midnight, read after it
+        elif now - stamp > SECONDS_PER_DAY / 2:
+            stamp += SECONDS_PER_DAY # after midnight, read before it
+        return stamp
+
+    # the same instant on the time.monotonic() clock
+    def monotonic(self, hhmmss):
+        now = self.__clock()
+        return self.decode(hhmmss, now) - now + time.monotonic()
@@ -0,0 +1,125 @@
+'''
+NMEA checksums: the XOR of every character between the '$' and the '*'.
+
+`xor_checksum` works on one payload (str or bytes) by folding it as one
+integer instead of XORing character by character. `line_checksums` and
+`validate` work on a whole buffer of newline separated sentences at once, and
+need numpy, which is imported on first use so pynmea2 does not depend on it.
+'''
+import operator
+from functools import reduce
+
+__all__ = ['xor_checksum', 'line_checksums', 'validate']
+
+
+def xor_checksum(data):
+    '''
+    XOR of all the characters of data (str) or bytes of data (bytes-like).
+
+    The bytes are read as one integer and folded in halves; bits above the
+    current half are never shifted back down, so they need no mask.
+    '''
+    if isinstance(data, str):
+        try:
+            data = data.encode('latin-1')
+        except UnicodeEncodeError:
+            return reduce(operator.xor, map(ord, data), 0)
+    if len(data) == 0:
+        return 0
+    value = int.from_bytes(data, 'little')
+    # half of a power-of-two number of bytes, in bits
+    bits = 4 << (len(data) - 1).bit_length()
+    while bits >= 8:
+        value ^= value >> bits
+        bits >>= 1
+    return value & 0xFF
+
+
+_hex_values = None
+
+def _hex_table(np):
+    global _hex_values
+    if _hex_values is None:
+        table = np.full(256, -1, dtype=np.int16)
+        for c in b'0123456789ABCDEFabcdef':
+            table[c] = int(chr(c), 16)
+        _hex_values = table
+    return _hex_values
+
+
+def _first_per_line(np, positions, starts):
+    '''
+    first of the sorted positions on each line (lines begin at starts), or -1
+    '''
+    result = np.full(len(starts), -1, dtype=np.int64)
+    lines = np.searchsorted(starts, positions, side='right') - 1
+    lines, first = np.unique(lines, return_index=True)
+    result[lines] = positions[first]
+    return result
+
+
+def line_checksums(buffer):
+    '''
+    line_checksums(buffer) -> (computed, expected)
+
+    buffer holds sentences separated by '\\n' (bytes, bytearray, memoryview
+    or a uint8 array). For every line, an int16 array entry of:
+
+        computed:   XOR of the bytes between the first '$' and the last '*'
+        expected:   the one or two hex digits following that '*' (three or
+                    more digits are not a checksum)
+
+    Both are -1 for a line that has no '$...*H' or '$...*HH' (an empty last
+    line after a final newline is not counted). Requires numpy.
+    '''
+    import numpy as np
+
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    size = len(data)
+    newlines = np.flatnonzero(data == 0x0A)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [size]))
+    if starts[-1] == size:
+        starts, ends = starts[:-1], ends[:-1]
+
+    dollars = _first_per_line(np, np.flatnonzero(data == 0x24), starts)
+    # last '*' of a line: first when read backwards
+    stars = np.flatnonzero(data == 0x2A)[::-1]
+    lines = np.searchsorted(starts, stars, side='right') - 1
+    lines, last = np.unique(lines, return_index=True)
+    star = np.full(len(starts), -1, dtype=np.int64)
+    star[lines] = stars[last]
+
+    ok = (dollars >= 0) & (star > dollars) & (star + 1 < ends)
+
+    # XOR of data[a:b] is prefix[b] ^ prefix[a]
+    prefix = np.zeros(size + 1, dtype=np.uint8)
+    np.bitwise_xor.accumulate(data, out=prefix[1:])
+    computed = np.full(len(starts), -1, dtype=np.int16)
+    computed[ok] = prefix[star[ok]] ^ prefix[dollars[ok] + 1]
+
+    # the hex value of the character offset past each '*', or -1 past the line
+    table = _hex_table(np)
+    def digit(offset):
+        positions = star[ok] + offset
+        inside = positions < ends[ok]
+        return np.where(inside, table[data[np.where(inside, positions, 0)]], -1)
+
+    # senders write '%x' as well as '%02X', so one digit is a checksum too
+    first, second, third = digit(1), digit(2), digit(3)
+    digits = (first >= 0) & (third < 0)
+    expected = np.full(len(starts), -1, dtype=np.int16)
+    expected[ok] = np.where(digits, np.where(second >= 0, first * 16 + second, first), -1)
+    computed[ok] = np.where(digits, computed[ok], -1)
+    return computed, expected
+
+
+def validate(buffer):
+    '''
+    validate(buffer) -> bool array, one entry per line of buffer
+
+    True where the line holds a '$...*HH' (or '$...*H') sentence whose
+    checksum matches. See `line_checksums`. Requires numpy.
+    '''
+    computed, expected = line_checksums(buffer)
+    return (computed >= 0) & (computed == expected)
@@ -0,0 +1,223 @@
+'''
+Compact, read-only form of parsed talker and proprietary sentences, for
+keeping many of them around (a rolling window of recent sentences, say).
+
+A CompactSentence holds the sentence text as bytes once (without the '$' and
+the checksum), the offsets of the data fields in it and the sentence class. It
+has __slots__ and no __dict__, so there is no data list and there are no
+decoded fields per instance: field strings are cut out of the bytes when they
+are read, and converted as NMEASentence would convert them. Everything else
+(properties such as `latitude`, methods, `fields`, ...) comes from the
+sentence class, and `expand()` gives back a full, writable sentence.
+'''
+import types
+
+from . import nmea
+from .checksum import xor_checksum
+
+__all__ = ['CompactSentence']
+
+
+def _offsets(start, lengths):
+    '''
+    offsets of the fields of the given lengths after start, plus the end of
+    the last field + 1, as bytes when they fit (else a list)
+    '''
+    offsets = [start]
+    pos = start
+    for n in lengths:
+        pos += n + 1
+        offsets.append(pos)
+    if pos < 256:
+        return bytes(offsets)
+    return offsets
+
+
+# (sentence class, attribute name) -> (kind, value), see _describe
+_attributes = {}
+
+def _describe(cls, name):
+    attr = nmea._class_attribute((cls,), name)
+    # slots and __dict__ of the sentence class do not apply to a CompactSentence
+    if attr is not None and not isinstance(attr, (types.MemberDescriptorType,
+                                                  types.GetSetDescriptorType)):
+        return 'attribute', attr
+    i = cls.name_to_idx.get(name)
+    if i is not None:
+        f = cls.fields[i]
+        return 'field', (i, f[2] if len(f) >= 3 else None)
+    if issubclass(cls, nmea.TalkerSentence) and name in ('talker', 'sentence_type'):
+        return name, None
+    return None, None
+
+
+class CompactSentence(object):
+    '''
+    CompactSentence.parse(line) or CompactSentence.from_sentence(sentence)
+    '''
+    __slots__ = ('_raw', '_offsets', '_cls', '_extra')
+
+    def __init__(self, cls, raw, offsets, extra=None):
+        '''
+        `cls`: the sentence class, `raw`: identifier and data as bytes,
+        `offsets`: start of each data field in raw and the end of the last
+        one + 1, `extra`: tuple of (name, value) instance attributes besides
+        data that raw does not give (the manufacturer and sub-type of
+        proprietary sentences)
+        '''
+        self._raw = raw
+        self._offsets = offsets
+        self._cls = cls
+        self._extra = extra
+
+    @staticmethod
+    def from_sentence(sentence):
+        '''
+        Compact form of a TalkerSentence or ProprietarySentence
+        '''
+        if isinstance(sentence, nmea.TalkerSentence):
+            standard = ('data', '_fields_decoded', 'talker', 'sentence_type')
+        elif isinstance(sentence, nmea.ProprietarySentence):
+            standard = ('data', '_fields_decoded')
+        else:
+            raise TypeError('cannot compact %s' % type(sentence).__name__)
+
+        head = sentence.identifier()
+        text = head + ','.join(sentence.data)
+        raw = text.encode('utf-8')
+        if len(raw) == len(text):
+            lengths = map(len, sentence.data)
+        else:
+            lengths = [len(f.encode('utf-8')) for f in sentence.data]
+        offsets = _offsets(len(head.encode('utf-8')), lengths)
+        extra = tuple(sorted((name, value) for name, value in vars(sentence).items()
+                             if name not in standard)) or None
+        return CompactSentence(type(sentence), raw, offsets, extra)
+
+    @staticmethod
+    def parse(line, check=False):
+        '''
+        As NMEASentence.parse, but returns a CompactSentence. Plain talker
+        sentences go straight from the line to the compact form; query
+        sentences, which have no data, are returned as NMEASentence.parse
+        returns them.
+        '''
+        split = nmea.NMEASentence.split_talker(line)
+        cls = split and nmea.TalkerSentence.sentence_types.get(split[3][2:5])
+        if not cls:
+            sentence = nmea.NMEASentence.parse(line, check)
+            if isinstance(sentence, nmea.QuerySentence):
+                return sentence
+            return CompactSentence.from_sentence(sentence)
+
+        nmea_str, data_str, checksum, _ = split
+        raw = nmea_str.encode('utf-8')
+        if checksum:
+            cs1 = int(checksum, 16)
+            cs2 = xor_checksum(nmea_str)
+            if cs1 != cs2:
+                raise nmea.ChecksumError(
+                    'checksum does not match: %02X != %02X' % (cs1, cs2),
+                    data_str.split(','))
+        elif check:
+            raise nmea.ChecksumError(
+                'strict checking requested but checksum missing',
+                data_str.split(','))
+        return CompactSentence(cls, raw, _offsets(6, map(len, raw[6:].split(b','))))
+
+    def _field(self, i):
+        offsets = self._offsets
+        if i + 1 >= len(offsets):
+            return ''
+        return str(self._raw[offsets[i]:offsets[i + 1] - 1], 'utf-8')
+
+    @property
+    def data(self):
+        '''
+        The data fields, as a new list of str
+        '''
+        return [self._field(i) for i in range(len(self._offsets) - 1)]
+
+    def __getattr__(self, name):
+        if name in CompactSentence.__slots__:
+            raise AttributeError(name)
+        if self._extra:
+            for extra_name, value in self._extra:
+                if extra_name == name:
+                    return value
+
+        cls = self._cls
+        try:
+            kind, value = _attributes[cls, name]
+        except KeyError:
+            kind, value = _attributes.setdefault((cls, name), _describe(cls, name))
+
+        if kind == 'field':
+            i, convert = value
+            v = self._field(i)
+            if convert is None:
+                return v
+            if v == '':
+                return None
+            try:
+                return convert(v)
+            except:
+                return v
+        if kind == 'attribute':
+            if hasattr(value, '__get__'):
+                return value.__get__(self, cls)
+            return value
+        if kind == 'talker':
+            return str(self._raw[0:2], 'utf-8')
+        if kind == 'sentence_type':
+            return str(self._raw[2:5], 'utf-8')
+        raise AttributeError(name)
+
+    def identifier(self):
+        return str(self._raw[:self._offsets[0]], 'utf-8')
+
+    def expand(self):
+        '''
+        The full sentence object this is the compact form of
+        '''
+        # set up as the constructor left it; some proprietary constructors
+        # take the data with the sub-type still in front
+        cls = self._cls
+        sentence = object.__new__(cls)
+        if issubclass(cls, nmea.TalkerSentence):
+            sentence.talker = self.talker
+            sentence.sentence_type = self.sentence_type
+        for name, value in self._extra or ():
+            setattr(sentence, name, value)
+        sentence.data = self.data
+        return sentence
+
+    def render(self, checksum=True, dollar=True, newline=False):
+        res = str(self._raw, 'utf-8')
+        if checksum:
+            res += '*%02X' % xor_checksum(self._raw)
+        if dollar:
+            res = '$' + res
+        if newline:
+            res += (newline is True) and '\r\n' or newline
+        return res
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        r = []
+        d = []
+        fields = self._cls.fields
+        for i, v in enumerate(self.data):
+            if i >= len(fields):
+                d.append(v)
+                continue
+            name = fields[i][1]
+            r.append('%s=%r' % (name, getattr(self, name)))
+
+        return '<%s(%s)%s>' % (
+            self._cls.__name__,
+            ', '.join(r),
+            d and ' data=%r' % d or ''
+        )
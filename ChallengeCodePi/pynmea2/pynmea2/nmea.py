@@ -1,6 +1,7 @@
 import re
-import operator
-from functools import reduce
+import types
+
+from .checksum import xor_checksum
 
 
 class ParseError(ValueError):
@@ -14,8 +15,62 @@ class ChecksumError(ParseError):
     pass
 
 
+def _class_attribute(bases, name):
+    for base in bases:
+        for klass in base.__mro__:
+            if name in klass.__dict__:
+                return klass.__dict__[name]
+    return None
+
+
+def _field_decoder(plan):
+    '''
+    Returns a function that converts every field in plan, a tuple of
+    (index, converter or None, slot), and stores the results in the slots.
+    Conversion is the same as NMEASentence.__getattr__ does for one field.
+    '''
+    def decode_fields(sentence):
+        data = sentence.data
+        n = len(data)
+        for i, convert, slot in plan:
+            v = data[i] if i < n else ''
+            if convert is not None:
+                if v == '':
+                    v = None
+                else:
+                    try:
+                        v = convert(v)
+                    except:
+                        pass
+            slot.__set__(sentence, v)
+        sentence.__dict__['_fields_decoded'] = True
+    return decode_fields
+
+
 class NMEASentenceType(type):
+    '''
+    Each sentence class gets a slot for every field name that nothing else
+    on the class (a property, a method) already answers to, and a decoder
+    that fills all of them the first time any field is read. After that
+    reading a field is a plain slot load.
+    '''
     sentence_types = {}
+    def __new__(mcs, name, bases, dct):
+        fields = dct.get('fields')
+        if fields and '__slots__' not in dct and bases != (object,):
+            slots = []
+            for f in fields:
+                field_name = f[1]
+                if (field_name in slots or field_name in dct or
+                        not field_name.isidentifier() or field_name.startswith('__') or
+                        _class_attribute(bases, field_name) is not None):
+                    continue
+                slots.append(field_name)
+            if slots:
+                dct = dict(dct)
+                dct['__slots__'] = tuple(slots)
+        return type.__new__(mcs, name, bases, dct)
+
     def __init__(cls, name, bases, dct):
         type.__init__(cls, name, bases, dct)
         base = bases[0]
@@ -24,11 +79,26 @@ class NMEASentenceType(type):
         base.sentence_types[name] = cls
         cls.name_to_idx = dict((f[1], i) for i, f in enumerate(cls.fields))
 
+        # the last field of a name wins, as in name_to_idx
+        plan = []
+        for field_name, i in cls.name_to_idx.items():
+            slot = _class_attribute((cls,), field_name)
+            if isinstance(slot, types.MemberDescriptorType):
+                f = cls.fields[i]
+                plan.append((i, f[2] if len(f) >= 3 else None, slot))
+        cls.cached_fields = frozenset(cls.fields[i][1] for i, _, _ in plan)
+        cls.decode_fields = staticmethod(_field_decoder(tuple(plan)))
+
 
 # http://mikewatkins.ca/2008/11/29/python-2-and-3-metaclasses/
 NMEASentenceBase = NMEASentenceType('NMEASentenceBase', (object,), {})
 
 
+# characters of the sentence type on the fast path in NMEASentence.parse
+_TYPE_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+_HEX_CHARS = frozenset('0123456789ABCDEFabcdef')
+
+
 class NMEASentence(NMEASentenceBase):
     '''
     Base NMEA Sentence
@@ -81,10 +151,40 @@ class NMEASentence(NMEASentenceBase):
 
     name_to_idx = {}
     fields = ()
+    cached_fields = frozenset()
+    _fields_decoded = False
 
     @staticmethod
     def checksum(nmea_str):
-        return reduce(operator.xor, map(ord, nmea_str), 0)
+        return xor_checksum(nmea_str)
+
+    @staticmethod
+    def split_talker(line):
+        '''
+        split_talker(line)
+
+        Splits the common '$TTSSS,...[*HH]' talker sentence (upper case type,
+        not proprietary or a query) with a few character comparisons. Returns
+        (nmea_str, data_str, checksum, sentence_type) as sentence_re would, or
+        None for anything else.
+        '''
+        if len(line) < 7 or line[0] != '$' or line[6] != ',':
+            return None
+        if line[1] == 'P' or line[5] == 'Q' or not _TYPE_CHARS.issuperset(line[1:6]):
+            return None
+
+        star = line.find('*', 7)
+        if star < 0:
+            # without a checksum the data runs to the end of the line
+            return line[1:], line[7:], None, line[1:7]
+
+        checksum = line[star + 1:star + 3]
+        if len(checksum) != 2 or not _HEX_CHARS.issuperset(checksum):
+            return None
+        rest = line[star + 3:]
+        if rest and not rest.isspace():
+            return None
+        return line[1:star], line[7:star], checksum, line[1:7]
 
     @staticmethod
     def parse(line, check=False):
@@ -97,16 +197,20 @@ class NMEASentence(NMEASentenceBase):
         Raises ValueError if the string could not be parsed, or if the checksum
         did not match.
         '''
-        match = NMEASentence.sentence_re.match(line)
-        if not match:
-            raise ParseError('could not parse data', line)
+        split = NMEASentence.split_talker(line)
+        if split:
+            nmea_str, data_str, checksum, sentence_type = split
+        else:
+            match = NMEASentence.sentence_re.match(line)
+            if not match:
+                raise ParseError('could not parse data', line)
 
-        # pylint: disable=bad-whitespace
-        nmea_str        = match.group('nmea_str')
-        data_str        = match.group('data')
-        checksum        = match.group('checksum')
-        sentence_type   = match.group('sentence_type').upper()
-        data            = data_str.split(',')
+            # pylint: disable=bad-whitespace
+            nmea_str        = match.group('nmea_str')
+            data_str        = match.group('data')
+            checksum        = match.group('checksum')
+            sentence_type   = match.group('sentence_type').upper()
+        data = data_str.split(',')
 
         if checksum:
             cs1 = int(checksum, 16)
@@ -118,10 +222,17 @@ class NMEASentence(NMEASentenceBase):
             raise ChecksumError(
                 'strict checking requested but checksum missing', data)
 
-        talker_match = NMEASentence.talker_re.match(sentence_type)
+        if split:
+            # split_talker only accepts the 'TTSSS,' talker shape
+            talker_match = True
+            talker = sentence_type[0:2]
+            sentence = sentence_type[2:5]
+        else:
+            talker_match = NMEASentence.talker_re.match(sentence_type)
+            if talker_match:
+                talker = talker_match.group('talker')
+                sentence = talker_match.group('sentence')
         if talker_match:
-            talker = talker_match.group('talker')
-            sentence = talker_match.group('sentence')
             cls = TalkerSentence.sentence_types.get(sentence)
 
             if not cls:
@@ -153,6 +264,10 @@ class NMEASentence(NMEASentenceBase):
             i = t.name_to_idx[name]
         except KeyError:
             raise AttributeError(name)
+        if name in t.cached_fields:
+            # first read of a field: decode them all into their slots
+            t.decode_fields(self)
+            return object.__getattribute__(self, name)
         f = t.fields[i]
         if i < len(self.data):
             v = self.data[i]
@@ -172,10 +287,28 @@ class NMEASentence(NMEASentenceBase):
         #pylint: disable=invalid-name
         t = type(self)
         if name not in t.name_to_idx:
+            if name == 'data' and self._fields_decoded:
+                self.clear_fields()
             return object.__setattr__(self, name, value)
 
         i = t.name_to_idx[name]
         self.data[i] = str(value)
+        if self._fields_decoded:
+            self.clear_fields()
+
+    def clear_fields(self):
+        '''
+        Forget the decoded fields, so that the next read decodes them again
+        from data. Assigning a field or data does this; call it after
+        changing the data list in place.
+        '''
+        t = type(self)
+        for name in t.cached_fields:
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                pass
+        self.__dict__['_fields_decoded'] = False
 
     def __repr__(self):
         #pylint: disable=invalid-name
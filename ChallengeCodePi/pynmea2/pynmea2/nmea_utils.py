@@ -22,6 +22,28 @@ def timestamp(s):
     return t
 
 
+# the ASCII '0's in the weighted sum of the six hhmmss digits
+_DIGITS_OFFSET = ord('0') * (36000 + 3600 + 600 + 60 + 10 + 1)
+
+def timestamp_seconds(s):
+    '''
+    Converts a timestamp given in "hhmmss[.ss]" ASCII text format (str or
+    bytes) to float seconds since midnight, in integer arithmetic on the
+    digit codes
+    '''
+    if isinstance(s, str):
+        s = s.encode('ascii')
+    n = len(s)
+    # the fraction, if any, is digits only: no sign, space or '_' that int() would take
+    if n < 6 or not s[:6].isdigit() or (n > 6 and (s[6] != 46 or not s[7:].isdigit())): # '.'
+        raise ValueError('not a hhmmss[.ss] timestamp: %r' % (s,))
+    seconds = (s[0] * 36000 + s[1] * 3600 + s[2] * 600 + s[3] * 60 + s[4] * 10 + s[5] -
+               _DIGITS_OFFSET)
+    if n > 6:
+        return seconds + int(s[7:]) / 10 ** (n - 7)
+    return float(seconds)
+
+
 def datestamp(s):
     '''
     Converts a datestamp given in "DDMMYY" ASCII text format to a
@@ -0,0 +1,53 @@
+import operator
+from functools import reduce
+
+import pytest
+
+import pynmea2
+from pynmea2.checksum import xor_checksum, line_checksums, validate
+
+DATA = "$GPGGA,184353.07,1929.045,S,02410.506,E,1,04,2.6,100.00,M,-33.9,M,,0000*6D"
+
+
+def test_xor_checksum():
+    payload = DATA[1:-3]
+    assert xor_checksum(payload) == 0x6D
+    assert xor_checksum(payload.encode()) == 0x6D
+    assert xor_checksum(bytearray(payload.encode())) == 0x6D
+    assert xor_checksum('') == 0
+    assert xor_checksum(b'A') == 0x41
+    assert pynmea2.NMEASentence.checksum(payload) == 0x6D
+
+
+def test_xor_checksum_lengths():
+    for n in range(70):
+        data = bytes(range(33, 33 + n))
+        assert xor_checksum(data) == reduce(operator.xor, data, 0)
+    # characters outside latin-1 fall back to XORing the code points
+    assert xor_checksum(u'\u2603A') == 0x2603 ^ 0x41
+
+
+def test_line_checksums():
+    pytest.importorskip('numpy')
+    bad = DATA[:-2] + '00'
+    buf = '\r\n'.join([DATA, bad, 'garbage', '', '$GPGGA,1', DATA]) + '\r\n'
+    computed, expected = line_checksums(buf.encode())
+    assert computed.tolist() == [0x6D, 0x6D, -1, -1, -1, 0x6D]
+    assert expected.tolist() == [0x6D, 0x00, -1, -1, -1, 0x6D]
+    assert validate(buf.encode()).tolist() == [True, False, False, False, False, True]
+    assert len(validate(b'')) == 0
+
+
+def test_validate_short_checksums():
+    pytest.importorskip('numpy')
+    # Bluefin_Encoder and BluefinMessages end sentences with '*%x', one digit below 0x10
+    lines = ['$BPLOG,NVG,ON', '$BPLOG,ALL,ON', '$BPSTS,120000.00,1,BWSI Autonomy OK']
+    sentences = [b'%s*%x\n' % (line.encode(), xor_checksum(line[1:])) for line in lines]
+    assert len(sentences[0]) == len(b'$BPLOG,NVG,ON*8\n')
+    assert validate(b''.join(sentences)).tolist() == [True, True, True]
+    assert validate(b'$BPLOG,NVG,ON*8\r\n$BPLOG,NVG,ON*08\n').tolist() == [True, True]
+    # as the backseat logs them
+    assert validate(b"Received: ['$BPLOG,NVG,ON*8']\n").tolist() == [True]
+    # a wrong digit, three digits and no digit
+    assert validate(b'$BPLOG,NVG,ON*9\n$BPLOG,NVG,ON*008\n$BPLOG,NVG,ON*\n'
+                    b'$BPLOG,NVG,ON*x8\n').tolist() == [False] * 4
@@ -127,6 +127,105 @@ def test_timestamp():
     assert pynmea2.nmea_utils.timestamp('115919.1234567').microsecond == 123456
 
 
+def test_timestamp_seconds():
+    seconds = pynmea2.nmea_utils.timestamp_seconds
+    assert seconds('115919') == 11 * 3600 + 59 * 60 + 19
+    assert seconds('115919.12') == 11 * 3600 + 59 * 60 + 19.12
+    assert seconds(b'235959.99') == 86399.99
+    assert seconds('000000.001') == 0.001
+    with pytest.raises(ValueError):
+        seconds('11591')
+    with pytest.raises(ValueError):
+        seconds('1159191')
+    for text in ('115919.', '115919.-5', '115919. 5', '115919.+5', '115919.1_2'):
+        with pytest.raises(ValueError):
+            seconds(text)
+
+
+def test_field_write_then_read():
+    msg = pynmea2.parse(data)
+    assert msg.gps_qual == 1
+    msg.gps_qual = 2
+    assert msg.gps_qual == 2
+    assert msg.altitude == 100.0
+    msg.altitude = '-12.5'
+    assert msg.altitude == -12.5
+    assert ',2,04,2.6,-12.5,M,' in msg.render()
+
+
+def test_data_assignment_clears_fields():
+    msg = pynmea2.parse(data)
+    assert msg.lat == '1929.045'
+    msg.data = list(msg.data)
+    msg.data[1] = '1930.000'
+    assert msg.lat == '1930.000'
+    assert str(msg).startswith('$GPGGA,184353.07,1930.000,S,')
+
+
+def test_clear_fields():
+    msg = pynmea2.parse(data)
+    assert msg.gps_qual == 1
+    msg.data[5] = '4'
+    # changed in place: the decoded value is kept until cleared
+    assert msg.gps_qual == 1
+    msg.clear_fields()
+    assert msg.gps_qual == 4
+    assert msg.num_sats == '04'
+
+
+def test_subclass_with_slots():
+    class XGA(pynmea2.types.GGA):
+        __slots__ = ('note',)
+        fields = pynmea2.types.GGA.fields + (('Extra', 'extra', int),)
+
+    msg = XGA('GP', 'XGA', data[7:-3].split(',') + ['7'])
+    msg.note = 'kept'
+    assert msg.note == 'kept'
+    assert msg.gps_qual == 1
+    assert msg.altitude == 100.0
+    assert msg.extra == 7
+    msg.extra = 8
+    msg.gps_qual = 5
+    assert (msg.extra, msg.gps_qual) == (8, 5)
+    assert msg.render(checksum=False).endswith(',5,04,2.6,100.00,M,-33.9,M,,0000,8')
+
+
+# lines split_talker leaves to sentence_re, and lines it splits itself
+SPLIT_CASES = [
+    ('$CCGPQ,GGA', False),                                  # query
+    ('$PGRME,15.0,M,45.0,M,25.0,M*1C', False),              # proprietary
+    ('$gpgga,184353.07,1929.045,S,02410.506,E,1,04,2.6,100.00,M,-33.9,M,,0000*4D', False),
+    ('  ' + data, False),                                   # leading whitespace
+    (data[1:], False),                                      # no '$'
+    (data[:-3], True),                                      # no checksum
+    (data[:-2] + '00', True),                               # bad checksum
+    (data + '\r\n', True),
+    (data[:-2] + '6d', True),
+    ('$GPGGA,1', True),
+    ('$GPABC,1,2,3', True),
+]
+
+
+@pytest.mark.parametrize('line, split', SPLIT_CASES)
+@pytest.mark.parametrize('check', [False, True])
+def test_split_talker_matches_sentence_re(monkeypatch, line, split, check):
+    assert (pynmea2.NMEASentence.split_talker(line) is not None) == split
+
+    def parse_both():
+        for regex_only in (False, True):
+            if regex_only:
+                monkeypatch.setattr(pynmea2.NMEASentence, 'split_talker',
+                                    staticmethod(lambda line: None))
+            try:
+                msg = pynmea2.parse(line, check=check)
+                yield type(msg), repr(msg), msg.render()
+            except pynmea2.ParseError as e:
+                yield type(e), repr(e.args), None
+
+    with_split, regex_only = parse_both()
+    assert with_split == regex_only
+
+
 def test_corrupt_message():
     # data is corrupt starting here ------------------------------v
     data = '$GPRMC,172142.00,A,4805.30256324,N,11629.09084774,W,0.D'
@@ -67,3 +67,76 @@ def test_ignore_errors():
 def test_bad_error_value():
     with pytest.raises(ValueError):
         sr = pynmea2.NMEAStreamReader(errors='bad')
+
+
+def test_bytes():
+    sr = pynmea2.NMEAStreamReader()
+    data = DATA.encode('ascii')
+    assert len(list(sr.next(data[:10]))) == 0
+    assert sr.buffer == data[:10]
+    batch = sr.next_batch(memoryview(data[10:] + data))
+    assert len(batch) == 2
+    assert isinstance(batch[0], pynmea2.GGA)
+    assert str(batch[1]) == DATA.strip()
+
+
+def test_assign_buffer():
+    sr = pynmea2.NMEAStreamReader(errors='ignore')
+    assert list(sr.next(DATA[:10])) == []
+    sr.buffer = ''
+    assert sr.buffer == ''
+    assert list(sr.next(DATA[10:])) == []  # the rest of a line that was dropped
+
+    sr.buffer = 'foo\n' + DATA[:10]
+    assert sr.buffer == 'foo\n' + DATA[:10]
+    batch = sr.next_batch(DATA[10:])
+    assert len(batch) == 1
+    assert isinstance(batch[0], pynmea2.GGA)
+
+    data = DATA.encode('ascii')
+    sr.buffer = data + data[:10]
+    assert sr.buffer == data + data[:10]
+    assert len(sr.next_batch(data[10:])) == 2
+
+
+def test_mixed_types():
+    sr = pynmea2.NMEAStreamReader()
+    assert list(sr.next(b'$GPGGA')) == []
+    with pytest.raises(TypeError):
+        list(sr.next('foo'))
+
+    # also once the bytes read so far were all complete lines
+    sr = pynmea2.NMEAStreamReader()
+    assert len(sr.next_batch(DATA.encode('ascii'))) == 1
+    assert sr.buffer == b''
+    with pytest.raises(TypeError):
+        sr.next_batch('$GPGGA')
+    assert sr.buffer == b''
+
+
+def test_max_line_length():
+    for data in ('x' * 100 + '\n' + DATA, b'x' * 100 + b'\n' + DATA.encode('ascii')):
+        sr = pynmea2.NMEAStreamReader(errors='yield', max_line_length=90)
+        batch = []
+        for i in range(0, len(data), 7):
+            batch.extend(sr.next(data[i:i + 7]))
+        assert len(batch) == 2
+        assert isinstance(batch[0], pynmea2.ParseError)
+        assert isinstance(batch[1], pynmea2.GGA)
+
+
+def test_iter_batches():
+    sr = pynmea2.NMEAStreamReader(StringIO(DATA * 3))
+    batches = list(sr)
+    assert len(batches) == 3
+    assert all(len(batch) == 1 for batch in batches)
+
+
+def test_error_sink():
+    errors = []
+    sr = pynmea2.NMEAStreamReader(errors=errors.append)
+    data = list(sr.next('foo\n' + DATA))
+    assert len(data) == 1
+    assert isinstance(data[0], pynmea2.GGA)
+    assert len(errors) == 1
+    assert isinstance(errors[0], pynmea2.ParseError)